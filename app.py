@@ -1,15 +1,55 @@
+import time
 import streamlit as st
 from src.core.chatbot import LegalAnnouncementChatbot
+from src.core.intent_matcher import IntentMatcher
 
 st.set_page_config(page_title="Chatbot Annonces Légales", page_icon="💬")
 st.title("💬 Chatbot - Annonces Légales")
 
-# Initialisation du chatbot
-chatbot = LegalAnnouncementChatbot(data_file="legal_data.json")
+
+@st.cache_resource(show_spinner=False)
+def load_intent_matcher(data_file: str) -> IntentMatcher:
+    """
+    Détecteur d'intentions partagé par le serveur, en chargement différé : la
+    page s'affiche immédiatement, spaCy et le classificateur se chargent en
+    arrière-plan
+    """
+    matcher = IntentMatcher(data_file, lazy=True)
+    matcher.warm_up()
+    return matcher
+
+
+# Initialisation du chatbot : un par session (historique propre),
+# tous partagent le même détecteur d'intentions
+if "chatbot" not in st.session_state:
+    st.session_state.chatbot = LegalAnnouncementChatbot(
+        intent_matcher=load_intent_matcher("legal_data.json")
+    )
+    st.session_state.last_question = None
+chatbot = st.session_state.chatbot
 
 # Zone de saisie
 question = st.text_input("Posez votre question sur les annonces légales :")
 
+# Streamlit réexécute le script à chaque interaction : seule une nouvelle
+# question déclenche le calcul d'une réponse
+if not chatbot.is_ready():
+    st.info("⏳ Chargement du modèle en cours...")
+
+if question and question != st.session_state.last_question:
+    start = time.perf_counter()
+    with st.spinner("Recherche de la réponse..."):
+        st.session_state.last_response = chatbot.get_response(question)
+    st.session_state.last_latency = (time.perf_counter() - start) * 1000
+    st.session_state.last_question = question
+
 if question:
-    reponse = chatbot.get_response(question)
-    st.markdown(f"**Réponse :** {reponse}")
+    st.markdown(f"**Réponse :** {st.session_state.last_response}")
+    st.caption(f"⏱️ Réponse obtenue en {st.session_state.last_latency:.0f} ms")
+
+history = chatbot.get_conversation_history()
+if len(history) > 2:
+    with st.expander("Historique de la conversation"):
+        for message in history:
+            author = "Vous" if message["role"] == "user" else "Assistant"
+            st.markdown(f"**{author} :** {message['content']}")
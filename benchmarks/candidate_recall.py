@@ -0,0 +1,73 @@
+"""
+Mesure le rappel de la présélection lexicale (BM25) de l'IntentMatcher.
+
+Pour chaque nombre de candidates, compare la présélection au parcours complet
+de la base : rappel (l'intention du parcours complet figure parmi les
+candidates), accord des décisions finales et temps moyen par requête.
+
+Par défaut les requêtes sont les textes de la base (questions, variations,
+mots-clés) ; un fichier de requêtes réelles, une par ligne, donne une mesure
+plus représentative.
+
+Usage:
+    python benchmarks/candidate_recall.py [--data legal_data.json] [--queries requetes.txt]
+                                          [--limits 5 10 20 50] [--json]
+"""
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def knowledge_base_queries(data_file: str) -> list:
+    """Questions, variations et mots-clés de la base"""
+    from src.core.kb_index import INTENT_FAMILIES
+
+    with open(data_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    queries = []
+    for family in INTENT_FAMILIES:
+        for entry in family.entries(data).values():
+            examples = entry.get("examples", {})
+            queries += examples.get("questions", []) + examples.get("variations", []) + entry.get("keywords", [])
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data", default="legal_data.json")
+    parser.add_argument("--queries", help="Fichier de requêtes, une par ligne")
+    parser.add_argument("--limits", type=int, nargs="+", default=[5, 10, 20, 50])
+    parser.add_argument("--threshold", type=float, default=0.5, help="Seuil de similarité du matcher")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    from src.core.intent_matcher import IntentMatcher
+
+    if args.queries:
+        with open(args.queries, 'r', encoding='utf-8') as f:
+            queries = [line.strip() for line in f if line.strip()]
+    else:
+        queries = knowledge_base_queries(args.data)
+
+    matcher = IntentMatcher(args.data, similarity_threshold=args.threshold)
+    report = matcher.measure_candidate_recall(queries, args.limits)
+
+    if args.json:
+        print(json.dumps({"queries": len(queries), "intents": len(matcher.index), "limits": report}, indent=2))
+        return
+
+    print(f"{len(queries)} requêtes, {len(matcher.index)} intentions")
+    print(f"{'N':>6} {'rappel':>8} {'accord':>8} {'évaluées':>9} {'ms/req':>8}")
+    for limit, row in report.items():
+        print(f"{limit:>6} {row['recall']:>8.1%} {row['agreement']:>8.1%} "
+              f"{row['mean_candidates']:>9.1f} {row['ms_per_query']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
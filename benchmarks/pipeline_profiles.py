@@ -0,0 +1,90 @@
+"""
+Compare les profils de pipeline spaCy de l'IntentMatcher.
+
+Chaque profil est mesuré dans un sous-processus distinct afin que la mémoire
+résidente (pic RSS) ne soit pas faussée par les modèles déjà chargés.
+
+Usage:
+    python benchmarks/pipeline_profiles.py [--data legal_data.json] [--repeat 20]
+"""
+import argparse
+import json
+import logging
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+QUERIES = [
+    "Comment créer une entreprise ?",
+    "Combien coûte une annonce légale ?",
+    "Je veux changer l'adresse de mon entreprise",
+    "Quels sont vos délais de publication ?",
+    "Je souhaite connaître les formalités pour une dissolution",
+]
+
+
+def measure(profile: str, data_file: str, repeat: int) -> dict:
+    """Mesure un profil dans le processus courant"""
+    logging.disable(logging.INFO)
+    from src.core.intent_matcher import IntentMatcher
+
+    start = time.perf_counter()
+    matcher = IntentMatcher(data_file, pipeline_profile=profile)
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in QUERIES:
+            matcher._preprocess_text(query)
+    preprocess_ms = (time.perf_counter() - start) * 1000 / (repeat * len(QUERIES))
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in QUERIES:
+            matcher.find_best_match(query)
+    match_ms = (time.perf_counter() - start) * 1000 / (repeat * len(QUERIES))
+
+    return {
+        "profile": profile,
+        "components": matcher.nlp.pipe_names,
+        "load_s": round(load_time, 3),
+        "preprocess_ms": round(preprocess_ms, 3),
+        "match_ms": round(match_ms, 3),
+        # ru_maxrss est exprimé en kilo-octets sous Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default="legal_data.json")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--profile", help="Mesure un seul profil dans ce processus (usage interne)")
+    args = parser.parse_args()
+
+    if args.profile:
+        print(json.dumps(measure(args.profile, args.data, args.repeat)))
+        return
+
+    from src.core.intent_matcher import PIPELINE_PROFILES
+
+    results = []
+    for profile in PIPELINE_PROFILES:
+        output = subprocess.run(
+            [sys.executable, __file__, "--profile", profile, "--data", args.data, "--repeat", str(args.repeat)],
+            check=True, capture_output=True, text=True, cwd=ROOT,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'profil':<14}{'chargement (s)':>16}{'prétraitement (ms)':>20}{'requête (ms)':>14}{'pic RSS (Mo)':>14}")
+    for r in results:
+        print(f"{r['profile']:<14}{r['load_s']:>16}{r['preprocess_ms']:>20}{r['match_ms']:>14}{r['peak_rss_mb']:>14}")
+
+
+if __name__ == "__main__":
+    main()
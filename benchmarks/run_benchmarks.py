@@ -0,0 +1,272 @@
+"""
+Banc de mesure de référence de la détection d'intentions.
+
+Pour la base fournie et pour des bases synthétiques 10x, 100x et 1000x plus
+grandes (src.data.kb_generator), mesure :
+- le démarrage à froid (import, chargement de spaCy, du classificateur et
+  construction de l'index) ;
+- la latence d'une requête isolée, modèles chargés, via
+  LegalAnnouncementChatbot (cache des décisions désactivé) ;
+- le débit du traitement par lot (IntentMatcher.find_best_matches) et, sur
+  les bases synthétiques, la justesse sur leurs requêtes de test étiquetées ;
+- la latence et le débit du classificateur seul (IntentClassifier), s'il est
+  entraîné. Il est entraîné sur la base fournie : il n'est utilisé que pour
+  elle et désactivé sur les bases synthétiques, dont il ne connaît pas les
+  intentions (le champ "classifier" de chaque mesure l'indique) ;
+- le pic de mémoire résidente.
+
+Chaque base est mesurée dans un sous-processus distinct : le démarrage est
+réellement à froid et le pic RSS n'est pas faussé par les mesures précédentes.
+Les résultats sont écrits en JSON ; --baseline compare à un fichier de
+résultats précédent.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--data legal_data.json] [--scales 1 10 100 1000]
+                                        [--repeat 5] [--max-queries 100] [--seed 0]
+                                        [--output benchmark_results.json]
+                                        [--baseline ancien_resultat.json]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.candidate_recall import knowledge_base_queries  # noqa: E402
+from src.core.kb_index import INTENT_FAMILIES  # noqa: E402
+
+# Mesures comparées avec --baseline : (clé, plus petit est meilleur)
+COMPARED = (
+    ("cold_start_s", True),
+    ("query_p50_ms", True),
+    ("query_p95_ms", True),
+    ("batch_qps", False),
+    ("classifier_qps", False),
+    ("accuracy", False),
+    ("peak_rss_mb", True),
+)
+
+
+def synthetic_knowledge_base(n_intents: int, max_queries: int, seed: int) -> tuple:
+    """Base synthétique de n_intents intentions et un échantillon de ses requêtes de test"""
+    from src.data.kb_generator import KnowledgeBaseGenerator
+
+    knowledge_base, queries = KnowledgeBaseGenerator(seed=seed).generate(n_intents)
+    if len(queries) > max_queries:
+        queries = random.Random(seed).sample(queries, max_queries)
+    return knowledge_base, queries
+
+
+def percentile(values: list, q: float) -> float:
+    """Quantile par rang le plus proche"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def measure(data_file: str, labeled: list, repeat: int, use_classifier: bool = True) -> dict:
+    """
+    Mesure une base dans le processus courant
+
+    Args:
+        data_file: Fichier JSON de la base
+        labeled: Requêtes {"text": ..., "intent": ...} (intention None si inconnue)
+        repeat: Nombre de passes sur les requêtes
+        use_classifier: Utilise le classificateur entraîné (à désactiver pour
+            une base dont il ne connaît pas les intentions)
+    """
+    queries = [query["text"] for query in labeled]
+    logging.disable(logging.INFO)
+
+    start = time.perf_counter()
+    from src.core.chatbot import LegalAnnouncementChatbot
+    from src.core.intent_matcher import IntentMatcher
+    matcher = IntentMatcher(data_file, cache_size=0)
+    cold_start = time.perf_counter() - start
+    if not use_classifier:
+        matcher.intent_classifier = None
+    chatbot = LegalAnnouncementChatbot(intent_matcher=matcher)
+
+    # Requête isolée, modèles chargés (une passe de chauffe)
+    for query in queries:
+        chatbot.get_response(query)
+    latencies = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            chatbot.get_response(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    # Traitement par lot
+    batch = queries * repeat
+    start = time.perf_counter()
+    decisions = matcher.find_best_matches(batch)
+    batch_time = time.perf_counter() - start
+
+    # Justesse sur les requêtes étiquetées
+    expected = [(query["intent"], decision[0]) for query, decision in zip(labeled, decisions)
+                if query["intent"] is not None]
+    accuracy = sum(a == b for a, b in expected) / len(expected) if expected else None
+
+    # Classificateur seul
+    classifier = {}
+    if matcher.intent_classifier is not None:
+        single = []
+        for query in queries:
+            start = time.perf_counter()
+            matcher.intent_classifier.predict(query)
+            single.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        matcher.intent_classifier.predict_batch(batch)
+        classifier = {
+            "classifier_p50_ms": round(statistics.median(single), 3),
+            "classifier_qps": round(len(batch) / (time.perf_counter() - start), 1),
+        }
+
+    return {
+        "intents": len(matcher.index),
+        "texts": matcher.index.text_count(),
+        "queries": len(queries),
+        "cold_start_s": round(cold_start, 3),
+        "query_p50_ms": round(statistics.median(latencies), 3),
+        "query_p95_ms": round(percentile(latencies, 0.95), 3),
+        "query_mean_ms": round(statistics.fmean(latencies), 3),
+        "batch_qps": round(len(batch) / batch_time, 1),
+        "accuracy": round(accuracy, 4) if accuracy is not None else None,
+        "classifier": "models/intent_classifier" if matcher.intent_classifier is not None else None,
+        "classifier_p50_ms": None,
+        "classifier_qps": None,
+        **classifier,
+        "paths": matcher.get_path_stats()["counts"],
+        # ru_maxrss est exprimé en kilo-octets sous Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def environment() -> dict:
+    """Contexte de la mesure, pour comparer des résultats comparables"""
+    commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                            text=True, cwd=ROOT).stdout.strip() or None
+    versions = {}
+    for module in ("numpy", "spacy"):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            versions[module] = None
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        **versions,
+    }
+
+
+def compare(results: list, baseline_file: str) -> None:
+    """Affiche l'évolution de chaque mesure par rapport à un résultat précédent"""
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = {run["scale"]: run for run in json.load(f)["runs"]}
+    print(f"\nComparaison avec {baseline_file}")
+    for run in results:
+        previous = baseline.get(run["scale"])
+        if previous is None:
+            continue
+        changes = []
+        for key, lower_is_better in COMPARED:
+            old, new = previous.get(key), run.get(key)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change > 0 if lower_is_better else change < 0
+            changes.append(f"{key} {change:+.1%}{' ⚠️' if worse and abs(change) > 0.1 else ''}")
+        print(f"  x{run['scale']}: " + ", ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data", default="legal_data.json")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100, 1000],
+                        help="Facteurs d'agrandissement de la base (1 : la base fournie)")
+    parser.add_argument("--queries", help="Fichier de requêtes pour la base fournie, une par ligne "
+                                          "(défaut : textes de la base)")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes sur les requêtes")
+    parser.add_argument("--max-queries", type=int, default=100,
+                        help="Requêtes de test retenues par base synthétique")
+    parser.add_argument("--seed", type=int, default=0, help="Graine du générateur de bases")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="Résultats précédents à comparer")
+    parser.add_argument("--measure", nargs=2, metavar=("BASE", "REQUETES"),
+                        help="Mesure une base dans ce processus (usage interne)")
+    parser.add_argument("--no-classifier", action="store_true",
+                        help="Désactive le classificateur pendant la mesure (usage interne)")
+    args = parser.parse_args()
+
+    if args.measure:
+        data_file, queries_file = args.measure
+        with open(queries_file, 'r', encoding='utf-8') as f:
+            labeled = [json.loads(line) for line in f]
+        print(json.dumps(measure(data_file, labeled, args.repeat, not args.no_classifier)))
+        return
+
+    if args.queries:
+        with open(args.queries, 'r', encoding='utf-8') as f:
+            base_queries = [line.strip() for line in f if line.strip()]
+    else:
+        base_queries = knowledge_base_queries(args.data)
+    with open(args.data, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    base_intents = sum(len(family.entries(data)) for family in INTENT_FAMILIES)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.scales:
+            if scale <= 1:
+                data_file = args.data
+                labeled = [{"text": query, "intent": None} for query in base_queries]
+            else:
+                knowledge_base, labeled = synthetic_knowledge_base(scale * base_intents, args.max_queries, args.seed)
+                data_file = Path(tmp) / f"kb_x{scale}.json"
+                with open(data_file, 'w', encoding='utf-8') as f:
+                    json.dump(knowledge_base, f, ensure_ascii=False)
+            queries_file = Path(tmp) / f"queries_x{scale}.jsonl"
+            with open(queries_file, 'w', encoding='utf-8') as f:
+                f.writelines(json.dumps(query, ensure_ascii=False) + "\n" for query in labeled)
+            command = [sys.executable, __file__, "--measure", str(data_file), str(queries_file),
+                       "--repeat", str(args.repeat)]
+            if scale > 1:
+                # Le classificateur est entraîné sur la base fournie : ses intentions
+                # ne sont pas celles des bases synthétiques
+                command.append("--no-classifier")
+            output = subprocess.run(command, check=True, capture_output=True, text=True, cwd=ROOT).stdout
+            run = {"scale": scale, **json.loads(output.strip().splitlines()[-1])}
+            results.append(run)
+            print(f"x{scale:<5} {run['intents']:>6} intentions  démarrage {run['cold_start_s']:>7.2f} s  "
+                  f"requête p50 {run['query_p50_ms']:>8.2f} ms  p95 {run['query_p95_ms']:>8.2f} ms  "
+                  f"lot {run['batch_qps']:>8.1f} req/s  RSS {run['peak_rss_mb']:>7.1f} Mo"
+                  + (f"  justesse {run['accuracy']:.1%}" if run["accuracy"] is not None else "")
+                  + f"  classificateur {'oui' if run['classifier'] else 'non'}")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({"environment": environment(), "data": args.data, "repeat": args.repeat,
+                   "seed": args.seed, "runs": results},
+                  f, ensure_ascii=False, indent=2)
+    print(f"Résultats écrits dans {args.output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
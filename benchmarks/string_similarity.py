@@ -0,0 +1,64 @@
+"""
+Compare les mesures de similarité de chaînes de l'IntentMatcher.
+
+Les deux backends (SequenceMatcher par paire, trigrammes de caractères
+précalculés) analysent les mêmes requêtes sur le chemin de calcul complet
+(sans chemin rapide ni classificateur) : accord des décisions, écart moyen
+des scores et temps moyen par requête.
+
+Usage:
+    python benchmarks/string_similarity.py [--data legal_data.json] [--queries requetes.txt]
+"""
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.candidate_recall import knowledge_base_queries  # noqa: E402
+
+
+def run(matcher, queries: list) -> tuple:
+    """Décisions (intention, score) du calcul complet et temps moyen par requête (ms)"""
+    index = matcher.index
+    prepared = [index.index_example(query) for query in queries]
+    start = time.perf_counter()
+    decisions = [matcher._best_match(index, query, log_details=False)[:2] for query in prepared]
+    return decisions, (time.perf_counter() - start) * 1000 / max(len(queries), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data", default="legal_data.json")
+    parser.add_argument("--queries", help="Fichier de requêtes, une par ligne")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Seuil de similarité du matcher")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    from src.core.intent_matcher import IntentMatcher, STRING_SIMILARITIES
+
+    if args.queries:
+        with open(args.queries, 'r', encoding='utf-8') as f:
+            queries = [line.strip() for line in f if line.strip()]
+    else:
+        queries = knowledge_base_queries(args.data)
+
+    results = {}
+    for backend in STRING_SIMILARITIES:
+        matcher = IntentMatcher(args.data, similarity_threshold=args.threshold, string_similarity=backend)
+        results[backend] = run(matcher, queries)
+
+    reference, reference_ms = results["sequence"]
+    print(f"{len(queries)} requêtes")
+    print(f"{'backend':>10} {'accord':>8} {'écart':>8} {'ms/req':>8}")
+    for backend, (decisions, ms) in results.items():
+        agreement = sum(a[0] == b[0] for a, b in zip(reference, decisions)) / max(len(queries), 1)
+        gap = sum(abs(a[1] - b[1]) for a, b in zip(reference, decisions)) / max(len(queries), 1)
+        print(f"{backend:>10} {agreement:>8.1%} {gap:>8.3f} {ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
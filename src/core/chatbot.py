@@ -1,15 +1,28 @@
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from .intent_matcher import IntentMatcher
 
 class LegalAnnouncementChatbot:
-    def __init__(self, data_file: str = "legal_data.json"):
+    def __init__(self, data_file: str = "legal_data.json", cache_size: int = 1024,
+                 cache_ttl: Optional[float] = None, reload_interval: Optional[float] = None,
+                 intent_matcher: Optional[IntentMatcher] = None, lazy: bool = False):
         """
         Initialise le chatbot avec le détecteur d'intentions
         
         Args:
             data_file: Chemin vers le fichier JSON contenant les données
+            cache_size: Nombre maximal de décisions mises en cache (0 : cache désactivé)
+            cache_ttl: Durée de vie des décisions en cache, en secondes (None : illimitée)
+            reload_interval: Intervalle de surveillance du fichier de données pour le
+                rechargement à chaud, en secondes (None : pas de surveillance)
+            intent_matcher: Détecteur déjà chargé à partager entre plusieurs chatbots
+                (les autres paramètres sont alors ignorés)
+            lazy: Diffère le chargement de spaCy et du classificateur à la première
+                requête ou à l'appel de warm_up()
         """
-        self.intent_matcher = IntentMatcher(data_file)
+        if intent_matcher is None:
+            intent_matcher = IntentMatcher(data_file, cache_size=cache_size, cache_ttl=cache_ttl,
+                                           reload_interval=reload_interval, lazy=lazy)
+        self.intent_matcher = intent_matcher
         self.conversation_history = []
     
     def get_response(self, user_message: str) -> str:
@@ -25,6 +38,35 @@ class LegalAnnouncementChatbot:
         
         return response
     
+    def find_best_matches(self, messages: List[str], batch_size: int = 64,
+                          n_process: int = 1) -> List[Tuple[Optional[str], float, Optional[Dict]]]:
+        """
+        Analyse un lot de messages (rejeu de journaux, contrôle qualité)
+        
+        L'historique de conversation n'est pas modifié.
+        
+        Args:
+            messages: Les messages à analyser
+            batch_size: Nombre de textes par lot spaCy
+            n_process: Nombre de processus spaCy
+            
+        Returns:
+            Un tuple (intention, score, données) par message
+        """
+        return self.intent_matcher.find_best_matches(messages, batch_size=batch_size, n_process=n_process)
+    
+    def warm_up(self) -> None:
+        """Charge les modèles en arrière-plan (mode différé)"""
+        self.intent_matcher.warm_up()
+    
+    def is_ready(self) -> bool:
+        """Indique si les modèles sont chargés"""
+        return self.intent_matcher.is_ready()
+    
+    def get_readiness(self) -> Dict:
+        """État du chargement des modèles"""
+        return self.intent_matcher.get_readiness()
+    
     def get_conversation_history(self) -> List[Dict]:
         """Retourne l'historique de la conversation"""
         return self.conversation_history
@@ -37,6 +79,22 @@ class LegalAnnouncementChatbot:
         """Récupère toutes les catégories"""
         return self.intent_matcher.get_all_categories()
     
+    def get_cache_stats(self) -> Dict:
+        """Statistiques du cache des décisions"""
+        return self.intent_matcher.get_cache_stats()
+    
+    def get_preprocessing_stats(self) -> Dict:
+        """Statistiques du cache de prétraitement"""
+        return self.intent_matcher.get_preprocessing_stats()
+    
+    def get_path_stats(self) -> Dict:
+        """Répartition des requêtes entre chemins rapides, classificateur et calcul complet"""
+        return self.intent_matcher.get_path_stats()
+    
+    def get_metrics(self) -> Dict:
+        """Durées par étape du pipeline de correspondance et compteurs de requêtes"""
+        return self.intent_matcher.get_metrics()
+    
     def get_metadata(self) -> Dict:
         """Récupère les métadonnées"""
         return self.intent_matcher.get_metadata() 
\ No newline at end of file
@@ -1,13 +1,25 @@
 import json
-import spacy
-from typing import Dict, List, Optional, Tuple
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
 from pathlib import Path
 import numpy as np
-from difflib import SequenceMatcher, get_close_matches
+from difflib import SequenceMatcher
+from itertools import chain
 import logging
 from datetime import datetime
 import re
-from ..nlp.intent_classifier import IntentClassifier
+from ..nlp.model_registry import load_model
+from ..nlp.preprocessing import COMMON_MISTAKES, GENERIC_PATTERNS, TextPreprocessor
+from ..nlp.spell_checker import SpellingCorrector
+from ..data.kb_store import KnowledgeBaseStore
+from . import kb_artifact
+from .kb_index import (FAMILY_TITLES, INTENT_FAMILIES, IndexedIntent, IndexedText,
+                       KnowledgeBaseIndex, find_intent_data)
+from .match_cache import MatchCache, normalize_query
+from .metrics import PipelineMetrics
+from .vector_engine import TEXT_KINDS
 
 # Configuration du logging
 logging.basicConfig(
@@ -17,59 +29,334 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Composants spaCy exclus au chargement selon le profil de pipeline :
+# - full : pipeline complet (comportement historique)
+# - lemmas : tokenizer, morphologie et lemmatiseur, sans parser ni NER
+# - vectors-only : tokenizer seul, les lemmes sont remplacés par la forme minuscule
+PIPELINE_PROFILES = {
+    "full": [],
+    "lemmas": ["parser", "ner", "senter"],
+    "vectors-only": ["tok2vec", "morphologizer", "tagger", "parser", "senter",
+                     "attribute_ruler", "lemmatizer", "ner"],
+}
+
+# Comportement de la présélection lexicale quand aucun lemme de la requête
+# n'apparaît dans la base :
+# - full : toutes les intentions sont évaluées (recherche sémantique complète)
+# - none : aucune correspondance n'est renvoyée
+CANDIDATE_FALLBACKS = ("full", "none")
+
+# Mesures de similarité de chaînes :
+# - sequence : difflib.SequenceMatcher pour chaque paire de textes (historique)
+# - ngram : coefficient de Dice sur les trigrammes de caractères, précalculés pour la base
+STRING_SIMILARITIES = ("sequence", "ngram")
+
 class IntentMatcher:
-    def __init__(self, data_file: str = "legal_data.json", similarity_threshold: float = 0.5):
+    def __init__(self, data_file: str = "legal_data.json", similarity_threshold: float = 0.5,
+                 pipeline_profile: str = "lemmas", model_name: str = "fr_core_news_md",
+                 cache_size: int = 1024, cache_ttl: Optional[float] = None,
+                 reload_interval: Optional[float] = None, lazy: bool = False,
+                 candidate_limit: Optional[int] = None, candidate_fallback: str = "full",
+                 fast_path: bool = True, preprocess_cache_size: int = 4096,
+                 string_similarity: str = "sequence", metrics_sample_rate: float = 1.0,
+                 debug: bool = False):
         """
         Initialise le détecteur d'intentions avec spaCy et le fichier de données
         
         Args:
-            data_file: Chemin vers le fichier JSON contenant les données
+            data_file: Chemin vers le fichier JSON contenant les données, ou
+                vers une base compilée (répertoire, voir kb_artifact) dont
+                l'index est alors ouvert sans prétraitement ni vectorisation
             similarity_threshold: Seuil de similarité minimum (0-1)
+            pipeline_profile: Profil de pipeline spaCy ("full", "lemmas" ou "vectors-only")
+            model_name: Nom ou chemin du modèle spaCy
+            cache_size: Nombre maximal de décisions mises en cache (0 : cache désactivé)
+            cache_ttl: Durée de vie des décisions en cache, en secondes (None : illimitée)
+            reload_interval: Intervalle de surveillance du fichier de données, en
+                secondes, pour le rechargement à chaud (None : pas de surveillance)
+            lazy: Ne charge ni spaCy, ni le classificateur, ni l'index à la
+                construction : ils le sont à la première requête, ou en
+                arrière-plan via warm_up()
+            candidate_limit: Nombre d'intentions présélectionnées par l'index
+                lexical BM25 avant le calcul complet des scores (None : toutes
+                les intentions sont évaluées)
+            candidate_fallback: Comportement quand la présélection est vide
+                ("full" ou "none", voir CANDIDATE_FALLBACKS)
+            fast_path: Répond directement, avant le classificateur, aux requêtes
+                identiques à un texte de la base ou composées de mots-clés
+                d'une seule intention
+            preprocess_cache_size: Nombre de textes prétraités mémorisés (0 : pas de cache)
+            string_similarity: Mesure de similarité de chaînes ("sequence" ou
+                "ngram", voir STRING_SIMILARITIES)
+            metrics_sample_rate: Part des requêtes dont les étapes sont chronométrées
+                (0 : aucune, voir PipelineMetrics)
+            debug: Journalise le détail des scores de chaque intention à chaque requête
         """
+        if pipeline_profile not in PIPELINE_PROFILES:
+            raise ValueError(
+                f"Profil de pipeline inconnu: {pipeline_profile} "
+                f"(profils disponibles: {', '.join(PIPELINE_PROFILES)})"
+            )
+        if candidate_fallback not in CANDIDATE_FALLBACKS:
+            raise ValueError(
+                f"Repli de présélection inconnu: {candidate_fallback} "
+                f"(valeurs possibles: {', '.join(CANDIDATE_FALLBACKS)})"
+            )
+        if candidate_limit is not None and candidate_limit < 0:
+            raise ValueError(f"Nombre de candidates négatif: {candidate_limit}")
+        if string_similarity not in STRING_SIMILARITIES:
+            raise ValueError(
+                f"Similarité de chaînes inconnue: {string_similarity} "
+                f"(valeurs possibles: {', '.join(STRING_SIMILARITIES)})"
+            )
         self.data_file = data_file
+        # Base compilée : la source JSON est dans le répertoire de l'artefact
+        source_file = kb_artifact.artifact_source(data_file)
+        self.artifact_dir = source_file.parent if source_file is not None else None
+        # Fichier JSON et journal des modifications de DataManager
+        self.store = KnowledgeBaseStore(source_file or data_file)
         self.similarity_threshold = similarity_threshold
-        self.knowledge_base = self._load_data()
+        self.pipeline_profile = pipeline_profile
+        self.model_name = model_name
+        self.candidate_limit = candidate_limit
+        self.candidate_fallback = candidate_fallback
+        self.fast_path = fast_path
+        self.string_similarity = string_similarity
+        self.debug = debug
+        # Durées par étape du pipeline et compteurs de requêtes
+        self.metrics = PipelineMetrics(metrics_sample_rate)
+        # Nombre de requêtes traitées par chemin (exact, keyword, classifier, scoring, cache)
+        self.path_counts: Counter = Counter()
+        self._path_lock = threading.Lock()
+        self.match_cache = MatchCache(cache_size, cache_ttl) if cache_size > 0 else None
+        self.kb_version = 0
+        self._kb_stat = None
+        self._kb_digest = None
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop_watching = threading.Event()
+        self.index: Optional[KnowledgeBaseIndex] = None
+        self.preprocess_cache_size = preprocess_cache_size
+        self.nlp = None
+        self.intent_classifier = None
+        self._ready = threading.Event()
+        self._load_lock = threading.Lock()
+        self._loading = False
+        self._load_error: Optional[BaseException] = None
+        # Base lue mais pas encore indexée (jusqu'au chargement des modèles)
+        self._pending_data: Optional[Dict] = self._load_data()
+        
+        # Expressions génériques à supprimer et fautes fréquentes
+        self.GENERIC_PATTERNS = list(GENERIC_PATTERNS)
+        self.COMMON_MISTAKES = dict(COMMON_MISTAKES)
+        
+        if not lazy:
+            self.ensure_ready()
+        
+        if reload_interval:
+            self.start_auto_reload(reload_interval)
+    
+    def ensure_ready(self) -> None:
+        """
+        Charge le modèle spaCy et le classificateur puis construit l'index, une seule fois
+        
+        Les appels concurrents attendent la fin du chargement en cours. En cas
+        d'échec, l'erreur est propagée et le chargement sera retenté au
+        prochain appel.
+        """
+        if self._ready.is_set():
+            return
+        with self._load_lock:
+            if self._ready.is_set():
+                return
+            self._loading = True
+            try:
+                self._load_models()
+            except Exception as e:
+                self._load_error = e
+                raise
+            finally:
+                self._loading = False
+            self._load_error = None
+            self._ready.set()
+    
+    def warm_up(self) -> None:
+        """Lance le chargement des modèles dans un thread d'arrière-plan"""
+        if self._ready.is_set():
+            return
+        self._loading = True
+        
+        def load():
+            try:
+                self.ensure_ready()
+            except Exception as e:
+                logger.error(f"❌ Échec du préchargement du détecteur d'intentions: {e}")
+        
+        threading.Thread(target=load, name="matcher-warmup", daemon=True).start()
+    
+    def is_ready(self) -> bool:
+        """Indique si les modèles sont chargés et l'index construit"""
+        return self._ready.is_set()
+    
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Attend la fin du chargement des modèles
         
-        # Chargement du modèle spaCy français
+        Args:
+            timeout: Délai maximal d'attente, en secondes (None : illimité)
+            
+        Returns:
+            True si le détecteur est prêt
+        """
+        return self._ready.wait(timeout)
+    
+    def get_readiness(self) -> Dict:
+        """État du chargement : prêt, en cours, dernière erreur"""
+        return {
+            "ready": self._ready.is_set(),
+            "loading": self._loading,
+            "error": str(self._load_error) if self._load_error is not None else None,
+        }
+    
+    def _load_models(self) -> None:
+        """Chargement effectif du modèle spaCy, du classificateur et de l'index"""
+        # Import différé : le classificateur importe spaCy
+        from ..nlp.intent_classifier import IntentClassifier
+        model_name = self.model_name
+        pipeline_profile = self.pipeline_profile
+        
+        # Chargement du modèle spaCy français, limité aux composants du profil
         try:
-            self.nlp = spacy.load("fr_core_news_md")
-            logger.info("✅ Modèle spaCy fr_core_news_md chargé avec succès")
+            self.nlp = load_model(model_name, exclude=PIPELINE_PROFILES[pipeline_profile])
+            logger.info(f"✅ Modèle spaCy {model_name} chargé avec succès (profil: {pipeline_profile})")
         except IOError:
-            logger.error("❌ Erreur: Le modèle spaCy 'fr_core_news_md' n'est pas installé.")
-            logger.info("📦 Installez-le avec: python -m spacy download fr_core_news_md")
+            logger.error(f"❌ Erreur: Le modèle spaCy '{model_name}' n'est pas installé.")
+            logger.info(f"📦 Installez-le avec: python -m spacy download {model_name}")
             raise
+        # Sans lemmatiseur (profil vectors-only), la forme minuscule remplace le lemme
+        self._use_lemmas = "lemmatizer" in self.nlp.pipe_names
         
         # Chargement du classificateur d'intentions
         model_path = Path("models/intent_classifier")
         if model_path.exists():
-            self.intent_classifier = IntentClassifier.load(str(model_path))
+            self.intent_classifier = IntentClassifier.load(str(model_path), base_model=model_name)
             logger.info("✅ Classificateur d'intentions chargé")
         else:
             self.intent_classifier = None
             logger.warning("⚠️ Aucun modèle de classification d'intentions trouvé")
         
-        # Expressions génériques à supprimer
-        self.GENERIC_PATTERNS = [
-            r"^est-ce que\s+", r"^peut-on\s+", r"^je voudrais\s+", r"^je veux\s+",
-            r"^comment faire( pour)?\s+", r"^j'aimerais savoir\s+", r"^je souhaite\s+",
-            r"^pourriez-vous\s+", r"^pouvez-vous\s+", r"^serait-il possible de\s+"
-        ]
-        # Fautes fréquentes
-        self.COMMON_MISTAKES = {
-            "modifiacation": "modification",
-            "modifiaction": "modification",
-            "modifcation": "modification",
-            "modiffication": "modification"
-        }
+        # Index précalculé des textes de la base (prétraitement et vecteurs)
+        self._build_index(self._pending_data, self._kb_digest)
+        self._pending_data = None
+    
+    @property
+    def preprocessor(self) -> Optional[TextPreprocessor]:
+        """Préprocesseur des requêtes de l'index en service (son correcteur connaît le vocabulaire de la base)"""
+        index = self.index
+        return index.preprocessor if index is not None else None
+    
+    @property
+    def knowledge_base(self) -> Dict:
+        """Contenu de la base de connaissances actuellement en service"""
+        index = self.index
+        return index.knowledge_base if index is not None else self._pending_data
+    
+    def pipeline_signature(self) -> str:
+        """Signature du prétraitement en service, comparée à celle d'une base compilée"""
+        return kb_artifact.pipeline_signature(self.nlp, self._use_lemmas, self.GENERIC_PATTERNS,
+                                              self.COMMON_MISTAKES)
+    
+    def _open_artifact(self, digest: Optional[str]) -> Optional[kb_artifact.KnowledgeBaseArtifact]:
+        """
+        Base compilée utilisable pour la source d'empreinte digest, ou None
+        
+        Sans empreinte (base modifiée en mémoire, voir update_intents),
+        l'artefact ne décrit plus la base et n'est pas ouvert.
+        """
+        if self.artifact_dir is None or digest is None:
+            return None
+        try:
+            artifact = kb_artifact.KnowledgeBaseArtifact(self.artifact_dir)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Base compilée {self.artifact_dir} illisible, réindexation: {e}")
+            return None
+        if not artifact.matches(digest, self.pipeline_signature()):
+            logger.warning(f"⚠️ Base compilée {self.artifact_dir} périmée (source ou prétraitement "
+                           f"modifiés), réindexation")
+            return None
+        return artifact
+    
+    def _build_index(self, data: Dict, digest: Optional[str] = None,
+                     changed: Optional[Iterable[str]] = None) -> None:
+        """
+        (Re)construit l'index de la base de connaissances
+        
+        Le nouvel index est entièrement construit à côté de l'ancien, avec
+        son propre préprocesseur et son correcteur orthographique, puis
+        substitué en une seule affectation : les requêtes en cours continuent
+        d'utiliser l'ancien index et l'ancien correcteur, et ne voient jamais
+        une base à moitié construite. Si la construction échoue, rien n'est
+        substitué. Les intentions inchangées réutilisent les textes déjà
+        indexés, sauf celles de changed. Si la base est compilée et que l'artefact correspond à la
+        source (empreinte digest) et au prétraitement, l'index est ouvert
+        depuis l'artefact. La version de la base est incrémentée : les
+        décisions mises en cache pour une version antérieure ne sont plus
+        utilisées.
+        """
+        artifact = self._open_artifact(digest)
+        # Une base compilée fournit le correcteur complet des requêtes
+        compiled_speller = artifact.speller(known=self.nlp.vocab.has_vector) if artifact is not None else None
+        if compiled_speller is not None:
+            speller = compiled_speller
+        else:
+            # Correcteur orthographique : mots de la base et corrections des
+            # fautes fréquentes, utilisé pour prétraiter la base elle-même
+            words = [word for text in self._source_texts(data) for word in re.findall(r"\w+", text.lower())]
+            speller = SpellingCorrector(chain(words, self.COMMON_MISTAKES.values()),
+                                        known=self.nlp.vocab.has_vector)
+        # Le préprocesseur est propre au nouvel index : celui en service n'est jamais modifié
+        preprocessor = TextPreprocessor(self.nlp, self.GENERIC_PATTERNS, self.COMMON_MISTAKES, speller=speller,
+                                        use_lemmas=self._use_lemmas, cache_size=self.preprocess_cache_size)
+        if artifact is not None:
+            index = KnowledgeBaseIndex.from_artifact(artifact, data, preprocessor.preprocess, self._vectorize)
+        else:
+            index = KnowledgeBaseIndex(data, preprocessor.preprocess, self._vectorize,
+                                       previous=self.index, changed=changed)
+        if compiled_speller is None:
+            # Les lemmes de la base complètent ensuite le vocabulaire des requêtes
+            lemmas = [token for intent in index.intent_list
+                      for entry in intent.keywords + intent.examples + intent.variations
+                      for token in entry.tokens]
+            preprocessor.set_speller(SpellingCorrector(chain(speller.frequencies.elements(), lemmas),
+                                                       known=self.nlp.vocab.has_vector))
+        index.preprocessor = preprocessor
+        if self.string_similarity == "ngram":
+            # Index de n-grammes construits avant la mise en service
+            for kind in TEXT_KINDS:
+                index.ngram_index(kind)
+        self.index = index
+        self.kb_version += 1
+        if self.match_cache is not None:
+            self.match_cache.clear()
+    
+    @staticmethod
+    def _source_texts(data: Dict) -> Iterable[str]:
+        """Tous les mots-clés, questions et variations de la base"""
+        for family in INTENT_FAMILIES:
+            for entry in family.entries(data).values():
+                yield from chain(*IndexedIntent.source_texts(entry))
     
     def _load_data(self) -> Dict:
-        """Charge les données depuis le fichier JSON"""
+        """Charge les données depuis le fichier JSON et son journal de modifications"""
         try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                logger.info(f"✅ Données chargées depuis {self.data_file}")
-                logger.info(f"📊 {len(data.get('categories', {}))} catégories trouvées")
-                return data
+            stat = self.store.stat()
+            content = self.store.read()
+            data = self.store.decode(content)
+            self._kb_stat = stat
+            self._kb_digest = self.store.digest(content)
+            logger.info(f"✅ Données chargées depuis {self.data_file}")
+            logger.info(f"📊 {len(data.get('categories', {}))} catégories trouvées")
+            return data
         except FileNotFoundError:
             logger.error(f"❌ Erreur: Fichier {self.data_file} non trouvé")
             raise
@@ -77,96 +364,293 @@ class IntentMatcher:
             logger.error(f"❌ Erreur: Format JSON invalide dans {self.data_file}")
             raise
     
-    def _preprocess_text(self, text: str) -> str:
+    def reload(self, force: bool = False) -> bool:
+        """
+        Recharge le fichier de données s'il a changé et reconstruit l'index
+        
+        Un fichier illisible (écriture en cours, JSON invalide) est ignoré :
+        l'index actuel reste en service et le rechargement sera retenté.
+        
+        Args:
+            force: Reconstruit l'index même si le contenu du fichier est identique
+            
+        Returns:
+            True si un nouvel index a été mis en service
+        """
+        with self._reload_lock:
+            try:
+                stat = self.store.stat()
+                if not force and stat == self._kb_stat:
+                    return False
+                content = self.store.read()
+                digest = self.store.digest(content)
+                if not force and digest == self._kb_digest:
+                    self._kb_stat = stat
+                    return False
+                data = self.store.decode(content)
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Rechargement de {self.data_file} impossible: {e}")
+                return False
+            
+            with self._load_lock:
+                if not self._ready.is_set():
+                    # Modèles pas encore chargés : la nouvelle base sera indexée au chargement
+                    self._pending_data = data
+                    self._kb_stat = stat
+                    self._kb_digest = digest
+                    logger.info("🔄 Base de connaissances relue, indexation au chargement des modèles")
+                    return True
+            
+            try:
+                self._build_index(data, digest)
+            except Exception as e:
+                logger.error(f"❌ Indexation de {self.data_file} impossible, l'index actuel reste en service: {e}")
+                return False
+            self._kb_stat = stat
+            self._kb_digest = digest
+            logger.info(f"🔄 Base de connaissances rechargée (version {self.kb_version})")
+            return True
+    
+    def update_intents(self, knowledge_base: Dict, changed: Iterable[str] = ()) -> None:
+        """
+        Met en service une base modifiée en ne réindexant que les intentions touchées
+        
+        Prévue pour être abonnée aux modifications d'un DataManager
+        (data_manager.subscribe(matcher.update_intents)) : les autres
+        intentions reprennent les textes déjà indexés.
+        
+        Args:
+            knowledge_base: Base après modification
+            changed: Intentions modifiées (réindexées même si leurs données
+                ont été modifiées sur place)
+        """
+        changed = set(changed)
+        with self._reload_lock:
+            with self._load_lock:
+                if not self._ready.is_set():
+                    # Base modifiée : l'empreinte du fichier ne la décrit plus
+                    self._pending_data = knowledge_base
+                    self._kb_digest = None
+                    return
+            self._build_index(knowledge_base, changed=changed)
+            logger.info(f"🔄 Base de connaissances mise à jour (version {self.kb_version}, "
+                        f"{len(changed)} intention(s) modifiée(s))")
+    
+    def start_auto_reload(self, interval: float = 2.0) -> None:
+        """
+        Surveille le fichier de données dans un thread d'arrière-plan
+        
+        Args:
+            interval: Intervalle entre deux vérifications, en secondes
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_watching.clear()
+        
+        def watch():
+            while not self._stop_watching.wait(interval):
+                try:
+                    self.reload()
+                except Exception:
+                    logger.exception("❌ Erreur lors du rechargement de la base de connaissances")
+        
+        self._watcher = threading.Thread(target=watch, name="kb-reloader", daemon=True)
+        self._watcher.start()
+        logger.info(f"👀 Surveillance de {self.data_file} (toutes les {interval}s)")
+    
+    def stop_auto_reload(self) -> None:
+        """Arrête la surveillance du fichier de données"""
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+    
+    def _preprocess_text(self, text: str, index: Optional[KnowledgeBaseIndex] = None) -> str:
         """
         Prétraite le texte pour améliorer la détection d'intention.
         
         Args:
             text: Le texte à prétraiter
+            index: Index dont le préprocesseur est utilisé (par défaut celui en service)
             
         Returns:
             Le texte prétraité
         """
-        text = text.lower().strip()
-        # Suppression des tournures génériques
-        for pattern in self.GENERIC_PATTERNS:
-            text = re.sub(pattern, "", text)
-        # Correction fautes fréquentes et fuzzy
-        words = text.split()
-        corrected = []
-        for w in words:
-            if w in self.COMMON_MISTAKES:
-                corrected.append(self.COMMON_MISTAKES[w])
-            else:
-                close = get_close_matches(w, self.COMMON_MISTAKES.values(), n=1, cutoff=0.85)
-                corrected.append(close[0] if close else w)
-        text = " ".join(corrected)
         # spaCy : lemmatisation et suppression des stopwords/ponctuation
-        doc = self.nlp(text)
-        tokens = [token.lemma_ for token in doc if not token.is_stop and not token.is_punct]
-        return " ".join(tokens)
+        return (self.index if index is None else index).preprocessor.preprocess(text)
+    
+    def _preprocess_batch(self, texts: List[str], batch_size: int = 64, n_process: int = 1,
+                          index: Optional[KnowledgeBaseIndex] = None) -> List[str]:
+        """
+        Prétraite une liste de textes en un seul passage spaCy (nlp.pipe)
+        
+        Args:
+            texts: Les textes à prétraiter
+            batch_size: Nombre de textes par lot spaCy
+            n_process: Nombre de processus spaCy
+            index: Index dont le préprocesseur est utilisé (par défaut celui en service)
+            
+        Returns:
+            Les textes prétraités, dans le même ordre
+        """
+        return (self.index if index is None else index).preprocessor.preprocess_batch(texts, batch_size, n_process)
     
     def _calculate_string_similarity(self, text1: str, text2: str) -> float:
         """Calcule la similarité entre deux textes avec SequenceMatcher"""
         return SequenceMatcher(None, text1, text2).ratio()
     
-    def _calculate_vector_similarity(self, text1: str, text2: str) -> float:
-        """Calcule la similarité vectorielle avec spaCy"""
-        doc1 = self.nlp(text1)
-        doc2 = self.nlp(text2)
+    def _vectorize(self, text: str) -> Tuple[np.ndarray, bool]:
+        """
+        Calcule le vecteur moyen spaCy d'un texte et indique s'il en possède un
         
-        if doc1.has_vector and doc2.has_vector:
-            return doc1.similarity(doc2)
-        return 0.0
+        Les vecteurs statiques ne dépendent que des tokens : le tokenizer seul
+        suffit, sans exécuter les composants du pipeline.
+        """
+        doc = self.nlp.make_doc(text)
+        return doc.vector, doc.has_vector
     
-    def _calculate_keyword_match_score(self, user_input: str, keywords: List[str]) -> float:
+    def _keyword_row_scores(self, query: IndexedText, keywords: List[str],
+                            semantic: np.ndarray, similar: Optional[np.ndarray] = None) -> np.ndarray:
         """
-        Calcule un score basé sur la présence des mots-clés et leur similarité sémantique.
+        Calcule le score de chaque mot-clé pour la requête
         
         Args:
-            user_input: Le texte de l'utilisateur
-            keywords: Liste des mots-clés à comparer
+            query: Requête utilisateur indexée
+            keywords: Mots-clés prétraités
+            semantic: Similarité sémantique requête / mot-clé, une valeur par mot-clé
+            similar: Meilleure similarité de chaînes entre chaque mot-clé et les
+                mots de la requête, si elle est déjà calculée (backend ngram)
             
         Returns:
-            Score de similarité entre 0 et 1
+            Score pondéré de chaque mot-clé (non normalisé)
         """
-        user_input = self._preprocess_text(user_input)
-        user_words = set(user_input.split())
+        user_words = query.tokens
         
         # Score pour les mots-clés exacts
-        exact_matches = sum(1 for keyword in keywords if self._preprocess_text(keyword) in user_words)
+        exact_matches = np.array([keyword in user_words for keyword in keywords], dtype=bool)
         
         # Score pour les mots-clés partiels
-        partial_matches = sum(1 for keyword in keywords 
-                            if any(self._preprocess_text(keyword) in word 
-                                  for word in user_words))
+        partial_matches = np.array([any(keyword in word for word in user_words)
+                                    for keyword in keywords], dtype=bool)
         
         # Score pour les mots-clés similaires (similarité de chaînes)
-        similar_matches = sum(1 for keyword in keywords 
-                            if any(self._calculate_string_similarity(self._preprocess_text(keyword), word) > 0.8 
-                                  for word in user_words))
+        if similar is not None:
+            similar_matches = similar > 0.8
+        else:
+            similar_matches = np.array([any(self._calculate_string_similarity(keyword, word) > 0.8
+                                            for word in user_words)
+                                        for keyword in keywords], dtype=bool)
         
         # Score pour les similarités sémantiques avec spaCy
-        semantic_matches = 0
-        user_doc = self.nlp(user_input)
-        for keyword in keywords:
-            keyword_doc = self.nlp(keyword)
-            if user_doc.has_vector and keyword_doc.has_vector:
-                similarity = user_doc.similarity(keyword_doc)
-                if similarity > 0.7:  # Seuil de similarité sémantique
-                    semantic_matches += 1
+        semantic_matches = semantic > 0.7  # Seuil de similarité sémantique
         
         # Combinaison des scores avec des poids ajustés
-        total_score = (
+        return (
             exact_matches * 1.0 +      # Score complet pour les correspondances exactes
             partial_matches * 0.7 +    # Score partiel pour les correspondances partielles
             similar_matches * 0.5 +    # Score plus faible pour les similarités de chaînes
             semantic_matches * 0.8     # Score élevé pour les similarités sémantiques
         )
+    
+    def _candidates(self, index: KnowledgeBaseIndex, query: IndexedText,
+                    limit: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        Premier étage : présélection lexicale (BM25) des intentions à évaluer
         
-        # Normalisation du score
-        max_possible_score = len(keywords) * 1.0
-        return min(total_score / max_possible_score, 1.0) if max_possible_score > 0 else 0.0
+        Args:
+            index: Index de la base de connaissances
+            query: Requête utilisateur indexée
+            limit: Nombre de candidates (None : candidate_limit, 0 : pas de
+                présélection)
+            
+        Returns:
+            Indices des intentions candidates, ou None pour évaluer toute la base
+        """
+        if limit is None:
+            limit = self.candidate_limit
+        elif limit < 0:
+            raise ValueError(f"Nombre de candidates négatif: {limit}")
+        if not limit:
+            return None
+        candidates = index.lexical.shortlist(query.tokens, limit)
+        if len(candidates) == 0 and self.candidate_fallback == "full":
+            return None
+        return candidates
+    
+    def _score_intents(self, index: KnowledgeBaseIndex, query: IndexedText,
+                       cosines: Optional[np.ndarray] = None,
+                       candidates: Optional[np.ndarray] = None
+                       ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calcule les scores des intentions de l'index
+        
+        Les cosinus avec l'ensemble de la base sont obtenus en un seul produit
+        matriciel, puis réduits par intention. Les similarités de chaînes,
+        coûteuses, ne sont calculées que pour les textes des intentions
+        candidates.
+        
+        Args:
+            index: Index de la base de connaissances
+            query: Requête utilisateur indexée
+            cosines: Cosinus de la requête déjà calculés (traitement par lot)
+            candidates: Indices des intentions à évaluer (None : toutes)
+            
+        Returns:
+            Scores mots-clés, exemples et variations, un par intention (seuls
+            ceux des candidates sont significatifs). Les scores d'une intention
+            ne dépendent pas des autres candidates : la base peut être évaluée
+            par blocs d'intentions.
+        """
+        engine = index.engine
+        metrics = self.metrics
+        
+        def columns(kind: str) -> np.ndarray:
+            if candidates is None:
+                return np.arange(len(engine.texts[kind]))
+            return engine.kind_columns(kind, candidates)
+        
+        if cosines is None:
+            with metrics.stage("cosines"):
+                cosines = engine.cosine(engine.normalize(query.vector, query.has_vector)[None, :])[0]
+        
+        # 1. Score des mots-clés
+        with metrics.stage("keywords"):
+            keywords = engine.texts["keywords"]
+            selected = columns("keywords")
+            keyword_rows = np.zeros(len(keywords))
+            if len(selected):
+                similar = None
+                if self.string_similarity == "ngram":
+                    similar = index.ngram_index("keywords").max_similarity(query.tokens)[selected]
+                keyword_rows[selected] = self._keyword_row_scores(
+                    query, [keywords[j] for j in selected],
+                    engine.kind_values("keywords", cosines)[selected], similar
+                )
+            keyword_counts = engine.segment_counts["keywords"]
+            keyword_scores = np.minimum(
+                engine.segment_sum("keywords", keyword_rows) / np.maximum(keyword_counts, 1), 1.0
+            )
+        
+        # 2. et 3. Score des exemples et des variations
+        combined = {}
+        for kind in ("examples", "variations"):
+            with metrics.stage(kind):
+                # Similarité de chaînes
+                texts = engine.texts[kind]
+                selected = columns(kind)
+                string_similarity = np.zeros(len(texts))
+                if self.string_similarity == "ngram":
+                    string_similarity[selected] = index.ngram_index(kind).similarity(query.processed)[selected]
+                else:
+                    string_similarity[selected] = [
+                        self._calculate_string_similarity(query.processed, texts[j]) for j in selected
+                    ]
+                # Similarité vectorielle
+                vector_similarity = engine.kind_values(kind, cosines)
+                # Score combiné
+                combined[kind] = engine.segment_max(kind, (string_similarity * 0.4) + (vector_similarity * 0.6))
+        
+        return keyword_scores, combined["examples"], combined["variations"]
     
     def find_best_match(self, user_input: str) -> Tuple[Optional[str], float, Optional[Dict]]:
         """
@@ -181,148 +665,335 @@ class IntentMatcher:
             - Le score de confiance (0-1)
             - Les données de la catégorie (or None)
         """
-        logger.info(f"🔍 Analyse de la requête: '{user_input}'")
+        return self.find_best_match_with_path(user_input)[:3]
+    
+    def find_best_match_with_path(self, user_input: str) -> Tuple[Optional[str], float, Optional[Dict], str]:
+        """
+        Trouve la meilleure correspondance et indique le chemin qui l'a produite
+        
+        Chemins, dans l'ordre où ils sont essayés :
+        - exact : la requête est une question, variation ou mot-clé de la base
+        - keyword : tous les lemmes de la requête sont des mots-clés d'une seule intention
+        - classifier : prédiction du classificateur au-dessus du seuil
+        - scoring : calcul complet des scores
+        
+        Returns:
+            Le tuple de find_best_match suivi du chemin
+        """
+        self.ensure_ready()
+        with self.metrics.query():
+            return self._find_best_match_with_path(self.index, user_input)
+    
+    def _find_best_match_with_path(self, index: KnowledgeBaseIndex,
+                                   user_input: str) -> Tuple[Optional[str], float, Optional[Dict], str]:
+        logger.debug("🔍 Analyse de la requête: '%s'", user_input)
+        metrics = self.metrics
+        
+        # Chemins rapides : réponse directe sans classificateur ni calcul des scores
+        processed = None
+        if self.fast_path:
+            intent = index.lookup_exact(user_input)
+            if intent is not None:
+                return self._fast_match(intent, "exact")
+            with metrics.stage("preprocessing"):
+                processed = self._preprocess_text(user_input, index)
+            intent = index.lookup_keywords(processed.split())
+            if intent is not None:
+                return self._fast_match(intent, "keyword")
         
         # Si le classificateur d'intentions est disponible, l'utiliser en premier
         if self.intent_classifier:
-            intent, confidence = self.intent_classifier.predict(user_input)
-            if confidence > self.similarity_threshold:
-                logger.info(f"✅ Intention détectée par le classificateur: {intent} (score: {confidence:.2f})")
-                
-                # Si c'est une FAQ
-                if intent.startswith("faq_"):
-                    faq_id = intent[4:]  # Enlever le préfixe "faq_"
-                    faq_data = self.knowledge_base.get("faq", {}).get(faq_id)
-                    if faq_data:
-                        return intent, confidence, faq_data
-                
-                # Si c'est une catégorie principale
-                category_data = self.knowledge_base.get("categories", {}).get(intent)
-                if category_data:
-                    return intent, confidence, category_data
+            with metrics.stage("classifier"):
+                intent, confidence = self.intent_classifier.predict(user_input)
+            classified = self._classifier_match(intent, confidence)
+            if classified:
+                self._count_path("classifier")
+                return classified + ("classifier",)
         
         # Si le classificateur n'est pas disponible ou n'a pas trouvé de correspondance,
-        # utiliser la méthode traditionnelle
-        user_input = self._preprocess_text(user_input)
-        best_match = None
-        best_score = 0.0
-        best_category_data = None
-        
-        # Parcours des catégories principales
-        for category_id, category in self.knowledge_base.get("categories", {}).items():
-            logger.info(f"\n📌 Analyse de la catégorie: {category.get('title', category_id)}")
-            
-            # 1. Score des mots-clés
-            keyword_score = self._calculate_keyword_match_score(
-                user_input,
-                category.get("keywords", [])
-            )
-            logger.info(f"  - Score mots-clés: {keyword_score:.2f}")
-            
-            # 2. Score des exemples
-            example_scores = []
-            for example in category.get("examples", {}).get("questions", []):
-                example = self._preprocess_text(example)
-                # Similarité de chaînes
-                string_similarity = self._calculate_string_similarity(user_input, example)
-                # Similarité vectorielle
-                vector_similarity = self._calculate_vector_similarity(user_input, example)
-                # Score combiné
-                score = (string_similarity * 0.4) + (vector_similarity * 0.6)
-                example_scores.append(score)
+        # utiliser la méthode traditionnelle. La requête est prétraitée et vectorisée
+        # une seule fois, les textes de la base sont lus depuis l'index.
+        if processed is None:
+            with metrics.stage("preprocessing"):
+                processed = self._preprocess_text(user_input, index)
+        with metrics.stage("query_vector"):
+            query = index.make_text(user_input, processed)
+        candidates = self._candidates(index, query)
+        self._count_path("scoring")
+        return self._best_match(index, query, candidates=candidates) + ("scoring",)
+    
+    def _fast_match(self, intent: IndexedIntent, path: str) -> Tuple[str, float, Dict, str]:
+        """Réponse directe d'un chemin rapide, avec une confiance maximale"""
+        logger.info(f"⚡ Réponse directe ({path}): {intent.intent_id}")
+        self._count_path(path)
+        return intent.intent_id, 1.0, intent.data, path
+    
+    def _count_path(self, path: str, count: int = 1) -> None:
+        with self._path_lock:
+            self.path_counts[path] += count
+        self.metrics.increment("queries", count, path=path)
+    
+    def get_path_stats(self) -> Dict:
+        """Nombre de requêtes traitées par chaque chemin et part de chacun"""
+        with self._path_lock:
+            counts = dict(self.path_counts)
+        total = sum(counts.values())
+        return {
+            "counts": counts,
+            "rates": {path: count / total if total else 0.0 for path, count in counts.items()},
+        }
+    
+    def find_best_matches(self, texts: Iterable[str], batch_size: int = 64,
+                          n_process: int = 1) -> List[Tuple[Optional[str], float, Optional[Dict]]]:
+        """
+        Trouve la meilleure correspondance pour un lot de requêtes
+        
+        Les chemins rapides, le classificateur et le prétraitement spaCy
+        traitent tout le lot via nlp.pipe, puis les cosinus de toutes les
+        requêtes restantes avec la base sont calculés en un seul produit
+        matriciel.
+        
+        Args:
+            texts: Les textes à analyser
+            batch_size: Nombre de textes par lot spaCy
+            n_process: Nombre de processus spaCy
             
-            example_score = max(example_scores) if example_scores else 0.0
-            logger.info(f"  - Score exemples: {example_score:.2f}")
+        Returns:
+            Un tuple par texte, identique à celui de find_best_match
+        """
+        self.ensure_ready()
+        index = self.index
+        texts = list(texts)
+        results: List[Tuple[Optional[str], float, Optional[Dict]]] = [(None, 0.0, None)] * len(texts)
+        pending = list(range(len(texts)))
+        processed: Dict[int, str] = {}
+        
+        if self.fast_path and texts:
+            remaining = []
+            for i in pending:
+                intent = index.lookup_exact(texts[i])
+                if intent is not None:
+                    results[i] = (intent.intent_id, 1.0, intent.data)
+                    self._count_path("exact")
+                else:
+                    remaining.append(i)
+            processed = dict(zip(remaining, self._preprocess_batch([texts[i] for i in remaining],
+                                                                   batch_size, n_process, index)))
+            pending = []
+            for i in remaining:
+                intent = index.lookup_keywords(processed[i].split())
+                if intent is not None:
+                    results[i] = (intent.intent_id, 1.0, intent.data)
+                    self._count_path("keyword")
+                else:
+                    pending.append(i)
+        
+        if self.intent_classifier and pending:
+            predictions = self.intent_classifier.predict_batch([texts[i] for i in pending],
+                                                               batch_size=batch_size, n_process=n_process)
+            remaining = []
+            for i, (intent, confidence) in zip(pending, predictions):
+                classified = self._classifier_match(intent, confidence, log=False)
+                if classified:
+                    results[i] = classified
+                    self._count_path("classifier")
+                else:
+                    remaining.append(i)
+            pending = remaining
+        
+        if pending:
+            engine = index.engine
+            missing = [i for i in pending if i not in processed]
+            processed.update(zip(missing, self._preprocess_batch([texts[i] for i in missing],
+                                                                 batch_size, n_process, index)))
+            queries = [index.make_text(texts[i], processed[i]) for i in pending]
             
-            # 3. Score des variations
-            variation_scores = []
-            for variation in category.get("examples", {}).get("variations", []):
-                variation = self._preprocess_text(variation)
-                # Similarité de chaînes
-                string_similarity = self._calculate_string_similarity(user_input, variation)
-                # Similarité vectorielle
-                vector_similarity = self._calculate_vector_similarity(user_input, variation)
-                # Score combiné
-                score = (string_similarity * 0.4) + (vector_similarity * 0.6)
-                variation_scores.append(score)
+            # Cosinus de toutes les requêtes du lot en un seul produit matriciel
+            cosines = engine.cosine(np.stack([
+                engine.normalize(q.vector, q.has_vector) for q in queries
+            ]))
+            for j, i in enumerate(pending):
+                candidates = self._candidates(index, queries[j])
+                results[i] = self._best_match(index, queries[j], cosines=cosines[j],
+                                              candidates=candidates, log_details=False)
+            self._count_path("scoring", len(pending))
+        
+        logger.info(f"📦 {len(texts)} requêtes analysées par lot")
+        return results
+    
+    def measure_candidate_recall(self, texts: Iterable[str],
+                                 limits: Iterable[int] = (5, 10, 20, 50)) -> Dict[int, Dict]:
+        """
+        Mesure la présélection lexicale par rapport au parcours complet de la base
+        
+        Pour chaque requête, l'intention retenue par le parcours complet (sans
+        classificateur) sert de référence : le rappel est la part des requêtes
+        dont la référence figure parmi les candidates.
+        
+        Args:
+            texts: Requêtes de mesure
+            limits: Nombres de candidates à évaluer
             
-            variation_score = max(variation_scores) if variation_scores else 0.0
-            logger.info(f"  - Score variations: {variation_score:.2f}")
+        Returns:
+            Pour chaque limite : rappel, accord des décisions finales avec le
+            parcours complet, nombre moyen d'intentions évaluées, temps moyen (ms)
+        """
+        self.ensure_ready()
+        index = self.index
+        positions = {intent.intent_id: i for i, intent in enumerate(index.intent_list)}
+        queries = []
+        for text in texts:
+            query = index.index_example(text)
+            reference = self._best_match(index, query, log_details=False)[0]
+            queries.append((query, reference))
+        
+        report = {}
+        for limit in limits:
+            hits = matched = agreements = evaluated = 0
+            start = time.perf_counter()
+            for query, reference in queries:
+                candidates = self._candidates(index, query, limit)
+                decision = self._best_match(index, query,
+                                            candidates=candidates, log_details=False)[0]
+                evaluated += len(index.intent_list) if candidates is None else len(candidates)
+                agreements += decision == reference
+                if reference is not None:
+                    matched += 1
+                    hits += candidates is None or positions[reference] in candidates
+            elapsed = time.perf_counter() - start
+            n = max(len(queries), 1)
+            report[limit] = {
+                "recall": hits / matched if matched else 1.0,
+                "agreement": agreements / n,
+                "mean_candidates": evaluated / n,
+                "ms_per_query": elapsed * 1000 / n,
+            }
+        return report
+    
+    def _classifier_match(self, intent: str, confidence: float,
+                          log: bool = True) -> Optional[Tuple[str, float, Dict]]:
+        """
+        Valide la prédiction du classificateur
+        
+        Returns:
+            Le tuple de correspondance si la confiance dépasse le seuil et que
+            l'intention existe dans la base, None sinon
+        """
+        if confidence > self.similarity_threshold:
+            if log:
+                logger.info(f"✅ Intention détectée par le classificateur: {intent} (score: {confidence:.2f})")
+            data = self.get_intent_data(intent)
+            if data:
+                return intent, confidence, data
+        return None
+    
+    def _best_match(self, index: KnowledgeBaseIndex, query: IndexedText,
+                    cosines: Optional[np.ndarray] = None,
+                    candidates: Optional[np.ndarray] = None,
+                    log_details: Optional[bool] = None) -> Tuple[Optional[str], float, Optional[Dict]]:
+        """
+        Sélectionne l'intention de meilleur score pour une requête indexée
+        
+        Args:
+            index: Index de la base de connaissances
+            query: Requête utilisateur indexée
+            cosines: Cosinus déjà calculés (traitement par lot)
+            candidates: Intentions présélectionnées (None : toute la base)
+            log_details: Journalise le détail des scores de chaque intention
+                (par défaut selon le mode debug)
             
+        Returns:
+            Le même tuple que find_best_match
+        """
+        if log_details is None:
+            log_details = self.debug
+        
+        keyword_scores, example_scores, variation_scores = self._score_intents(
+            index, query, cosines, candidates
+        )
+        with self.metrics.stage("ranking"):
             # Score final combiné (rééquilibré)
-            final_score = (
-                keyword_score * 0.3 +      # 30% pour les mots-clés
-                example_score * 0.5 +      # 50% pour les exemples
-                variation_score * 0.2      # 20% pour les variations
-            )
-            logger.info(f"  - Score final: {final_score:.2f}")
-            
-            if final_score > best_score:
-                best_score = final_score
-                best_match = category_id
-                best_category_data = category
-        
-        # Parcours des FAQ
-        for faq_id, faq in self.knowledge_base.get("faq", {}).items():
-            logger.info(f"\n📌 Analyse de la FAQ: {faq.get('title', faq_id)}")
-            
-            # 1. Score des mots-clés
-            keyword_score = self._calculate_keyword_match_score(
-                user_input,
-                faq.get("keywords", [])
+            final_scores = (
+                keyword_scores * 0.3 +      # 30% pour les mots-clés
+                example_scores * 0.5 +      # 50% pour les exemples
+                variation_scores * 0.2      # 20% pour les variations
             )
-            logger.info(f"  - Score mots-clés: {keyword_score:.2f}")
-            
-            # 2. Score des exemples
-            example_scores = []
-            for example in faq.get("examples", {}).get("questions", []):
-                example = self._preprocess_text(example)
-                # Similarité de chaînes
-                string_similarity = self._calculate_string_similarity(user_input, example)
-                # Similarité vectorielle
-                vector_similarity = self._calculate_vector_similarity(user_input, example)
-                # Score combiné
-                score = (string_similarity * 0.4) + (vector_similarity * 0.6)
-                example_scores.append(score)
-            
-            example_score = max(example_scores) if example_scores else 0.0
-            logger.info(f"  - Score exemples: {example_score:.2f}")
-            
-            # 3. Score des variations
-            variation_scores = []
-            for variation in faq.get("examples", {}).get("variations", []):
-                variation = self._preprocess_text(variation)
-                # Similarité de chaînes
-                string_similarity = self._calculate_string_similarity(user_input, variation)
-                # Similarité vectorielle
-                vector_similarity = self._calculate_vector_similarity(user_input, variation)
-                # Score combiné
-                score = (string_similarity * 0.4) + (vector_similarity * 0.6)
-                variation_scores.append(score)
             
-            variation_score = max(variation_scores) if variation_scores else 0.0
-            logger.info(f"  - Score variations: {variation_score:.2f}")
+            if candidates is None:
+                candidates = np.arange(len(index.intent_list))
+            elif log_details:
+                logger.info(f"🔎 {len(candidates)} intentions présélectionnées sur {len(index.intent_list)}")
             
-            # Score final combiné (rééquilibré)
-            final_score = (
-                keyword_score * 0.3 +      # 30% pour les mots-clés
-                example_score * 0.5 +      # 50% pour les exemples
-                variation_score * 0.2      # 20% pour les variations
-            )
-            logger.info(f"  - Score final: {final_score:.2f}")
+            if log_details:
+                # Détail de la table à plat des intentions, toutes familles confondues
+                for i in candidates:
+                    intent = index.intent_list[i]
+                    logger.info(f"\n📌 Analyse de la {FAMILY_TITLES[intent.family]}: {intent.label}")
+                    logger.info(f"  - Score mots-clés: {keyword_scores[i]:.2f}")
+                    logger.info(f"  - Score exemples: {example_scores[i]:.2f}")
+                    logger.info(f"  - Score variations: {variation_scores[i]:.2f}")
+                    logger.info(f"  - Score final: {final_scores[i]:.2f}")
             
-            if final_score > best_score:
-                best_score = final_score
-                best_match = f"faq_{faq_id}"
-                best_category_data = faq
+            # Première intention de score maximal, à condition qu'il soit positif
+            best_score = 0.0
+            best = None
+            if len(candidates):
+                position = int(np.argmax(final_scores[candidates]))
+                if final_scores[candidates[position]] > 0:
+                    best = index.intent_list[int(candidates[position])]
+                    best_score = float(final_scores[candidates[position]])
         
         # Vérification du seuil de confiance
-        if best_score < self.similarity_threshold:
-            logger.info(f"❌ Aucune correspondance trouvée (meilleur score: {best_score:.2f} < {self.similarity_threshold})")
+        if best is None or best_score < self.similarity_threshold:
+            if log_details:
+                logger.info(f"❌ Aucune correspondance trouvée (meilleur score: {best_score:.2f} < {self.similarity_threshold})")
             return None, 0.0, None
         
-        logger.info(f"✅ Meilleure correspondance: {best_match} (score: {best_score:.2f})")
-        return best_match, best_score, best_category_data
+        if log_details:
+            logger.info(f"✅ Meilleure correspondance: {best.intent_id} (score: {best_score:.2f})")
+        return best.intent_id, best_score, best.data
+    
+    def match(self, user_input: str) -> Tuple[Optional[str], float, Optional[Dict]]:
+        """
+        Trouve la meilleure correspondance en passant par le cache des décisions
+        
+        Seul le couple (intention, score) est mis en cache : la réponse est
+        ensuite tirée au hasard à chaque appel, ce qui préserve leur variété.
+        
+        Args:
+            user_input: Le texte saisi par l'utilisateur
+            
+        Returns:
+            Le même tuple que find_best_match
+        """
+        if self.match_cache is None:
+            return self.find_best_match(user_input)
+        
+        # Chargement avant de lire la version : la construction de l'index l'incrémente
+        self.ensure_ready()
+        key = normalize_query(user_input)
+        version = self.kb_version
+        cached = self.match_cache.get(key, version)
+        if cached is not None:
+            self._count_path("cache")
+            intent_id, score = cached
+            return intent_id, score, self.get_intent_data(intent_id)
+        
+        intent_id, score, data = self.find_best_match(user_input)
+        self.match_cache.put(key, (intent_id, score), version)
+        return intent_id, score, data
+    
+    def get_metrics(self) -> Dict:
+        """Durées par étape du pipeline et compteurs de requêtes (voir PipelineMetrics.snapshot)"""
+        return self.metrics.snapshot()
+    
+    def get_cache_stats(self) -> Dict:
+        """Statistiques du cache des décisions (vide si le cache est désactivé)"""
+        return self.match_cache.stats() if self.match_cache is not None else {}
+    
+    def get_preprocessing_stats(self) -> Dict:
+        """Statistiques du cache de prétraitement (vide avant le chargement des modèles)"""
+        return self.preprocessor.cache_stats() if self.preprocessor is not None else {}
     
     def get_response(self, user_input: str) -> str:
         """
@@ -334,28 +1005,44 @@ class IntentMatcher:
         Returns:
             La réponse du chatbot
         """
+        # Salutations et adieux : réponse immédiate, sans spaCy (y compris
+        # pendant le chargement des modèles)
+        message = normalize_query(user_input)
+        
         # Vérification des salutations
         greetings = ["bonjour", "salut", "hello", "bonsoir"]
-        if user_input.lower() in greetings:
+        if message in greetings:
             return "Bonjour ! Je suis votre assistant pour les annonces légales. Comment puis-je vous aider ?"
         
         # Vérification des adieux
         goodbyes = ["au revoir", "bye", "adieu", "à bientôt"]
-        if user_input.lower() in goodbyes:
+        if message in goodbyes:
             return "Au revoir ! N'hésitez pas à revenir si vous avez d'autres questions."
         
-        category_id, confidence, category_data = self.find_best_match(user_input)
-        
-        if category_data and category_data.get("responses"):
-            # Sélection aléatoire d'une réponse
-            import random
-            response = random.choice(category_data["responses"])
-            if isinstance(response, dict):
-                return response.get("content", "Je ne comprends pas votre question.")
-            return response
+        with self.metrics.query():
+            category_id, confidence, category_data = self.match(user_input)
+            
+            with self.metrics.stage("selection"):
+                if category_data and category_data.get("responses"):
+                    # Sélection aléatoire d'une réponse
+                    import random
+                    response = random.choice(category_data["responses"])
+                    if isinstance(response, dict):
+                        return response.get("content", "Je ne comprends pas votre question.")
+                    return response
         
         return "Je n'ai pas compris votre demande. Pouvez-vous reformuler ?"
     
+    def get_intent_data(self, intent_id: Optional[str]) -> Optional[Dict]:
+        """Récupère les données d'une intention d'après son identifiant préfixé par sa famille"""
+        if not intent_id:
+            return None
+        index = self.index
+        if index is not None:
+            intent = index.by_id.get(intent_id)
+            return intent.data if intent is not None else None
+        return find_intent_data(self.knowledge_base, intent_id)
+    
     def get_category_info(self, category_id: str) -> Optional[Dict]:
         """Récupère les informations d'une catégorie par son ID"""
         return self.knowledge_base.get("categories", {}).get(category_id)
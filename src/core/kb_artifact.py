@@ -0,0 +1,287 @@
+"""
+Base de connaissances compilée : artefact binaire de l'index, ouvert par projection mémoire.
+
+Un artefact est un répertoire (legal_data.kb par exemple) contenant :
+- knowledge_base.json : la base source, octet pour octet ;
+- manifest.json : format, empreinte SHA-256 de la source, signature du
+  pipeline qui a prétraité les textes, dimensions ;
+- strings.npy : table de chaînes (octets UTF-8 concaténés) et
+  string_offsets.npy (positions en caractères), décodée en une fois ;
+- intents.npy : famille, identifiant et clé de chaque intention ;
+- texts.npy : intention, type, texte brut, texte prétraité et présence d'un
+  vecteur de chaque texte, dans l'ordre des lignes de la matrice ;
+- vectors.npy : matrice float32 des vecteurs normalisés ;
+- lexical_*.npy : listes d'occurrences BM25 par identifiant de lemme ;
+- speller_*.npy : vocabulaire du correcteur orthographique des requêtes,
+  fréquences et index de suppressions, qui n'est pas recalculé à l'ouverture.
+
+Les tableaux sont ouverts avec np.load(mmap_mode='r') : plusieurs processus
+partagent les mêmes pages et l'ouverture ne lit que ce qui est consulté.
+Les données dérivées ne sont utilisées que si l'empreinte de
+knowledge_base.json et la signature du pipeline correspondent ; sinon la base
+est réindexée comme un fichier JSON ordinaire.
+
+Usage:
+    python -m src.core.kb_artifact legal_data.json --output legal_data.kb
+"""
+import argparse
+import hashlib
+import json
+import os
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+import numpy as np
+
+from ..nlp.spell_checker import SpellingCorrector
+
+ARTIFACT_FORMAT = 2
+MANIFEST_FILE = "manifest.json"
+SOURCE_FILE = "knowledge_base.json"
+
+
+def artifact_source(path: Union[str, Path]) -> Optional[Path]:
+    """Fichier JSON source d'un artefact, ou None si le chemin n'est pas un artefact"""
+    path = Path(path)
+    return path / SOURCE_FILE if path.is_dir() else None
+
+
+def pipeline_signature(nlp, use_lemmas: bool, patterns: List[str], common_mistakes: Dict[str, str]) -> str:
+    """Identifie le prétraitement des textes : modèle spaCy, composants et règles de normalisation"""
+    meta = nlp.meta
+    rules = hashlib.sha256(json.dumps([patterns, common_mistakes], ensure_ascii=False,
+                                      sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return (f"{meta.get('lang')}_{meta.get('name')}-{meta.get('version')}:{','.join(nlp.pipe_names)}"
+            f":{'lemmas' if use_lemmas else 'lower'}:{rules}")
+
+
+def _write_atomic(path: Path, write) -> None:
+    """Écrit un fichier sous un nom temporaire puis le substitue"""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+class StringTable:
+    """Table de chaînes dédupliquées, chacune désignée par un entier"""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._strings: List[str] = []
+
+    def add(self, text: str) -> int:
+        string_id = self._ids.get(text)
+        if string_id is None:
+            string_id = self._ids[text] = len(self._strings)
+            self._strings.append(text)
+        return string_id
+
+    def arrays(self):
+        """
+        Octets UTF-8 concaténés et positions de début de chaque chaîne (plus
+        la fin), en caractères : la table se décode en une fois puis se découpe
+        """
+        offsets = np.zeros(len(self._strings) + 1, dtype=np.int64)
+        np.cumsum([len(text) for text in self._strings], out=offsets[1:])
+        return np.frombuffer("".join(self._strings).encode("utf-8"), dtype=np.uint8), offsets
+
+
+def _speller_arrays(speller: SpellingCorrector, strings: StringTable) -> Dict[str, np.ndarray]:
+    """Vocabulaire, fréquences et index de suppressions du correcteur, les chaînes désignées par leur identifiant"""
+    words = list(speller.frequencies)
+    positions = {word: i for i, word in enumerate(words)}
+    index = speller.deletion_index()
+    counts = np.array([len(members) for members in index.values()], dtype=np.int64)
+    return {
+        "speller_words": np.array([strings.add(word) for word in words], dtype=np.int64),
+        "speller_counts": np.array([speller.frequencies[word] for word in words], dtype=np.int64),
+        "speller_keys": np.array([strings.add(key) for key in index], dtype=np.int64),
+        "speller_offsets": np.concatenate(([0], np.cumsum(counts))).astype(np.int64),
+        "speller_members": np.array([positions[word] for members in index.values() for word in members],
+                                    dtype=np.int64),
+    }
+
+
+def compile_artifact(index, output: Union[str, Path], source: bytes, pipeline: str) -> Path:
+    """
+    Écrit l'artefact d'un index construit
+
+    Le manifeste est écrit en dernier : un artefact interrompu en cours
+    d'écriture n'a pas de manifeste valide et n'est pas utilisé.
+
+    Args:
+        index: Index de la base (KnowledgeBaseIndex)
+        output: Répertoire de l'artefact
+        source: Contenu du fichier JSON indexé
+        pipeline: Signature du prétraitement (pipeline_signature)
+
+    Returns:
+        Le répertoire de l'artefact
+    """
+    from .kb_index import INTENT_FAMILIES
+    from .vector_engine import TEXT_KINDS
+
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    manifest_path = output / MANIFEST_FILE
+    if manifest_path.exists():
+        manifest_path.unlink()
+
+    strings = StringTable()
+    families = [family.key for family in INTENT_FAMILIES]
+    intents = np.array([(families.index(intent.family), strings.add(intent.intent_id), strings.add(intent.key))
+                        for intent in index.intent_list], dtype=np.int64).reshape(-1, 3)
+    texts = np.array([(i, k, strings.add(entry.raw), strings.add(entry.processed), entry.has_vector)
+                      for k, kind in enumerate(TEXT_KINDS)
+                      for i, intent in enumerate(index.intent_list)
+                      for entry in getattr(intent, kind)], dtype=np.int64).reshape(-1, 5)
+
+    # Listes d'occurrences BM25, les lemmes désignés par leur identifiant dans la table
+    postings = index.lexical.postings
+    terms = np.array([strings.add(term) for term in postings], dtype=np.int64)
+    counts = np.array([len(ids) for ids, _ in postings.values()], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+    posting_ids = np.concatenate([ids for ids, _ in postings.values()]) if postings else np.zeros(0, np.int64)
+    posting_weights = (np.concatenate([weights for _, weights in postings.values()])
+                       if postings else np.zeros(0, np.float64))
+
+    # Correcteur des requêtes (mots de la base et lemmes), s'il a été construit avec l'index
+    speller = index.preprocessor.speller if index.preprocessor is not None else None
+    speller_arrays = _speller_arrays(speller, strings) if speller is not None else {}
+
+    data, string_offsets = strings.arrays()
+    arrays = {
+        "strings": data,
+        "string_offsets": string_offsets,
+        "intents": intents,
+        "texts": texts,
+        "vectors": np.ascontiguousarray(index.engine.matrix, dtype=np.float32),
+        "lexical_terms": terms,
+        "lexical_offsets": offsets,
+        "lexical_ids": posting_ids.astype(np.int64),
+        "lexical_weights": posting_weights.astype(np.float64),
+        **speller_arrays,
+    }
+    _write_atomic(output / SOURCE_FILE, lambda f: f.write(source))
+    for name, array in arrays.items():
+        _write_atomic(output / f"{name}.npy", lambda f, array=array: np.save(f, array))
+
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "source_sha256": hashlib.sha256(source).hexdigest(),
+        "pipeline": pipeline,
+        "families": families,
+        "intents": len(intents),
+        "texts": len(texts),
+        "dim": int(index.engine.dim),
+        "speller": ({"max_distance": speller.max_distance, "min_length": speller.min_length,
+                     "words": len(speller)} if speller is not None else None),
+        "created": datetime.now().isoformat(timespec="seconds"),
+    }
+    _write_atomic(manifest_path, lambda f: f.write(json.dumps(manifest, indent=2).encode("utf-8")))
+    return output
+
+
+class KnowledgeBaseArtifact:
+    """Artefact ouvert : tableaux projetés en mémoire et accès à la table de chaînes"""
+
+    def __init__(self, directory: Union[str, Path]):
+        """
+        Args:
+            directory: Répertoire de l'artefact
+
+        Raises:
+            FileNotFoundError: Artefact absent ou incomplet (sans manifeste)
+            ValueError: Format d'artefact non pris en charge
+        """
+        self.directory = Path(directory)
+        with open(self.directory / MANIFEST_FILE, "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != ARTIFACT_FORMAT:
+            raise ValueError(f"Format d'artefact non pris en charge: {self.manifest.get('format')}")
+        self._strings = self._load("strings")
+        self._string_offsets = self._load("string_offsets")
+        self._decoded: Optional[List[str]] = None
+        self.intents = self._load("intents")
+        self.texts = self._load("texts")
+        self.vectors = self._load("vectors")
+
+    def _load(self, name: str) -> np.ndarray:
+        return np.load(self.directory / f"{name}.npy", mmap_mode="r")
+
+    def strings(self) -> List[str]:
+        """Table de chaînes, décodée en une seule fois au premier appel"""
+        if self._decoded is None:
+            text = bytes(self._strings).decode("utf-8")
+            offsets = self._string_offsets.tolist()
+            self._decoded = [text[start:end] for start, end in zip(offsets, offsets[1:])]
+        return self._decoded
+
+    def matches(self, source_digest: Optional[str], pipeline: str) -> bool:
+        """Indique si les données dérivées correspondent à la source et au prétraitement"""
+        return (self.manifest.get("source_sha256") == source_digest
+                and self.manifest.get("pipeline") == pipeline)
+
+    def lexical_postings(self) -> Dict[str, tuple]:
+        """Listes d'occurrences BM25 (lemme -> intentions, poids), vues sur les tableaux projetés"""
+        strings = self.strings()
+        offsets = self._load("lexical_offsets").tolist()
+        # Vues ndarray (et non memmap) : le découpage ne crée pas un memmap par lemme
+        ids = np.asarray(self._load("lexical_ids"))
+        weights = np.asarray(self._load("lexical_weights"))
+        return {strings[term]: (ids[start:end], weights[start:end])
+                for term, start, end in zip(self._load("lexical_terms").tolist(), offsets, offsets[1:])}
+
+    def speller(self, known: Optional[Callable[[str], bool]] = None) -> Optional[SpellingCorrector]:
+        """
+        Correcteur orthographique des requêtes enregistré avec l'index, sans
+        recalcul de l'index de suppressions
+
+        Args:
+            known: Prédicat des mots considérés comme corrects (voir SpellingCorrector)
+
+        Returns:
+            Le correcteur, ou None si l'artefact n'en contient pas
+        """
+        settings = self.manifest.get("speller")
+        if settings is None:
+            return None
+        strings = self.strings()
+        words = [strings[i] for i in self._load("speller_words").tolist()]
+        frequencies = Counter(dict(zip(words, self._load("speller_counts").tolist())))
+        members = [words[i] for i in self._load("speller_members").tolist()]
+        offsets = self._load("speller_offsets").tolist()
+        index = {strings[key]: set(members[start:end])
+                 for key, start, end in zip(self._load("speller_keys").tolist(), offsets, offsets[1:])}
+        return SpellingCorrector.from_index(frequencies, index, max_distance=settings["max_distance"],
+                                            min_length=settings["min_length"], known=known)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile une base de connaissances JSON en artefact binaire")
+    parser.add_argument("data", help="Fichier JSON de la base")
+    parser.add_argument("--output", help="Répertoire de l'artefact (défaut : <base>.kb)")
+    parser.add_argument("--profile", default="lemmas", help="Profil de pipeline spaCy")
+    parser.add_argument("--model", default="fr_core_news_md", help="Modèle spaCy")
+    args = parser.parse_args()
+
+    from .intent_matcher import IntentMatcher
+
+    matcher = IntentMatcher(args.data, pipeline_profile=args.profile, model_name=args.model)
+    output = args.output or str(Path(args.data).with_suffix(".kb"))
+    source, journal = matcher.store.read()
+    if journal:
+        parser.error(f"{matcher.store.journal_file} contient des modifications non fusionnées : "
+                     f"fusionnez-les avec DataManager.compact() avant de compiler")
+    if hashlib.sha256(source).hexdigest() != matcher._kb_digest:
+        parser.error(f"{args.data} a été modifié pendant l'indexation, relancez la compilation")
+    compile_artifact(matcher.index, output, source, matcher.pipeline_signature())
+    print(f"✅ Artefact écrit dans {output} ({len(matcher.index)} intentions, "
+          f"{matcher.index.text_count()} textes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+import logging
+import numpy as np
+from .kb_artifact import KnowledgeBaseArtifact
+from .lexical_index import LexicalIndex
+from .match_cache import normalize_query
+from .ngram_similarity import NgramSimilarityIndex
+from .vector_engine import TEXT_KINDS, VectorSimilarityEngine
+
+logger = logging.getLogger(__name__)
+
+
+# Clés du bloc de coordonnées qui décrivent l'intention plutôt qu'une coordonnée
+CONTACT_INTENT_FIELDS = ("title", "keywords", "examples", "responses", "labels")
+
+
+def contact_intents(contact: Dict) -> Dict[str, Dict]:
+    """
+    Intention « nous contacter » construite à partir du bloc de coordonnées
+
+    Chaque champ texte du bloc est une coordonnée, présentée sous son libellé
+    (table labels du bloc) ou à défaut sous son nom. Le titre, les mots-clés,
+    les exemples et les introductions des réponses proviennent eux aussi du
+    bloc ; sans mots-clés, les libellés des coordonnées en tiennent lieu.
+    """
+    labels = contact.get("labels") or {}
+    details = {field: value for field, value in contact.items()
+               if field not in CONTACT_INTENT_FIELDS and isinstance(value, str) and value}
+    if not details:
+        return {}
+    lines = "\n".join(f"{labels.get(field, field)} : {value}" for field, value in details.items())
+    intent = {
+        "keywords": contact.get("keywords") or [labels.get(field, field) for field in details],
+        "examples": contact.get("examples") or {},
+        "responses": [f"{intro}\n{lines}" if intro else lines for intro in contact.get("responses") or [""]],
+    }
+    if contact.get("title"):
+        intent["title"] = contact["title"]
+    return {"coordonnees": intent}
+
+
+class IntentFamily(NamedTuple):
+    """Famille d'intentions de la base de connaissances"""
+
+    key: str
+    """Clé du bloc dans le fichier JSON"""
+    prefix: str
+    """Préfixe des identifiants d'intention"""
+    title: str
+    """Libellé de la famille dans les logs"""
+    extract: Optional[Callable[[Dict], Dict[str, Dict]]] = None
+    """Conversion du bloc en intentions (le bloc est déjà une table d'intentions si None)"""
+    owns_keywords: bool = True
+    """Une requête composée des seuls mots-clés d'une intention de la famille obtient une réponse directe"""
+
+    def entries(self, knowledge_base: Dict) -> Dict[str, Dict]:
+        """Intentions de la famille, par clé"""
+        block = knowledge_base.get(self.key) or {}
+        return self.extract(block) if self.extract is not None else block
+
+
+# Familles d'intentions, dans l'ordre de la table à plat : une nouvelle
+# famille n'a besoin que d'une entrée ici
+INTENT_FAMILIES = (
+    IntentFamily("categories", "", "catégorie"),
+    IntentFamily("faq", "faq_", "FAQ"),
+    # Mots-clés génériques (email, téléphone...) : la fiche contact ne répond
+    # jamais directement par mots-clés
+    IntentFamily("contact", "contact_", "fiche contact", contact_intents, owns_keywords=False),
+)
+FAMILY_TITLES = {family.key: family.title for family in INTENT_FAMILIES}
+
+
+def find_intent_data(knowledge_base: Dict, intent_id: str) -> Optional[Dict]:
+    """Données d'une intention d'après son identifiant (préfixe le plus long d'abord)"""
+    for family in sorted(INTENT_FAMILIES, key=lambda f: len(f.prefix), reverse=True):
+        if intent_id.startswith(family.prefix):
+            data = family.entries(knowledge_base).get(intent_id[len(family.prefix):])
+            if data:
+                return data
+    return None
+
+
+def changed_intents(knowledge_base: Dict, path: Sequence[str]) -> Set[str]:
+    """
+    Intentions touchées par la modification d'une valeur de la base
+
+    Args:
+        knowledge_base: Base après modification
+        path: Chemin de clés de la valeur modifiée (["faq", "tarifs"] par exemple)
+    """
+    changed = set()
+    for family in INTENT_FAMILIES:
+        if not path or path[0] != family.key:
+            continue
+        if family.extract is None and len(path) > 1:
+            changed.add(f"{family.prefix}{path[1]}")
+        else:
+            # Bloc converti ou remplacé en entier : toutes ses intentions
+            changed.update(f"{family.prefix}{key}" for key in family.entries(knowledge_base))
+    return changed
+
+
+class IndexedText:
+    """Texte de la base de connaissances prétraité une seule fois au chargement"""
+
+    __slots__ = ("raw", "processed", "tokens", "vector", "has_vector")
+
+    def __init__(self, raw: str, processed: str, vector: np.ndarray, has_vector: bool):
+        """
+        Args:
+            raw: Texte original tel qu'il figure dans le fichier JSON
+            processed: Texte prétraité (lemmes sans mots vides)
+            vector: Vecteur moyen du document spaCy utilisé pour la similarité
+            has_vector: Indique si au moins un token possède un vecteur
+        """
+        self.raw = raw
+        self.processed = processed
+        self.tokens = frozenset(processed.split())
+        self.vector = vector
+        self.has_vector = has_vector
+
+    @property
+    def vector_norm(self) -> float:
+        """Norme du vecteur, calculée à la demande (le vecteur peut être projeté en mémoire)"""
+        return float(np.sqrt(np.dot(self.vector, self.vector))) if self.vector.size else 0.0
+
+    def similarity(self, other: "IndexedText") -> float:
+        """
+        Similarité cosinus équivalente à Doc.similarity de spaCy
+
+        Returns:
+            Score de similarité, 0.0 si l'un des textes n'a pas de vecteur
+        """
+        if not (self.has_vector and other.has_vector):
+            return 0.0
+        norm, other_norm = self.vector_norm, other.vector_norm
+        if norm == 0 or other_norm == 0:
+            return 0.0
+        return float(np.dot(self.vector, other.vector) / (norm * other_norm))
+
+
+class IndexedIntent:
+    """Intention (catégorie, FAQ, contact...) avec ses textes prétraités"""
+
+    __slots__ = ("intent_id", "family", "key", "data", "keywords", "examples", "variations")
+
+    def __init__(self, intent_id: str, family: str, key: str, data: Dict,
+                 keywords: List[IndexedText], examples: List[IndexedText],
+                 variations: List[IndexedText]):
+        self.intent_id = intent_id
+        self.family = family
+        self.key = key
+        self.data = data
+        self.keywords = keywords
+        self.examples = examples
+        self.variations = variations
+
+    @staticmethod
+    def source_texts(data: Dict) -> Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]:
+        """Textes indexés d'une intention : mots-clés, questions, variations"""
+        examples = data.get("examples", {})
+        return (tuple(data.get("keywords", [])),
+                tuple(examples.get("questions", [])),
+                tuple(examples.get("variations", [])))
+
+    @property
+    def label(self) -> str:
+        """Libellé lisible de l'intention pour les logs"""
+        return self.data.get("title", self.key)
+
+
+class KnowledgeBaseIndex:
+    """
+    Index précalculé de la base de connaissances.
+
+    Chaque mot-clé, exemple et variation est prétraité et vectorisé une seule
+    fois à la construction ; le calcul des scores ne fait ensuite que lire
+    l'index au lieu de relancer spaCy sur toute la base à chaque requête.
+    """
+
+    # Préprocesseur des requêtes construit avec l'index (renseigné par
+    # IntentMatcher avant la mise en service, pour que l'index et son
+    # correcteur orthographique soient substitués ensemble)
+    preprocessor = None
+
+    def __init__(self, knowledge_base: Dict,
+                 preprocess: Callable[[str], str],
+                 vectorize: Callable[[str], Tuple[np.ndarray, bool]],
+                 previous: Optional["KnowledgeBaseIndex"] = None,
+                 changed: Optional[Iterable[str]] = None):
+        """
+        Construit l'index
+
+        Args:
+            knowledge_base: Contenu du fichier JSON
+            preprocess: Fonction de prétraitement (lemmatisation)
+            vectorize: Fonction renvoyant le vecteur d'un texte et s'il en possède un
+            previous: Index précédent dont les intentions inchangées sont réutilisées
+            changed: Intentions à réindexer même si leurs textes semblent
+                inchangés (données modifiées sur place, voir changed_intents)
+        """
+        self.knowledge_base = knowledge_base
+        self._preprocess = preprocess
+        self._vectorize = vectorize
+        self.families: Dict[str, List[IndexedIntent]] = {}
+        reusable = {intent.intent_id: intent for intent in previous.intents()} if previous else {}
+        reused = 0
+        changed = set(changed or ())
+
+        for family in INTENT_FAMILIES:
+            intents = []
+            for key, data in family.entries(knowledge_base).items():
+                intent_id = f"{family.prefix}{key}"
+                keywords, questions, variations = IndexedIntent.source_texts(data)
+                old = reusable.get(intent_id)
+                if (old is not None and intent_id not in changed
+                        and IndexedIntent.source_texts(old.data) == (keywords, questions, variations)):
+                    # Textes inchangés : les entrées déjà calculées sont reprises
+                    intents.append(IndexedIntent(intent_id, family.key, key, data,
+                                                 old.keywords, old.examples, old.variations))
+                    reused += 1
+                    continue
+                intents.append(IndexedIntent(
+                    intent_id=intent_id,
+                    family=family.key,
+                    key=key,
+                    data=data,
+                    keywords=[self.index_keyword(k) for k in keywords],
+                    examples=[self.index_example(q) for q in questions],
+                    variations=[self.index_example(v) for v in variations],
+                ))
+            self.families[family.key] = intents
+
+        self._assemble()
+        logger.info(f"🗂️ Index construit : {len(self)} intentions ({reused} réutilisées), "
+                    f"{self.text_count()} textes")
+
+    @classmethod
+    def from_artifact(cls, artifact: KnowledgeBaseArtifact, knowledge_base: Dict,
+                      preprocess: Callable[[str], str],
+                      vectorize: Callable[[str], Tuple[np.ndarray, bool]]) -> "KnowledgeBaseIndex":
+        """
+        Ouvre l'index compilé d'une base (voir kb_artifact), sans prétraitement ni vectorisation
+
+        Les textes prétraités et les listes d'occurrences BM25 sont relus de
+        l'artefact ; la matrice des vecteurs reste projetée en mémoire.
+
+        Args:
+            artifact: Artefact ouvert, correspondant à la base
+            knowledge_base: Contenu de la base source de l'artefact
+            preprocess: Fonction de prétraitement (textes ajoutés ensuite)
+            vectorize: Fonction de vectorisation (textes ajoutés ensuite)
+        """
+        index = cls.__new__(cls)
+        index.knowledge_base = knowledge_base
+        index._preprocess = preprocess
+        index._vectorize = vectorize
+        index.families = {family.key: [] for family in INTENT_FAMILIES}
+
+        families = artifact.manifest["families"]
+        by_family = {family.key: family for family in INTENT_FAMILIES}
+        entries = {family: by_family[family].entries(knowledge_base) for family in families}
+        # Table de chaînes décodée une fois, lignes converties en listes Python en un seul appel
+        strings = artifact.strings()
+        intents = []
+        for family_id, id_string, key_string in artifact.intents.tolist():
+            family = families[family_id]
+            key = strings[key_string]
+            intent = IndexedIntent(strings[id_string], family, key, entries[family][key],
+                                   keywords=[], examples=[], variations=[])
+            intents.append(intent)
+            index.families[family].append(intent)
+
+        vectors = artifact.vectors
+        # Lignes de la matrice en vues ndarray, toujours projetées en mémoire
+        rows = list(np.asarray(vectors))
+        for row, (intent_id, kind_id, raw, processed, has_vector) in zip(rows, artifact.texts.tolist()):
+            text = IndexedText(strings[raw], strings[processed], row, bool(has_vector))
+            getattr(intents[intent_id], TEXT_KINDS[kind_id]).append(text)
+
+        index._assemble(vectors, LexicalIndex.from_postings(len(intents), artifact.lexical_postings()))
+        logger.info(f"🗂️ Index ouvert depuis {artifact.directory} : {len(index)} intentions, "
+                    f"{index.text_count()} textes")
+        return index
+
+    def _assemble(self, matrix: Optional[np.ndarray] = None, lexical: Optional[LexicalIndex] = None) -> None:
+        """
+        Liste à plat des intentions, matrice de vecteurs, index inversé des
+        lemmes et tables de réponse directe (matrice et index inversé sont
+        repris tels quels s'ils sont fournis)
+        """
+        self.intent_list: List[IndexedIntent] = list(self.intents())
+        self.engine = VectorSimilarityEngine(self.intent_list, matrix=matrix)
+        self.lexical = lexical if lexical is not None else LexicalIndex(self.intent_list)
+        self._build_fast_path()
+        # Index de n-grammes de caractères, construits à la demande
+        self._ngrams: Dict[str, NgramSimilarityIndex] = {}
+
+    def _build_fast_path(self) -> None:
+        """
+        Tables de réponse directe : textes de la base normalisés -> intention,
+        lemmes de mots-clés -> intention. Un texte ou un lemme présent dans
+        plusieurs intentions est ambigu (None) et ne permet pas de conclure ;
+        les mots-clés et leurs lemmes des familles sans réponse directe par
+        mots-clés (owns_keywords) sont toujours ambigus, y compris quand une
+        question ou une variation les reprend.
+        """
+        self.by_id: Dict[str, IndexedIntent] = {intent.intent_id: intent for intent in self.intent_list}
+        self.exact_texts: Dict[str, Optional[str]] = {}
+        self.keyword_owners: Dict[str, Optional[str]] = {}
+        owning = {family.key for family in INTENT_FAMILIES if family.owns_keywords}
+        for intent in self.intent_list:
+            owner = intent.intent_id if intent.family in owning else None
+            texts = [(entry, intent.intent_id) for entry in intent.examples + intent.variations]
+            texts += [(keyword, owner) for keyword in intent.keywords]
+            for entry, text_owner in texts:
+                key = normalize_query(entry.raw)
+                if self.exact_texts.setdefault(key, text_owner) != text_owner:
+                    self.exact_texts[key] = None
+            for keyword in intent.keywords:
+                for lemma in keyword.tokens:
+                    if self.keyword_owners.setdefault(lemma, owner) != owner:
+                        self.keyword_owners[lemma] = None
+    
+    def lookup_exact(self, text: str) -> Optional[IndexedIntent]:
+        """Intention dont une question, variation ou mot-clé est exactement le texte (à la normalisation près)"""
+        intent_id = self.exact_texts.get(normalize_query(text))
+        return self.by_id[intent_id] if intent_id else None
+    
+    def lookup_keywords(self, tokens: Iterable[str]) -> Optional[IndexedIntent]:
+        """
+        Intention dont les mots-clés couvrent tous les lemmes de la requête
+        
+        Chaque lemme doit être un lemme de mot-clé propre à une seule
+        intention, la même pour tous : "prix" ou "tarif prix" désignent sans
+        ambiguïté les tarifs, "prix dissolution" ne conclut pas.
+        """
+        owners = {self.keyword_owners.get(token) for token in tokens}
+        if len(owners) != 1:
+            return None
+        intent_id = owners.pop()
+        return self.by_id[intent_id] if intent_id else None
+    
+    def ngram_index(self, kind: str) -> NgramSimilarityIndex:
+        """Index de n-grammes des textes prétraités d'un type (examples, variations, keywords)"""
+        ngrams = self._ngrams.get(kind)
+        if ngrams is None:
+            ngrams = self._ngrams[kind] = NgramSimilarityIndex(self.engine.texts[kind])
+        return ngrams
+    
+    def index_keyword(self, keyword: str) -> IndexedText:
+        """
+        Indexe un mot-clé : forme lemmatisée pour les correspondances exactes,
+        vecteur calculé sur le mot-clé brut pour la similarité sémantique
+        """
+        vector, has_vector = self._vectorize(keyword)
+        return IndexedText(keyword, self._preprocess(keyword), vector, has_vector)
+
+    def index_example(self, text: str) -> IndexedText:
+        """Indexe une question d'exemple ou une variation (vecteur du texte prétraité)"""
+        return self.make_text(text, self._preprocess(text))
+
+    def make_text(self, raw: str, processed: str) -> IndexedText:
+        """Construit l'entrée d'un texte déjà prétraité (vecteur du texte prétraité)"""
+        vector, has_vector = self._vectorize(processed)
+        return IndexedText(raw, processed, vector, has_vector)
+
+    def intents(self) -> Iterator[IndexedIntent]:
+        """Parcourt toutes les intentions, famille par famille"""
+        for family in INTENT_FAMILIES:
+            yield from self.families.get(family.key, [])
+
+    def text_count(self) -> int:
+        """Nombre total de textes indexés"""
+        return sum(len(i.keywords) + len(i.examples) + len(i.variations) for i in self.intents())
+
+    def __len__(self) -> int:
+        return sum(len(intents) for intents in self.families.values())
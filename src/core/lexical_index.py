@@ -0,0 +1,104 @@
+from collections import Counter
+from typing import Dict, Iterable, Sequence, Tuple
+import math
+import numpy as np
+
+# Paramètres BM25 usuels : saturation de la fréquence et normalisation par la longueur
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+class LexicalIndex:
+    """
+    Index inversé lemme -> intentions, pondéré par BM25.
+
+    Chaque intention forme un document constitué des lemmes de ses mots-clés,
+    exemples et variations. Les poids BM25 de chaque couple (lemme, intention)
+    sont calculés à la construction : le score d'une requête n'est plus
+    qu'une somme de listes d'occurrences, indépendante de la taille des
+    textes. Sert de premier étage pour présélectionner les intentions
+    candidates avant le calcul complet des scores.
+    """
+
+    def __init__(self, intents: Sequence, k1: float = BM25_K1, b: float = BM25_B):
+        """
+        Construit l'index
+
+        Args:
+            intents: Intentions indexées (IndexedIntent), dans l'ordre de l'index
+            k1: Saturation de la fréquence d'un lemme
+            b: Poids de la normalisation par la longueur du document
+        """
+        self.n_intents = len(intents)
+        term_counts = []
+        for intent in intents:
+            counts = Counter()
+            for entry in list(intent.keywords) + list(intent.examples) + list(intent.variations):
+                counts.update(entry.processed.split())
+            term_counts.append(counts)
+
+        lengths = np.array([sum(counts.values()) for counts in term_counts], dtype=np.float64)
+        avg_length = lengths.mean() if len(lengths) and lengths.mean() > 0 else 1.0
+
+        postings: Dict[str, list] = {}
+        for i, counts in enumerate(term_counts):
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((i, tf))
+
+        # Listes d'occurrences : intentions contenant le lemme et poids BM25 associés
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term, entries in postings.items():
+            ids = np.array([i for i, _ in entries], dtype=np.int64)
+            tf = np.array([tf for _, tf in entries], dtype=np.float64)
+            idf = math.log(1 + (self.n_intents - len(ids) + 0.5) / (len(ids) + 0.5))
+            norm = tf + k1 * (1 - b + b * lengths[ids] / avg_length)
+            self.postings[term] = (ids, idf * tf * (k1 + 1) / norm)
+
+    @classmethod
+    def from_postings(cls, n_intents: int, postings: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> "LexicalIndex":
+        """Index à partir de listes d'occurrences déjà pondérées (base compilée)"""
+        index = cls.__new__(cls)
+        index.n_intents = n_intents
+        index.postings = postings
+        return index
+
+    def scores(self, tokens: Iterable[str]) -> np.ndarray:
+        """
+        Score BM25 de chaque intention pour les lemmes d'une requête
+
+        Args:
+            tokens: Lemmes de la requête (chaque lemme distinct compte une fois)
+
+        Returns:
+            Score par intention, 0 pour les intentions sans lemme commun
+        """
+        scores = np.zeros(self.n_intents, dtype=np.float64)
+        for term in set(tokens):
+            posting = self.postings.get(term)
+            if posting is not None:
+                scores[posting[0]] += posting[1]
+        return scores
+
+    def shortlist(self, tokens: Iterable[str], limit: int) -> np.ndarray:
+        """
+        Présélectionne les intentions de meilleur score
+
+        Args:
+            tokens: Lemmes de la requête
+            limit: Nombre maximal de candidates
+
+        Returns:
+            Indices des candidates (au plus limit, score strictement positif),
+            dans l'ordre de l'index ; vide si aucun lemme n'est connu
+        """
+        scores = self.scores(tokens)
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            top = np.argpartition(-scores[candidates], limit - 1)[:limit]
+            candidates = candidates[top]
+        # L'ordre de l'index est conservé : à score égal, la sélection finale
+        # retient la même intention que le parcours complet
+        return np.sort(candidates)
+
+    def __len__(self) -> int:
+        return len(self.postings)
@@ -0,0 +1,96 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+import threading
+import time
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalisation peu coûteuse servant de clé de cache
+
+    Minuscules, espaces fusionnés et ponctuation finale retirée : les questions
+    qui ne diffèrent que par ces détails partagent la même décision.
+    """
+    return " ".join(text.lower().split()).strip(" ?!.…")
+
+
+class MatchCache:
+    """
+    Cache LRU borné, avec durée de vie optionnelle, des décisions du détecteur.
+
+    Chaque entrée est associée à une version de la base de connaissances : une
+    entrée calculée sur une version antérieure n'est jamais renvoyée.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        """
+        Args:
+            maxsize: Nombre maximal d'entrées conservées
+            ttl: Durée de vie d'une entrée en secondes (None : illimitée)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, version: int = 0) -> Optional[Any]:
+        """
+        Renvoie la valeur associée à la clé, ou None si absente, expirée ou obsolète
+
+        Args:
+            key: Clé (requête normalisée)
+            version: Version courante de la base de connaissances
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, entry_version, stored_at = entry
+                if entry_version != version:
+                    del self._entries[key]
+                elif self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                    del self._entries[key]
+                    self.expirations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any, version: int = 0) -> None:
+        """Enregistre une valeur, en évinçant l'entrée la moins récemment utilisée si besoin"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, version, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Vide le cache (les compteurs sont conservés)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques d'utilisation du cache"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
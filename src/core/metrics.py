@@ -0,0 +1,227 @@
+import json
+import random
+import threading
+from bisect import bisect_left
+from contextlib import nullcontext
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+# Bornes supérieures des intervalles des histogrammes, en secondes
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Étapes mesurées du pipeline de correspondance
+STAGES = (
+    "preprocessing",    # normalisation et lemmatisation spaCy de la requête
+    "classifier",       # prédiction du classificateur d'intentions
+    "query_vector",     # vecteur spaCy de la requête
+    "cosines",          # cosinus de la requête avec toute la base
+    "keywords",         # scores des mots-clés
+    "examples",         # scores des questions d'exemple
+    "variations",       # scores des variations
+    "ranking",          # combinaison des scores et choix de l'intention
+    "selection",        # choix de la réponse renvoyée
+)
+
+_NO_TIMING = nullcontext()
+
+
+class Histogram:
+    """Histogramme de durées à intervalles fixes, cumulatif comme ceux de Prometheus"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # Un compteur par intervalle, plus un pour les valeurs au-delà de la dernière borne
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Couples (borne, nombre de valeurs inférieures ou égales), borne "+Inf" comprise"""
+        bounds = [repr(bound) for bound in self.buckets] + ["+Inf"]
+        total = 0
+        result = []
+        for bound, count in zip(bounds, self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimation d'un quantile : borne supérieure de l'intervalle qui le contient
+
+        Returns:
+            La borne, ou None sans mesure ou si le quantile dépasse la dernière borne
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        for bound, (_, total) in zip(self.buckets, self.cumulative()):
+            if total >= rank:
+                return bound
+        return None
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": dict(self.cumulative()),
+        }
+
+
+class _StageTimer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics: "PipelineMetrics", name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, perf_counter() - self.start)
+
+
+class _QueryScope:
+    __slots__ = ("metrics", "outer", "start")
+
+    def __init__(self, metrics: "PipelineMetrics"):
+        self.metrics = metrics
+
+    def __enter__(self):
+        local = self.metrics._local
+        self.outer = getattr(local, "sampled", None)
+        if self.outer is None:
+            local.sampled = self.metrics._draw()
+            self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        local = self.metrics._local
+        if self.outer is None:
+            if local.sampled:
+                self.metrics.observe("total", perf_counter() - self.start)
+            local.sampled = None
+
+
+class PipelineMetrics:
+    """
+    Mesures de latence par étape et compteurs du pipeline de correspondance.
+
+    Chaque étape (voir STAGES) alimente un histogramme de durées ; la requête
+    complète alimente l'histogramme "total". L'échantillonnage est décidé une
+    fois par requête, à l'entrée de query() : toutes les étapes d'une requête
+    échantillonnée sont mesurées, aucune des autres. Les compteurs, eux, ne
+    sont pas échantillonnés.
+
+    Export au format texte de Prometheus (to_prometheus) ou en JSON (to_json).
+    """
+
+    def __init__(self, sample_rate: float = 1.0, buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+                 namespace: str = "chatbot"):
+        """
+        Args:
+            sample_rate: Part des requêtes mesurées (0 : aucune, 1 : toutes)
+            buckets: Bornes des intervalles des histogrammes, en secondes
+            namespace: Préfixe des noms de métriques Prometheus
+        """
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError(f"Taux d'échantillonnage invalide: {sample_rate} (attendu entre 0 et 1)")
+        self.sample_rate = sample_rate
+        self.buckets = tuple(buckets)
+        self.namespace = namespace
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _draw(self) -> bool:
+        return self.sample_rate >= 1.0 or (self.sample_rate > 0.0 and random.random() < self.sample_rate)
+
+    def query(self) -> _QueryScope:
+        """
+        Délimite une requête : décide de son échantillonnage et mesure sa durée totale
+
+        Les portées imbriquées (get_response puis match, par exemple) reprennent
+        la décision de la plus externe.
+        """
+        return _QueryScope(self)
+
+    def sampled(self) -> bool:
+        """Indique si la requête en cours est mesurée (tirage propre hors d'une requête)"""
+        sampled = getattr(self._local, "sampled", None)
+        return self._draw() if sampled is None else sampled
+
+    def stage(self, name: str):
+        """Contexte mesurant la durée d'une étape (sans effet si la requête n'est pas échantillonnée)"""
+        return _StageTimer(self, name) if self.sampled() else _NO_TIMING
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Ajoute une durée à l'histogramme d'une étape"""
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        """Incrémente un compteur, éventuellement étiqueté (path="exact", par exemple)"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def reset(self) -> None:
+        """Remet toutes les mesures à zéro"""
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def snapshot(self) -> Dict:
+        """État des mesures sous forme de dictionnaire sérialisable"""
+        with self._lock:
+            counters: Dict[str, List[Dict]] = {}
+            for (name, labels), value in sorted(self.counters.items()):
+                counters.setdefault(name, []).append({"labels": dict(labels), "value": value})
+            return {
+                "sample_rate": self.sample_rate,
+                "stages": {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())},
+                "counters": counters,
+            }
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        """Mesures au format JSON"""
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self) -> str:
+        """Mesures au format texte d'exposition de Prometheus"""
+        prefix = self.namespace
+        lines = []
+        with self._lock:
+            if self.histograms:
+                lines.append(f"# HELP {prefix}_stage_seconds Durée des étapes du pipeline de correspondance")
+                lines.append(f"# TYPE {prefix}_stage_seconds histogram")
+                for name, histogram in sorted(self.histograms.items()):
+                    for bound, total in histogram.cumulative():
+                        lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {total}')
+                    lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {histogram.sum!r}')
+                    lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {histogram.count}')
+            names = sorted({name for name, _ in self.counters})
+            for name in names:
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                for (counter, labels), value in sorted(self.counters.items()):
+                    if counter == name:
+                        rendered = ",".join(f'{key}="{label}"' for key, label in labels)
+                        lines.append(f"{prefix}_{name}_total{{{rendered}}} {value}" if rendered
+                                     else f"{prefix}_{name}_total {value}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,69 @@
+from collections import Counter
+from typing import Dict, Iterable, Sequence, Tuple
+import numpy as np
+
+
+def char_ngrams(text: str, n: int = 3) -> Counter:
+    """Multiensemble des n-grammes de caractères du texte, bordé d'une espace de chaque côté"""
+    padded = f" {text} "
+    return Counter(padded[i:i + n] for i in range(len(padded) - n + 1))
+
+
+class NgramSimilarityIndex:
+    """
+    Similarité de chaînes par n-grammes de caractères (coefficient de Dice).
+
+    Les n-grammes de chaque texte de la base sont comptés une fois à la
+    construction et rangés dans des listes d'occurrences : la similarité d'une
+    requête avec tous les textes s'obtient en parcourant seulement les listes
+    de ses propres n-grammes, au lieu d'un SequenceMatcher par paire.
+
+    Dice(a, b) = 2 * |A ∩ B| / (|A| + |B|), A et B multiensembles de n-grammes.
+    """
+
+    def __init__(self, texts: Sequence[str], n: int = 3):
+        """
+        Args:
+            texts: Textes de la base, dans l'ordre des scores renvoyés
+            n: Taille des n-grammes
+        """
+        self.n = n
+        self.lengths = np.zeros(len(texts), dtype=np.float64)
+        postings: Dict[str, list] = {}
+        for i, text in enumerate(texts):
+            grams = char_ngrams(text, n)
+            self.lengths[i] = sum(grams.values())
+            for gram, count in grams.items():
+                postings.setdefault(gram, []).append((i, count))
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            gram: (np.array([i for i, _ in entries], dtype=np.int64),
+                   np.array([count for _, count in entries], dtype=np.float64))
+            for gram, entries in postings.items()
+        }
+
+    def similarity(self, text: str) -> np.ndarray:
+        """
+        Coefficient de Dice entre un texte et chaque texte de la base
+
+        Returns:
+            Un score entre 0 et 1 par texte de la base
+        """
+        grams = char_ngrams(text, self.n)
+        overlap = np.zeros(len(self.lengths), dtype=np.float64)
+        for gram, count in grams.items():
+            posting = self.postings.get(gram)
+            if posting is not None:
+                ids, counts = posting
+                overlap[ids] += np.minimum(counts, count)
+        total = self.lengths + sum(grams.values())
+        return np.divide(2 * overlap, total, out=np.zeros_like(overlap), where=total > 0)
+
+    def max_similarity(self, texts: Iterable[str]) -> np.ndarray:
+        """Meilleur coefficient de Dice de chaque texte de la base parmi plusieurs textes"""
+        best = np.zeros(len(self.lengths), dtype=np.float64)
+        for text in texts:
+            np.maximum(best, self.similarity(text), out=best)
+        return best
+
+    def __len__(self) -> int:
+        return len(self.lengths)
@@ -0,0 +1,144 @@
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+# Types de textes indexés, dans l'ordre où ils sont rangés dans la matrice
+TEXT_KINDS = ("examples", "variations", "keywords")
+
+# Écart maximal attendu entre les scores de ce moteur et ceux de Doc.similarity.
+# Les vecteurs sont normalisés en float32 : les cosinus diffèrent de quelques
+# ulp (~1e-7), ce qui donne au plus ~1e-5 sur le score final pondéré. Un
+# cosinus situé exactement sur un seuil (0.7 pour les mots-clés) peut
+# basculer dans ce cas limite.
+SCORE_TOLERANCE = 1e-5
+
+
+class VectorSimilarityEngine:
+    """
+    Moteur de similarité vectorielle de la base de connaissances.
+
+    Tous les vecteurs (exemples, variations, mots-clés) sont rangés dans une
+    seule matrice float32 normalisée L2 : les cosinus d'une requête avec
+    l'ensemble de la base s'obtiennent par un unique produit matrice-vecteur,
+    puis sont réduits par intention grâce aux indices de segments.
+    """
+
+    def __init__(self, intents: Sequence, dim: int = 0, matrix: Optional[np.ndarray] = None):
+        """
+        Construit la matrice de vecteurs
+
+        Args:
+            intents: Intentions indexées (IndexedIntent), dans l'ordre de l'index
+            dim: Dimension des vecteurs si la base ne contient aucun texte
+            matrix: Matrice des vecteurs déjà normalisés, une ligne par texte
+                dans l'ordre des types puis des intentions (base compilée,
+                éventuellement projetée en mémoire) ; elle est reprise sans copie
+        """
+        self.n_intents = len(intents)
+        self.texts: Dict[str, List[str]] = {}
+        self.slices: Dict[str, slice] = {}
+        self.segment_starts: Dict[str, np.ndarray] = {}
+        self.segment_counts: Dict[str, np.ndarray] = {}
+
+        rows = []
+        offset = 0
+        for kind in TEXT_KINDS:
+            counts = np.array([len(getattr(intent, kind)) for intent in intents], dtype=np.int64)
+            entries = [entry for intent in intents for entry in getattr(intent, kind)]
+            self.segment_counts[kind] = counts
+            self.segment_starts[kind] = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64) \
+                if len(counts) else np.zeros(0, dtype=np.int64)
+            self.slices[kind] = slice(offset, offset + len(entries))
+            self.texts[kind] = [entry.processed for entry in entries]
+            rows.extend(entries)
+            offset += len(entries)
+
+        if matrix is not None:
+            if matrix.shape[0] != len(rows):
+                raise ValueError(f"La matrice compte {matrix.shape[0]} lignes pour {len(rows)} textes")
+            self.dim = matrix.shape[1]
+            self.matrix = matrix
+            return
+        if rows:
+            dim = max((entry.vector.shape[0] for entry in rows), default=dim)
+        self.dim = dim
+        self.matrix = np.zeros((len(rows), dim), dtype=np.float32)
+        for i, entry in enumerate(rows):
+            self.matrix[i] = self.normalize(entry.vector, entry.has_vector)
+
+    def normalize(self, vector: np.ndarray, has_vector: bool = True) -> np.ndarray:
+        """
+        Normalise un vecteur (L2, float32)
+
+        Un texte sans vecteur ou de norme nulle donne un vecteur nul, donc un
+        cosinus de 0 comme avec Doc.similarity.
+        """
+        out = np.zeros(self.dim, dtype=np.float32)
+        if not has_vector or vector.shape[0] != self.dim:
+            return out
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            out[:] = vector / norm
+        return out
+
+    def cosine(self, query_vectors: np.ndarray) -> np.ndarray:
+        """
+        Calcule les cosinus entre des requêtes et tous les textes indexés
+
+        Args:
+            query_vectors: Matrice (n_requêtes, dim) de vecteurs normalisés
+
+        Returns:
+            Matrice (n_requêtes, n_textes) des cosinus
+        """
+        return query_vectors @ self.matrix.T
+
+    def kind_values(self, kind: str, values: np.ndarray) -> np.ndarray:
+        """Extrait les colonnes correspondant à un type de texte"""
+        return values[..., self.slices[kind]]
+
+    def kind_columns(self, kind: str, intents: np.ndarray) -> np.ndarray:
+        """
+        Positions, parmi les textes d'un type, des textes de certaines intentions
+
+        Args:
+            kind: Type de texte (examples, variations, keywords)
+            intents: Indices des intentions, dans l'ordre de l'index
+
+        Returns:
+            Indices des textes correspondants, utilisables avec kind_values
+        """
+        starts = self.segment_starts[kind][intents]
+        counts = self.segment_counts[kind][intents]
+        if not counts.sum():
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([np.arange(start, start + count) for start, count in zip(starts, counts)])
+
+    def segment_max(self, kind: str, values: np.ndarray) -> np.ndarray:
+        """
+        Maximum par intention des valeurs d'un type de texte
+
+        Args:
+            kind: Type de texte (examples, variations, keywords)
+            values: Valeurs par texte de ce type (dernière dimension)
+
+        Returns:
+            Maximum par intention, 0 pour les intentions sans texte
+        """
+        return self._reduce(np.maximum, kind, values)
+
+    def segment_sum(self, kind: str, values: np.ndarray) -> np.ndarray:
+        """Somme par intention des valeurs d'un type de texte"""
+        return self._reduce(np.add, kind, values)
+
+    def _reduce(self, ufunc: np.ufunc, kind: str, values: np.ndarray) -> np.ndarray:
+        counts = self.segment_counts[kind]
+        out = np.zeros(values.shape[:-1] + (self.n_intents,), dtype=np.float64)
+        nonempty = counts > 0
+        if values.shape[-1]:
+            # reduceat sur les seuls segments non vides : chaque segment
+            # s'étend jusqu'au début du segment non vide suivant
+            out[..., nonempty] = ufunc.reduceat(values, self.segment_starts[kind][nonempty], axis=-1)
+        return out
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
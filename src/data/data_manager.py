@@ -1,24 +1,60 @@
+import copy
 import json
-from typing import Dict, Any, Optional
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, List, Optional, Sequence, Set, Tuple
 from pathlib import Path
+from ..core.kb_artifact import artifact_source
+from ..core.kb_index import changed_intents
+from .kb_store import KnowledgeBaseStore
+
+# Abonné aux modifications : (base après modification, intentions touchées)
+ChangeListener = Callable[[Dict[str, Any], Set[str]], None]
+
+_MISSING = object()
 
 class DataManager:
-    def __init__(self, data_file: str = "legal_data.json"):
+    """
+    Gestionnaire de la base de connaissances.
+    
+    Les modifications (add_category, add_faq, set_value) sont ajoutées au
+    journal de la base (voir KnowledgeBaseStore) au lieu de réécrire tout le
+    fichier JSON, qui n'est réécrit, de façon atomique, que lors de la fusion
+    du journal. Dans un bloc batch(), elles ne sont validées qu'une fois, à
+    la sortie du bloc. Après chaque validation, les abonnés (subscribe)
+    reçoivent la base et les intentions touchées : un IntentMatcher abonné
+    via update_intents ne réindexe que celles-ci.
+    
+    Une modification ne change jamais un bloc sur place : les blocs qui la
+    contiennent sont copiés (copie superficielle, le long du chemin
+    modifié). La base transmise aux abonnés reste ainsi figée, même quand
+    un lot suivant est en cours ou annulé. knowledge_base doit donc être
+    traité en lecture seule : toute modification passe par set_value.
+    """
+    
+    def __init__(self, data_file: str = "legal_data.json", compact_ratio: float = 0.5):
         """
         Initialise le gestionnaire de données
         
         Args:
-            data_file (str): Chemin vers le fichier JSON contenant les données
+            data_file (str): Chemin vers le fichier JSON contenant les données,
+                ou vers une base compilée (répertoire) dont la source JSON est
+                alors lue et modifiée ; l'index compilé n'est plus utilisé
+                après modification, jusqu'à la prochaine compilation
+            compact_ratio (float): Taille du journal, rapportée à celle du
+                fichier JSON, au-delà de laquelle il y est fusionné
         """
-        self.data_file = data_file
+        self.data_file = str(artifact_source(data_file) or data_file)
+        self.store = KnowledgeBaseStore(self.data_file, compact_ratio)
         self.knowledge_base: Dict[str, Any] = {}
+        self._listeners: List[ChangeListener] = []
+        # Modifications du lot en cours et valeurs antérieures (None hors d'un lot)
+        self._batch: Optional[List[Tuple[Dict, Any]]] = None
         self.load_data()
     
     def load_data(self) -> None:
-        """Charge les données depuis le fichier JSON"""
+        """Charge les données depuis le fichier JSON et rejoue le journal"""
         try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                self.knowledge_base = json.load(f)
+            self.knowledge_base = self.store.load()
             print(f"✅ Données chargées depuis {self.data_file}")
         except FileNotFoundError:
             print(f"⚠️  Fichier {self.data_file} non trouvé. Création des données par défaut.")
@@ -28,14 +64,142 @@ class DataManager:
             self.create_default_data()
     
     def save_data(self) -> None:
-        """Sauvegarde les données dans le fichier JSON"""
+        """
+        Sauvegarde toutes les données dans le fichier JSON (écriture atomique)
+        
+        Le fichier est remplacé par les données en mémoire et le journal est
+        supprimé, y compris les modifications d'autres instances : pour
+        seulement fusionner le journal, voir compact().
+        """
         try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(self.knowledge_base, f, indent=2, ensure_ascii=False)
+            self.store.write_snapshot(self.knowledge_base)
             print(f"✅ Données sauvegardées dans {self.data_file}")
         except Exception as e:
             print(f"❌ Erreur lors de la sauvegarde des données: {str(e)}")
     
+    def compact(self) -> None:
+        """
+        Fusionne le journal des modifications dans le fichier JSON
+        
+        Le fichier et le journal sont relus sous verrou : les modifications
+        journalisées par d'autres instances ou processus sont conservées et
+        rejoignent la base en mémoire.
+        """
+        try:
+            self.knowledge_base = self.store.compact()
+            print(f"✅ Journal fusionné dans {self.data_file}")
+        except Exception as e:
+            print(f"❌ Erreur lors de la fusion du journal: {str(e)}")
+    
+    def subscribe(self, listener: ChangeListener) -> None:
+        """
+        Abonne une fonction aux modifications validées
+        
+        Args:
+            listener: Appelée avec la base et l'ensemble des intentions
+                touchées (IntentMatcher.update_intents par exemple)
+        """
+        self._listeners.append(listener)
+    
+    def unsubscribe(self, listener: ChangeListener) -> None:
+        """Désabonne une fonction des modifications"""
+        self._listeners.remove(listener)
+    
+    @contextmanager
+    def batch(self):
+        """
+        Regroupe des modifications en un seul lot
+        
+        Le lot est validé (une ligne de journal, une notification) à la
+        sortie du bloc. Si le bloc lève une exception, les modifications sont
+        annulées en mémoire et rien n'est écrit. Un bloc imbriqué fait partie
+        du lot englobant.
+        """
+        if self._batch is not None:
+            yield self
+            return
+        self._batch = []
+        try:
+            yield self
+        except BaseException:
+            pending, self._batch = self._batch, None
+            self._rollback(pending)
+            raise
+        pending, self._batch = self._batch, None
+        self._commit(pending)
+    
+    def set_value(self, path: Sequence[str], value: Any) -> None:
+        """
+        Modifie une valeur de la base
+        
+        Args:
+            path: Chemin de clés (["faq", "tarifs"], ["contact", "email"]...)
+            value: Nouvelle valeur (sérialisable en JSON)
+        """
+        path = list(path)
+        # Copie de la valeur : l'appelant peut continuer à modifier la sienne
+        value = copy.deepcopy(value)
+        previous = self._replace(path, value)
+        pending = [({"path": path, "value": value}, previous)]
+        if self._batch is not None:
+            self._batch.extend(pending)
+        else:
+            self._commit(pending)
+    
+    def _replace(self, path: List[str], value: Any) -> Any:
+        """
+        Remplace la valeur d'un chemin (la retire si value vaut _MISSING)
+        en copiant les blocs qui la contiennent, sans rien modifier sur place
+        
+        Returns:
+            La valeur antérieure, ou _MISSING
+        """
+        def rebuilt(block: Any, depth: int) -> Tuple[Dict, Any]:
+            block = dict(block) if isinstance(block, dict) else {}
+            key = path[depth]
+            if depth < len(path) - 1:
+                block[key], previous = rebuilt(block.get(key), depth + 1)
+                return block, previous
+            previous = block.pop(key, _MISSING)
+            if value is not _MISSING:
+                block[key] = value
+            return block, previous
+        
+        self.knowledge_base, previous = rebuilt(self.knowledge_base, 0)
+        return previous
+    
+    def _rollback(self, pending: List[Tuple[Dict, Any]]) -> None:
+        """Rétablit en mémoire les valeurs antérieures d'un lot (dernière modification d'abord)"""
+        for change, previous in reversed(pending):
+            self._replace(change["path"], previous)
+    
+    def _commit(self, pending: List[Tuple[Dict, Any]]) -> None:
+        """
+        Journalise un lot de modifications, fusionne le journal si besoin et prévient les abonnés
+        
+        Si le lot ne peut pas être journalisé, il est annulé en mémoire,
+        les abonnés ne sont pas prévenus et l'erreur est propagée.
+        """
+        if not pending:
+            return
+        changes = [change for change, _ in pending]
+        try:
+            self.store.append(changes)
+        except Exception as e:
+            print(f"❌ Erreur lors de la sauvegarde des données: {str(e)}")
+            self._rollback(pending)
+            raise
+        print(f"✅ {len(changes)} modification(s) enregistrée(s) dans {self.store.journal_file}")
+        if self.store.needs_compaction():
+            self.compact()
+        
+        changed = set()
+        for change in changes:
+            changed |= changed_intents(self.knowledge_base, change["path"])
+        # Les blocs ne sont jamais modifiés sur place : la base transmise reste figée
+        for listener in list(self._listeners):
+            listener(self.knowledge_base, changed)
+    
     def create_default_data(self) -> None:
         """Crée un fichier de données par défaut"""
         default_data = {
@@ -79,26 +243,18 @@ class DataManager:
     
     def add_category(self, category_id: str, name: str, keywords: list, responses: list) -> None:
         """Ajoute une nouvelle catégorie à la base de connaissances"""
-        if "categories" not in self.knowledge_base:
-            self.knowledge_base["categories"] = {}
-        
-        self.knowledge_base["categories"][category_id] = {
+        self.set_value(["categories", category_id], {
             "name": name,
             "keywords": keywords,
             "responses": responses
-        }
-        self.save_data()
+        })
     
     def add_faq(self, faq_id: str, question: str, answer: str) -> None:
         """Ajoute une nouvelle FAQ à la base de connaissances"""
-        if "faq" not in self.knowledge_base:
-            self.knowledge_base["faq"] = {}
-        
-        self.knowledge_base["faq"][faq_id] = {
+        self.set_value(["faq", faq_id], {
             "question": question,
             "answer": answer
-        }
-        self.save_data()
+        })
     
     def get_category(self, category_id: str) -> Optional[Dict]:
         """Récupère une catégorie par son ID"""
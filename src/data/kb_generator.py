@@ -0,0 +1,330 @@
+"""
+Générateur de bases de connaissances synthétiques pour les tests de montée en charge.
+
+Les bases produites suivent le schéma de legal_data.json (categories et faq
+avec keywords, examples.questions, examples.variations, responses et
+context) ; chaque intention combine une formalité, une forme juridique et,
+au-delà, une ville de publication. Les requêtes de test sont formulées à
+partir de modèles de phrases distincts de ceux des exemples, puis bruitées
+(synonymes, fautes de frappe, accents, ponctuation) : elles mesurent la
+généralisation et non la mémorisation de la base.
+
+Usage:
+    python -m src.data.kb_generator --intents 5000 --output kb_5000.json
+                                    [--queries requetes_5000.jsonl] [--seed 0]
+"""
+import argparse
+import json
+import random
+import unicodedata
+from itertools import product
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Formalités : (clé, intitulé, groupe nominal, verbe à l'infinitif, mots-clés)
+FORMALITIES = [
+    ("constitution", "Constitution", "la constitution", "créer", ["création", "constitution", "immatriculation"]),
+    ("transfert_siege", "Transfert de siège", "le transfert de siège", "transférer le siège",
+     ["transfert", "siège", "adresse"]),
+    ("changement_gerant", "Changement de gérant", "le changement de gérant", "changer de gérant",
+     ["gérant", "nomination", "dirigeant"]),
+    ("augmentation_capital", "Augmentation de capital", "l'augmentation de capital", "augmenter le capital",
+     ["augmentation", "capital", "apport"]),
+    ("reduction_capital", "Réduction de capital", "la réduction de capital", "réduire le capital",
+     ["réduction", "capital"]),
+    ("changement_denomination", "Changement de dénomination", "le changement de dénomination",
+     "changer la dénomination", ["dénomination", "nom", "raison sociale"]),
+    ("modification_objet", "Modification de l'objet social", "la modification de l'objet social",
+     "modifier l'objet social", ["objet social", "activité"]),
+    ("prorogation", "Prorogation de durée", "la prorogation de durée", "proroger la durée",
+     ["prorogation", "durée"]),
+    ("transformation", "Transformation de forme", "la transformation", "changer de forme juridique",
+     ["transformation", "forme juridique"]),
+    ("dissolution", "Dissolution anticipée", "la dissolution anticipée", "dissoudre",
+     ["dissolution", "fermeture", "cessation"]),
+    ("liquidation", "Clôture de liquidation", "la clôture de liquidation", "clôturer la liquidation",
+     ["liquidation", "clôture", "liquidateur"]),
+    ("cession_fonds", "Cession de fonds de commerce", "la cession du fonds de commerce",
+     "vendre le fonds de commerce", ["cession", "fonds de commerce", "vente"]),
+    ("location_gerance", "Mise en location-gérance", "la mise en location-gérance",
+     "mettre en location-gérance", ["location-gérance", "gérance", "locataire"]),
+    ("commissaire_comptes", "Nomination d'un commissaire aux comptes",
+     "la nomination d'un commissaire aux comptes", "nommer un commissaire aux comptes",
+     ["commissaire aux comptes", "audit"]),
+    ("fusion", "Fusion", "la fusion", "fusionner", ["fusion", "absorption"]),
+    ("continuation", "Continuation malgré pertes", "la continuation d'activité malgré les pertes",
+     "poursuivre l'activité malgré les pertes", ["continuation", "capitaux propres", "pertes"]),
+]
+
+# Formes juridiques : (clé, libellé, possessif)
+LEGAL_FORMS = [
+    ("sarl", "SARL", "ma"), ("sas", "SAS", "ma"), ("sasu", "SASU", "ma"), ("eurl", "EURL", "mon"),
+    ("sci", "SCI", "ma"), ("sa", "SA", "ma"), ("snc", "SNC", "ma"), ("selarl", "SELARL", "ma"),
+    ("association", "association", "mon"), ("entreprise_individuelle", "entreprise individuelle", "mon"),
+]
+
+# Villes de publication, pour distinguer les intentions au-delà des combinaisons de base
+CITIES = ["Paris", "Lyon", "Marseille", "Bordeaux", "Toulouse", "Nantes", "Lille", "Strasbourg",
+          "Rennes", "Montpellier", "Nice", "Grenoble", "Dijon", "Angers", "Reims", "Brest",
+          "Tours", "Limoges", "Amiens", "Metz", "Rouen", "Caen", "Orléans", "Pau", "Nancy"]
+
+# Sujets de FAQ : (clé, intitulé, question d'exemple, requête de test, variation, mots-clés)
+FAQ_TOPICS = [
+    ("tarif", "Tarif", "Combien coûte l'annonce pour {noun} ?",
+     "Quel est le prix d'une publication pour {noun} ?", "prix annonce {short}", ["tarif", "prix", "coût"]),
+    ("delai", "Délai", "Quel est le délai de publication pour {noun} ?",
+     "En combien de temps paraît l'annonce pour {noun} ?", "délai {short}", ["délai", "rapidité", "urgent"]),
+    ("attestation", "Attestation de parution", "Comment obtenir l'attestation de parution pour {noun} ?",
+     "Où trouver le justificatif de parution pour {noun} ?", "attestation {short}",
+     ["attestation", "parution", "justificatif"]),
+    ("pieces", "Pièces à fournir", "Quels documents fournir pour {noun} ?",
+     "Que faut-il envoyer pour {noun} ?", "documents {short}", ["documents", "pièces", "justificatifs"]),
+    ("correction", "Correction d'annonce", "Comment corriger une annonce de {noun} déjà publiée ?",
+     "J'ai fait une erreur dans l'annonce pour {noun}, que faire ?", "corriger annonce {short}",
+     ["correction", "erratum", "rectificatif"]),
+]
+
+# Modèles des questions d'exemple et des requêtes de test (jamais les mêmes)
+EXAMPLE_TEMPLATES = [
+    "Comment publier l'annonce pour {noun} d'une {form} ?",
+    "Quelles sont les formalités pour {noun} d'une {form} ?",
+    "Je veux {verb}, c'est pour {my} {form}. Que dois-je faire ?",
+    "Quelle annonce légale pour {noun} d'une {form} ?",
+    "Je souhaite {verb} : quelle publication pour {my} {form} ?",
+]
+QUERY_TEMPLATES = [
+    "Est-ce que je dois publier une annonce pour {noun} de {my} {form} ?",
+    "Pouvez-vous m'aider ? Je dois {verb} pour {my} {form}",
+    "annonce pour {noun} {form}, comment ça marche ?",
+    "J'aimerais savoir comment faire {noun} de {my} {form}",
+    "Démarches pour {noun} de {my} {form}",
+]
+
+# Synonymes utilisés par le bruit de paraphrase
+SYNONYMS = {
+    "société": ["entreprise", "boîte", "structure"],
+    "annonce": ["publication", "insertion"],
+    "publier": ["faire paraître", "passer"],
+    "comment": ["de quelle façon", "comment est-ce qu'on"],
+    "formalités": ["démarches", "étapes"],
+    "démarches": ["formalités", "étapes"],
+    "dois-je": ["faut-il"],
+    "souhaite": ["veux", "voudrais"],
+}
+
+
+def strip_accents(text: str) -> str:
+    """Supprime les accents (é -> e)"""
+    return "".join(c for c in unicodedata.normalize("NFD", text) if unicodedata.category(c) != "Mn")
+
+
+def typo(word: str, rng: random.Random) -> str:
+    """Faute de frappe : inversion, omission ou doublement d'une lettre"""
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if kind == 1:
+        return word[:i] + word[i + 1:]
+    return word[:i] + word[i] + word[i:]
+
+
+def paraphrase(text: str, rng: random.Random, noise: float = 0.3) -> str:
+    """
+    Bruite une phrase comme le ferait un utilisateur
+
+    Args:
+        text: Phrase d'origine
+        rng: Générateur aléatoire
+        noise: Probabilité de chaque altération (synonyme, faute, accents, ponctuation)
+
+    Returns:
+        La phrase bruitée
+    """
+    words = []
+    for word in text.split():
+        key = word.lower()
+        if key in SYNONYMS and rng.random() < noise:
+            word = rng.choice(SYNONYMS[key])
+        elif word.isalpha() and rng.random() < noise / 4:
+            word = typo(word, rng)
+        words.append(word)
+    text = " ".join(words)
+    if rng.random() < noise / 2:
+        text = strip_accents(text)
+    if rng.random() < noise / 2:
+        text = text.rstrip(" ?").lower()
+    return text
+
+
+def _slots(formality: Tuple, form: Tuple, city: Optional[str]) -> Dict[str, str]:
+    """Valeurs des modèles de phrases d'une intention"""
+    _, title, noun, verb, _ = formality
+    _, label, possessive = form
+    suffix = f" à {city}" if city else ""
+    return {"noun": noun, "verb": verb, "form": f"{label}{suffix}", "my": possessive,
+            "short": f"{title.lower()} {label}", "title": title}
+
+
+class KnowledgeBaseGenerator:
+    """
+    Génère une base de connaissances synthétique et ses requêtes de test étiquetées.
+
+    La génération est déterministe pour une graine donnée : deux appels avec
+    les mêmes paramètres produisent la même base.
+    """
+
+    def __init__(self, seed: int = 0, noise: float = 0.3):
+        """
+        Args:
+            seed: Graine du générateur aléatoire
+            noise: Intensité du bruit de paraphrase des requêtes de test (0-1)
+        """
+        self.seed = seed
+        self.noise = noise
+
+    @staticmethod
+    def _combinations() -> Iterator[Tuple[Tuple, Tuple, Optional[str]]]:
+        """Combinaisons formalité x forme, puis formalité x forme x ville"""
+        for formality, form in product(FORMALITIES, LEGAL_FORMS):
+            yield formality, form, None
+        for city in CITIES:
+            for formality, form in product(FORMALITIES, LEGAL_FORMS):
+                yield formality, form, city
+
+    def _category(self, formality: Tuple, form: Tuple, city: Optional[str], rng: random.Random) -> Dict:
+        slots = _slots(formality, form, city)
+        keywords = list(formality[4]) + [form[1].lower()] + ([city.lower()] if city else [])
+        questions = [template.format(**slots) for template in EXAMPLE_TEMPLATES]
+        return {
+            "title": f"{slots['title']} ({slots['form']})",
+            "description": f"Annonce légale pour {slots['noun']} d'une {slots['form']}",
+            "keywords": keywords,
+            "context": {
+                "type": "formalite",
+                "priority": rng.choice(["high", "medium", "low"]),
+                "tags": [formality[0], form[0]] + ([city.lower()] if city else []),
+            },
+            "examples": {
+                "questions": rng.sample(questions, k=min(4, len(questions))),
+                "variations": [f"{slots['title'].lower()} {slots['form']}", f"annonce {slots['short']}",
+                               f"{formality[4][0]} {form[1].lower()}"],
+            },
+            "responses": [{
+                "type": "principal",
+                "content": f"Pour {slots['noun']} d'une {slots['form']}, une annonce légale doit être publiée "
+                           f"dans un journal habilité du département du siège.",
+                "details": ["La publication doit mentionner :", "- Dénomination sociale", "- Forme juridique",
+                            "- Siège social", f"- Décision relative à {slots['noun']}"],
+            }],
+        }
+
+    def _faq(self, topic: Tuple, formality: Tuple, rng: random.Random) -> Dict:
+        key, title, question, _, variation, keywords = topic
+        noun, short = formality[2], formality[1].lower()
+        return {
+            "title": f"{title} : {formality[1]}",
+            "keywords": list(keywords) + [formality[4][0]],
+            "context": {"type": "information", "priority": rng.choice(["medium", "low"]),
+                        "tags": [key, formality[0]]},
+            "examples": {
+                "questions": [question.format(noun=noun), f"{title} pour {noun} ?"],
+                "variations": [variation.format(short=short)],
+            },
+            "responses": [{
+                "type": "principal",
+                "content": f"{title} pour {noun} : consultez notre service, la réponse dépend du département.",
+                "details": [],
+            }],
+        }
+
+    def generate(self, n_intents: int, faq_ratio: float = 0.1,
+                 queries_per_intent: int = 2) -> Tuple[Dict, List[Dict]]:
+        """
+        Génère une base et ses requêtes de test
+
+        Args:
+            n_intents: Nombre total d'intentions (catégories et FAQ)
+            faq_ratio: Part des intentions placées dans la FAQ
+            queries_per_intent: Nombre de requêtes de test par catégorie
+
+        Returns:
+            La base (même schéma que legal_data.json) et la liste des requêtes
+            {"text": ..., "intent": ...}, l'intention étant l'identifiant
+            utilisé par IntentMatcher (préfixe "faq_" pour la FAQ)
+        """
+        rng = random.Random(self.seed)
+        n_faq = min(int(n_intents * faq_ratio), len(FAQ_TOPICS) * len(FORMALITIES))
+        n_categories = n_intents - n_faq
+
+        categories: Dict[str, Dict] = {}
+        queries: List[Dict] = []
+        combinations = self._combinations()
+        for i in range(n_categories):
+            combination = next(combinations, None)
+            if combination is None:
+                # Au-delà des combinaisons disponibles : copies numérotées
+                combinations = self._combinations()
+                combination = next(combinations)
+            formality, form, city = combination
+            key = "_".join(filter(None, (formality[0], form[0], city and strip_accents(city).lower())))
+            while key in categories:
+                key = f"{key}_{i}"
+            categories[key] = self._category(formality, form, city, rng)
+            slots = _slots(formality, form, city)
+            for template in rng.sample(QUERY_TEMPLATES, k=min(queries_per_intent, len(QUERY_TEMPLATES))):
+                queries.append({"text": paraphrase(template.format(**slots), rng, self.noise), "intent": key})
+
+        faq: Dict[str, Dict] = {}
+        for topic, formality in list(product(FAQ_TOPICS, FORMALITIES))[:n_faq]:
+            key = f"{topic[0]}_{formality[0]}"
+            faq[key] = self._faq(topic, formality, rng)
+            query = topic[3].format(noun=formality[2])
+            queries.append({"text": paraphrase(query, rng, self.noise), "intent": f"faq_{key}"})
+
+        knowledge_base = {
+            "metadata": {
+                "version": "synthetic",
+                "description": f"Base synthétique de {n_intents} intentions (graine {self.seed})",
+            },
+            "categories": categories,
+            "faq": faq,
+            "contact": {"email": "contact@example.fr", "telephone": "01 00 00 00 00",
+                        "horaires": "Du lundi au vendredi, 9h-18h", "title": "Nous contacter",
+                        "labels": {"email": "Email", "telephone": "Téléphone", "horaires": "Horaires"},
+                        "keywords": ["contact", "contacter", "joindre", "téléphone", "email", "horaires"],
+                        "examples": {"questions": ["Comment vous contacter ?", "Quel est votre numéro de téléphone ?"],
+                                     "variations": ["numéro de téléphone", "adresse mail"]},
+                        "responses": ["Vous pouvez nous joindre :"]},
+        }
+        rng.shuffle(queries)
+        return knowledge_base, queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--intents", type=int, required=True, help="Nombre d'intentions")
+    parser.add_argument("--output", required=True, help="Fichier JSON de la base")
+    parser.add_argument("--queries", help="Fichier JSON Lines des requêtes de test étiquetées")
+    parser.add_argument("--faq-ratio", type=float, default=0.1)
+    parser.add_argument("--queries-per-intent", type=int, default=2)
+    parser.add_argument("--noise", type=float, default=0.3, help="Intensité du bruit des requêtes (0-1)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generator = KnowledgeBaseGenerator(seed=args.seed, noise=args.noise)
+    knowledge_base, queries = generator.generate(args.intents, args.faq_ratio, args.queries_per_intent)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(knowledge_base, f, indent=2, ensure_ascii=False)
+    print(f"✅ {len(knowledge_base['categories'])} catégories et {len(knowledge_base['faq'])} FAQ "
+          f"écrites dans {args.output}")
+    if args.queries:
+        with open(args.queries, 'w', encoding='utf-8') as f:
+            for query in queries:
+                f.write(json.dumps(query, ensure_ascii=False) + "\n")
+        print(f"✅ {len(queries)} requêtes de test écrites dans {args.queries}")
+
+
+if __name__ == "__main__":
+    main()
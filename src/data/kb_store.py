@@ -0,0 +1,210 @@
+"""
+Stockage de la base de connaissances : instantané JSON et journal de modifications.
+
+L'instantané (legal_data.json) n'est jamais réécrit en place : il est écrit
+dans un fichier temporaire du même répertoire puis substitué par
+os.replace, si bien qu'un arrêt brutal laisse l'ancien ou le nouveau
+fichier, jamais un fichier tronqué.
+
+Chaque validation de modifications ajoute une seule ligne JSON au journal
+(legal_data.json.journal) : son coût ne dépend que des modifications, pas
+de la taille de la base. Une ligne interrompue en cours d'écriture est
+ignorée à la relecture, de sorte qu'un lot est appliqué entièrement ou pas
+du tout. Quand le journal dépasse une fraction de la taille de
+l'instantané, il est fusionné dans un nouvel instantané puis supprimé.
+
+Les modifications affectent une valeur à un chemin de clés (["faq",
+"tarifs"] par exemple) : les rejouer une seconde fois ne change rien, ce
+qui rend sans danger une relecture entre la substitution de l'instantané
+et la suppression du journal.
+
+Les écritures (ajout au journal, fusion, instantané) sont sérialisées entre
+processus par un verrou sur legal_data.json.lock : la fusion relit
+l'instantané et le journal sous ce verrou, si bien que les modifications
+journalisées par d'autres écrivains ne sont jamais perdues.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+JOURNAL_SUFFIX = ".journal"
+LOCK_SUFFIX = ".lock"
+
+
+def set_path(data: Dict, path: Sequence[str], value: Any) -> None:
+    """Affecte value au chemin de clés path, en créant les blocs intermédiaires"""
+    for key in path[:-1]:
+        data = data.setdefault(key, {})
+    data[path[-1]] = value
+
+
+class KnowledgeBaseStore:
+    """Instantané JSON de la base et journal des modifications validées depuis"""
+
+    def __init__(self, data_file: Union[str, Path], compact_ratio: float = 0.5):
+        """
+        Args:
+            data_file: Fichier JSON de la base (l'instantané)
+            compact_ratio: Taille du journal, rapportée à celle de
+                l'instantané, au-delà de laquelle il est fusionné
+        """
+        self.data_file = Path(data_file)
+        self.journal_file = self.data_file.with_name(self.data_file.name + JOURNAL_SUFFIX)
+        self.lock_file = self.data_file.with_name(self.data_file.name + LOCK_SUFFIX)
+        self.compact_ratio = compact_ratio
+
+    @contextmanager
+    def lock(self):
+        """Verrou exclusif des écritures, partagé par tous les processus"""
+        with open(self.lock_file, 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def stat(self) -> Tuple[Tuple[int, int], Optional[Tuple[int, int]]]:
+        """
+        (date de modification, taille) de l'instantané et du journal (None s'il est absent)
+
+        Raises:
+            FileNotFoundError: Instantané absent
+        """
+        stat = os.stat(self.data_file)
+        try:
+            journal = os.stat(self.journal_file)
+            journal_stat = (journal.st_mtime_ns, journal.st_size)
+        except FileNotFoundError:
+            journal_stat = None
+        return (stat.st_mtime_ns, stat.st_size), journal_stat
+
+    def read(self) -> Tuple[bytes, bytes]:
+        """
+        Contenu brut de l'instantané et du journal (vide s'il est absent)
+
+        Raises:
+            FileNotFoundError: Instantané absent
+        """
+        with open(self.data_file, 'rb') as f:
+            snapshot = f.read()
+        try:
+            with open(self.journal_file, 'rb') as f:
+                journal = f.read()
+        except FileNotFoundError:
+            journal = b""
+        return snapshot, journal
+
+    @staticmethod
+    def digest(content: Tuple[bytes, bytes]) -> str:
+        """Empreinte SHA-256 du contenu (celle de l'instantané seul si le journal est vide)"""
+        snapshot, journal = content
+        return hashlib.sha256(snapshot + journal).hexdigest()
+
+    @staticmethod
+    def decode(content: Tuple[bytes, bytes]) -> Dict:
+        """
+        Base obtenue en rejouant le journal sur l'instantané
+
+        Raises:
+            json.JSONDecodeError: Instantané invalide
+        """
+        snapshot, journal = content
+        data = json.loads(snapshot.decode('utf-8'))
+        for line in journal.splitlines():
+            try:
+                changes = json.loads(line.decode('utf-8'))
+            except ValueError:
+                # Ligne interrompue en cours d'écriture : le lot n'a pas été validé
+                continue
+            for change in changes:
+                set_path(data, change["path"], change["value"])
+        return data
+
+    def load(self) -> Dict:
+        """Base courante : instantané et modifications journalisées"""
+        return self.decode(self.read())
+
+    def append(self, changes: List[Dict]) -> None:
+        """
+        Ajoute un lot de modifications au journal, en une ligne écrite sur disque avant de rendre la main
+
+        Args:
+            changes: Modifications {"path": [...], "value": ...}
+        """
+        line = json.dumps(changes, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self.lock(), open(self.journal_file, 'a+b') as f:
+            if f.tell():
+                # Une ligne interrompue ne doit pas absorber le lot suivant
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = "\n" + line
+            f.write(line.encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def needs_compaction(self) -> bool:
+        """Indique si le journal a dépassé sa taille maximale"""
+        snapshot, journal = self.stat()
+        return journal is not None and journal[1] > self.compact_ratio * snapshot[1]
+
+    def compact(self) -> Dict:
+        """
+        Fusionne le journal dans l'instantané
+
+        L'instantané et le journal sont relus sous le verrou : les
+        modifications de tous les écrivains sont conservées.
+
+        Returns:
+            La base fusionnée
+        """
+        with self.lock():
+            data = self.load()
+            self._replace_snapshot(data)
+        return data
+
+    def write_snapshot(self, data: Dict) -> None:
+        """
+        Remplace la base par data (écriture atomique) et supprime le journal
+
+        Les modifications journalisées qui ne figurent pas dans data sont
+        perdues : pour seulement fusionner le journal, voir compact().
+        """
+        with self.lock():
+            self._replace_snapshot(data)
+
+    def _replace_snapshot(self, data: Dict) -> None:
+        """Écrit un instantané complet de façon atomique, puis supprime le journal (verrou tenu)"""
+        fd, tmp = tempfile.mkstemp(dir=self.data_file.parent, prefix=self.data_file.name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            if self.data_file.exists():
+                # Le fichier temporaire est créé en 0600 : il reprend les droits de l'instantané
+                # (os.chmod plutôt que os.fchmod, absent sous Windows avant Python 3.13)
+                os.chmod(tmp, self.data_file.stat().st_mode & 0o777)
+            os.replace(tmp, self.data_file)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self.journal_file.unlink(missing_ok=True)
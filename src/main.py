@@ -4,8 +4,11 @@ from .ui.chatbot_gui import ChatbotGUI
 
 def main():
     """Point d'entrée principal de l'application"""
-    # Initialisation du chatbot avec le chemin du fichier JSON
-    chatbot = LegalAnnouncementChatbot("legal_data.json")
+    # Initialisation différée du chatbot : spaCy et le classificateur se
+    # chargent en arrière-plan, la fenêtre s'affiche sans attendre le modèle
+    # et les salutations obtiennent une réponse immédiate
+    chatbot = LegalAnnouncementChatbot("legal_data.json", lazy=True)
+    chatbot.warm_up()
     
     # Lancement de l'interface graphique
     gui = ChatbotGUI(chatbot)
@@ -1,3 +1,12 @@
-from .intent_classifier import IntentClassifier
+from .model_registry import load_model, new_pipeline
+from .spell_checker import SpellingCorrector
 
-__all__ = ['IntentClassifier'] 
\ No newline at end of file
+__all__ = ['IntentClassifier', 'SpellingCorrector', 'load_model', 'new_pipeline']
+
+
+def __getattr__(name):
+    # IntentClassifier importe spaCy : il n'est chargé qu'à la première utilisation
+    if name == 'IntentClassifier':
+        from .intent_classifier import IntentClassifier
+        return IntentClassifier
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,12 +1,17 @@
 import spacy
 from spacy.tokens import Doc
 from spacy.training import Example
-from spacy.cli.train import train
 from pathlib import Path
 import json
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import random
+import numpy as np
+from spacy.util import compounding, minibatch
+import time
+from contextlib import contextmanager
+from .model_registry import DEFAULT_MODEL, load_model, new_pipeline
+from .training_cache import TrainingDataCache, collect_training_texts, fingerprint
 
 # Configuration du logging
 logging.basicConfig(
@@ -16,20 +21,44 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:  # threadpoolctl est optionnel
+    threadpool_limits = None
+
+
+@contextmanager
+def _thread_limit(n_threads: Optional[int]):
+    """Limite le nombre de threads des bibliothèques de calcul (BLAS, OpenMP)"""
+    if n_threads is None:
+        yield
+    elif threadpool_limits is None:
+        logger.warning("⚠️ threadpoolctl n'est pas installé, n_threads est ignoré")
+        yield
+    else:
+        with threadpool_limits(limits=n_threads):
+            yield
+
 class IntentClassifier:
-    def __init__(self, model_path: Optional[str] = None):
+    def __init__(self, model_path: Optional[str] = None, base_model: str = DEFAULT_MODEL,
+                 nlp: Optional[spacy.language.Language] = None):
         """
         Initialise le classificateur d'intentions
         
         Args:
             model_path: Chemin vers un modèle spaCy pré-entraîné (optionnel)
+            base_model: Modèle de base dont le vocabulaire et les vecteurs sont partagés
+            nlp: Pipeline déjà chargé contenant un composant textcat (optionnel)
         """
-        if model_path and Path(model_path).exists():
-            self.nlp = spacy.load(model_path)
+        if nlp is not None:
+            self.nlp = nlp
+        elif model_path and Path(model_path).exists():
+            self.nlp = new_pipeline(model_path, vocab_from=base_model)
             logger.info(f"✅ Modèle chargé depuis {model_path}")
         else:
-            # Chargement du modèle de base français
-            self.nlp = spacy.load("fr_core_news_md")
+            # Copie privée du modèle de base français (elle sera entraînée),
+            # qui partage le vocabulaire et les vecteurs déjà en mémoire
+            self.nlp = new_pipeline(base_model)
             # Ajout du pipe de classification si non présent
             if "textcat" not in self.nlp.pipe_names:
                 self.nlp.add_pipe("textcat")
@@ -37,14 +66,22 @@ class IntentClassifier:
         
         # Configuration du classificateur
         self.textcat = self.nlp.get_pipe("textcat")
-        self.categories = set()
+        self.categories = set(self.textcat.labels)
     
-    def prepare_training_data(self, data_file: str) -> List[Example]:
+    def prepare_training_data(self, data_file: str, cache_dir: Optional[str] = None,
+                              seed: Optional[int] = None) -> List[Example]:
         """
         Prépare les données d'entraînement à partir du fichier JSON
         
+        Chaque exemple reçoit l'ensemble complet des intentions de la base
+        (1.0 pour la sienne, 0.0 pour les autres). Avec un répertoire de cache,
+        les documents sont conservés au format DocBin et seuls les textes
+        nouveaux ou modifiés sont analysés lors des entraînements suivants.
+        
         Args:
             data_file: Chemin vers le fichier JSON contenant les données
+            cache_dir: Répertoire du cache DocBin (optionnel)
+            seed: Graine du mélange des exemples (optionnel)
             
         Returns:
             Liste d'exemples spaCy pour l'entraînement
@@ -52,86 +89,116 @@ class IntentClassifier:
         with open(data_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
         
-        examples = []
+        pairs, labels = collect_training_texts(data)
+        self.categories = set(labels)
         
-        # Traitement des catégories principales
-        for category_id, category in data.get("categories", {}).items():
-            self.categories.add(category_id)
-            
-            # Ajout des exemples de questions
-            for question in category.get("examples", {}).get("questions", []):
-                doc = self.nlp(question)
-                cats = {cat: 1.0 if cat == category_id else 0.0 for cat in self.categories}
-                example = Example.from_dict(doc, {"cats": cats})
-                examples.append(example)
-            
-            # Ajout des variations
-            for variation in category.get("examples", {}).get("variations", []):
-                doc = self.nlp(variation)
-                cats = {cat: 1.0 if cat == category_id else 0.0 for cat in self.categories}
-                example = Example.from_dict(doc, {"cats": cats})
-                examples.append(example)
-        
-        # Traitement des FAQ
-        for faq_id, faq in data.get("faq", {}).items():
-            category_id = f"faq_{faq_id}"
-            self.categories.add(category_id)
-            
-            # Ajout des exemples de questions
-            for question in faq.get("examples", {}).get("questions", []):
-                doc = self.nlp(question)
-                cats = {cat: 1.0 if cat == category_id else 0.0 for cat in self.categories}
-                example = Example.from_dict(doc, {"cats": cats})
-                examples.append(example)
-            
-            # Ajout des variations
-            for variation in faq.get("examples", {}).get("variations", []):
-                doc = self.nlp(variation)
-                cats = {cat: 1.0 if cat == category_id else 0.0 for cat in self.categories}
-                example = Example.from_dict(doc, {"cats": cats})
-                examples.append(example)
+        # Analyse des textes par le pipeline, sans le textcat (non entraîné)
+        texts = [text for text, _ in pairs]
+        with self.nlp.select_pipes(disable=["textcat"]):
+            if cache_dir:
+                docs = TrainingDataCache(cache_dir).get_docs(self.nlp, texts, fingerprint(pairs, labels))
+            else:
+                docs = {text: doc for text, doc in zip(texts, self.nlp.pipe(texts))}
+        
+        examples = []
+        for text, label in pairs:
+            cats = {cat: 1.0 if cat == label else 0.0 for cat in labels}
+            examples.append(Example.from_dict(docs[text], {"cats": cats}))
         
         # Mélange des exemples
-        random.shuffle(examples)
+        random.Random(seed).shuffle(examples)
         return examples
     
-    def train(self, training_data: List[Example], output_dir: str, n_iter: int = 30):
+    def train(self, training_data: List[Example], output_dir: str, n_iter: int = 30,
+              batch_start: float = 4.0, batch_stop: float = 32.0, batch_compound: float = 1.001,
+              dropout: float = 0.5, eval_split: float = 0.2, patience: int = 5,
+              n_threads: Optional[int] = None, seed: int = 0) -> List[Dict]:
         """
         Entraîne le classificateur
         
+        Seul le composant textcat est entraîné (les autres composants du
+        pipeline restent figés). Les exemples sont regroupés en mini-lots de
+        taille croissante (compounding), et une partie des exemples est
+        réservée à l'évaluation pour arrêter l'entraînement dès que le score
+        ne progresse plus ; les meilleurs poids sont alors conservés.
+        
         Args:
             training_data: Liste d'exemples d'entraînement
             output_dir: Répertoire de sortie pour le modèle
-            n_iter: Nombre d'itérations d'entraînement
-        """
-        # Configuration de l'entraînement
-        train_config = {
-            "pipeline": ["textcat"],
-            "lang": "fr",
-            "optimize": "efficiency",
-            "components": {
-                "textcat": {
-                    "architecture": "simple_cnn",
-                    "exclusive_classes": True
-                }
-            }
-        }
-        
+            n_iter: Nombre maximal d'époques
+            batch_start: Taille initiale des mini-lots
+            batch_stop: Taille maximale des mini-lots
+            batch_compound: Facteur de croissance de la taille des mini-lots
+            dropout: Taux de dropout
+            eval_split: Proportion des exemples réservée à l'évaluation (0 : pas d'arrêt anticipé)
+            patience: Nombre d'époques sans amélioration avant l'arrêt
+            n_threads: Nombre de threads des bibliothèques de calcul (None : valeur par défaut)
+            seed: Graine du mélange des exemples
+            
+        Returns:
+            Historique par époque (pertes, score d'évaluation, durée)
+        """
         # Création du répertoire de sortie
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
         
-        # Préparation de l'optimiseur
-        optimizer = self.nlp.begin_training()
-        for i in range(n_iter):
-            random.shuffle(training_data)
-            losses = {}
-            for example in training_data:
-                self.nlp.update([example], drop=0.5, losses=losses, sgd=optimizer)
-            logger.info(f"Iteration {i+1}/{n_iter}, Losses: {losses}")
+        # Séparation entraînement / évaluation
+        rng = random.Random(seed)
+        examples = list(training_data)
+        rng.shuffle(examples)
+        n_eval = int(len(examples) * eval_split) if len(examples) > 1 else 0
+        eval_examples = examples[:n_eval]
+        train_examples = examples[n_eval:]
+        logger.info(f"📚 {len(train_examples)} exemples d'entraînement, {len(eval_examples)} d'évaluation")
+        
+        with _thread_limit(n_threads), self.nlp.select_pipes(enable="textcat"):
+            # Initialisation du seul textcat (labels déduits des exemples)
+            self.textcat.initialize(lambda: train_examples, nlp=self.nlp)
+            self.categories = set(self.textcat.labels)
+            optimizer = self.nlp.create_optimizer()
+            
+            # La taille des mini-lots croît d'une époque à l'autre
+            batch_sizes = compounding(batch_start, batch_stop, batch_compound)
+            history = []
+            best_score = None
+            best_weights = None
+            epochs_without_progress = 0
+            
+            for i in range(n_iter):
+                start = time.perf_counter()
+                rng.shuffle(train_examples)
+                losses = {}
+                for batch in minibatch(train_examples, size=batch_sizes):
+                    self.nlp.update(batch, drop=dropout, losses=losses, sgd=optimizer)
+                
+                score = None
+                if eval_examples:
+                    score = self.nlp.evaluate(eval_examples).get("cats_score")
+                elapsed = time.perf_counter() - start
+                history.append({"epoch": i + 1, "losses": dict(losses), "score": score, "seconds": elapsed})
+                score_info = f", Score: {score:.3f}" if score is not None else ""
+                logger.info(f"Iteration {i+1}/{n_iter}, Losses: {losses}{score_info}, Durée: {elapsed:.2f}s")
+                
+                if score is None:
+                    continue
+                if best_score is None or score > best_score:
+                    best_score = score
+                    best_weights = self.textcat.to_bytes()
+                    epochs_without_progress = 0
+                else:
+                    epochs_without_progress += 1
+                    if epochs_without_progress >= patience:
+                        logger.info(f"⏹️ Arrêt anticipé après {i+1} époques (meilleur score: {best_score:.3f})")
+                        break
+            
+            # Restauration des meilleurs poids observés sur l'évaluation
+            if best_weights is not None:
+                self.textcat.from_bytes(best_weights)
 
         self.save(output_dir)
-        logger.info(f"✅ Modèle entraîné et sauvegardé dans {output_dir}")
+        logger.info(f"✅ Modèle entraîné et sauvegardé dans {output_dir} "
+                    f"({sum(epoch['seconds'] for epoch in history):.1f}s)")
+        return history
     
     def predict(self, text: str) -> Tuple[str, float]:
         """
@@ -144,8 +211,75 @@ class IntentClassifier:
             Tuple contenant l'ID de l'intention et le score de confiance
         """
         doc = self.nlp(text)
-        cats = doc.cats
+        return self._best_category(doc.cats)
+    
+    def predict_batch(self, texts: Iterable[str], batch_size: int = 64, n_process: int = 1,
+                      top_k: Optional[int] = None):
+        """
+        Prédit l'intention d'un lot de textes via nlp.pipe
+        
+        Args:
+            texts: Les textes à analyser (liste ou générateur)
+            batch_size: Nombre de textes par lot spaCy
+            n_process: Nombre de processus spaCy
+            top_k: Si fourni, renvoie les k meilleures intentions de chaque texte
+            
+        Returns:
+            Sans top_k, un tuple (intention, score) par texte. Avec top_k, un
+            tuple de tableaux NumPy (intentions, scores) de forme (n_textes, k),
+            triés par score décroissant.
+        """
+        predictions = self.iter_predictions(texts, batch_size=batch_size, n_process=n_process, top_k=top_k)
+        if top_k is None:
+            return list(predictions)
+        
+        k = min(top_k, len(self.textcat.labels))
+        labels, scores = [], []
+        for row_labels, row_scores in predictions:
+            labels.append(row_labels)
+            scores.append(row_scores)
+        if not labels:
+            return np.empty((0, k), dtype=object), np.empty((0, k), dtype=np.float32)
+        return np.stack(labels), np.stack(scores)
+    
+    def iter_predictions(self, texts: Iterable[str], batch_size: int = 64, n_process: int = 1,
+                         top_k: Optional[int] = None) -> Iterator:
+        """
+        Prédit l'intention d'un flux de textes, lot par lot
         
+        Les textes sont consommés au fur et à mesure : un générateur lisant un
+        gros fichier de journaux peut être classé sans être chargé en mémoire.
+        
+        Args:
+            texts: Les textes à analyser (liste ou générateur)
+            batch_size: Nombre de textes par lot spaCy
+            n_process: Nombre de processus spaCy
+            top_k: Si fourni, produit les k meilleures intentions de chaque texte
+            
+        Yields:
+            Sans top_k, un tuple (intention, score) par texte. Avec top_k, un
+            tuple de tableaux NumPy (intentions, scores) de longueur k.
+        """
+        labels = np.array(self.textcat.labels, dtype=object)
+        docs = self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+        for batch in minibatch(docs, size=batch_size):
+            # Matrice (lot, intentions) des scores, dans l'ordre des labels du textcat
+            scores = np.array([[doc.cats.get(label, 0.0) for label in labels] for doc in batch],
+                              dtype=np.float32).reshape(len(batch), len(labels))
+            if top_k is None:
+                if not len(labels):
+                    yield from (("", 0.0) for _ in batch)
+                    continue
+                for row, best in zip(scores, scores.argmax(axis=1)):
+                    yield str(labels[best]), float(row[best])
+            else:
+                top = np.argsort(-scores, axis=1, kind="stable")[:, :top_k]
+                for row, indices in zip(scores, top):
+                    yield labels[indices], row[indices]
+    
+    @staticmethod
+    def _best_category(cats: Dict[str, float]) -> Tuple[str, float]:
+        """Catégorie de meilleur score, ("", 0.0) si aucune"""
         if not cats:
             return "", 0.0
         
@@ -166,17 +300,35 @@ class IntentClassifier:
         logger.info(f"✅ Modèle sauvegardé dans {output_dir}")
     
     @classmethod
-    def load(cls, model_dir: str) -> 'IntentClassifier':
+    def load(cls, model_dir: str, base_model: str = DEFAULT_MODEL) -> 'IntentClassifier':
         """
         Charge un modèle sauvegardé
         
+        Le modèle est obtenu auprès du registre partagé : il n'est chargé qu'une
+        fois par processus, réutilise le vocabulaire et les vecteurs du modèle de
+        base, et seuls les composants nécessaires à la prédiction sont chargés.
+        
         Args:
             model_dir: Répertoire contenant le modèle
+            base_model: Modèle de base dont le vocabulaire est partagé
             
         Returns:
             Instance du classificateur avec le modèle chargé
         """
-        classifier = cls()
-        classifier.nlp = spacy.load(model_dir)
-        classifier.textcat = classifier.nlp.get_pipe("textcat")
-        return classifier 
\ No newline at end of file
+        nlp = load_model(model_dir, exclude=cls._prediction_excludes(model_dir), vocab_from=base_model)
+        return cls(nlp=nlp)
+    
+    @staticmethod
+    def _prediction_excludes(model_dir: str) -> List[str]:
+        """
+        Liste les composants inutiles à la prédiction
+        
+        Le textcat par défaut embarque son propre tok2vec : les autres composants
+        du pipeline (morphologie, parser, NER...) n'influencent pas doc.cats. Si
+        le textcat écoute un tok2vec partagé, tout le pipeline est conservé.
+        """
+        config = spacy.util.load_config(Path(model_dir) / "config.cfg")
+        pipeline = config["nlp"]["pipeline"]
+        if "Tok2VecListener" in str(config["components"].get("textcat", {})):
+            return []
+        return [name for name in pipeline if name != "textcat"] 
\ No newline at end of file
@@ -0,0 +1,89 @@
+import logging
+import threading
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+# spaCy n'est importé qu'au premier chargement de modèle : importer ce module
+# ne coûte rien au démarrage
+if TYPE_CHECKING:
+    from spacy.language import Language
+    from spacy.vocab import Vocab
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "fr_core_news_md"
+
+# Instances partagées, indexées par (modèle, composants exclus)
+_models: Dict[Tuple[str, Tuple[str, ...]], "Language"] = {}
+# Vocabulaires (chaînes et table de vecteurs) partagés, indexés par modèle de base
+_vocabs: Dict[str, "Vocab"] = {}
+_lock = threading.RLock()
+
+
+def load_model(name: str = DEFAULT_MODEL, exclude: Iterable[str] = (),
+               vocab_from: Optional[str] = None) -> "Language":
+    """
+    Renvoie l'instance partagée d'un modèle spaCy, chargée au plus une fois par processus
+
+    Args:
+        name: Nom du paquet ou chemin du modèle
+        exclude: Composants à ne pas charger
+        vocab_from: Modèle de base dont le vocabulaire est réutilisé (par défaut le modèle lui-même)
+
+    Returns:
+        Le pipeline spaCy partagé, à utiliser en lecture seule
+    """
+    key = (str(name), tuple(sorted(exclude)))
+    with _lock:
+        nlp = _models.get(key)
+        if nlp is None:
+            nlp = _load(name, exclude, vocab_from)
+            _models[key] = nlp
+        return nlp
+
+
+def new_pipeline(name: str = DEFAULT_MODEL, exclude: Iterable[str] = (),
+                 vocab_from: Optional[str] = None) -> "Language":
+    """
+    Charge une instance privée d'un modèle, modifiable (ajout de composants,
+    entraînement), qui partage néanmoins le vocabulaire et les vecteurs du modèle de base
+
+    Args:
+        name: Nom du paquet ou chemin du modèle
+        exclude: Composants à ne pas charger
+        vocab_from: Modèle de base dont le vocabulaire est réutilisé
+
+    Returns:
+        Un nouveau pipeline spaCy
+    """
+    with _lock:
+        return _load(name, exclude, vocab_from)
+
+
+def _load(name: str, exclude: Iterable[str], vocab_from: Optional[str]) -> "Language":
+    import spacy
+    vocab_key = str(vocab_from or name)
+    vocab = _vocabs.get(vocab_key)
+    exclude = list(exclude)
+    if vocab is not None:
+        # Le vocabulaire déjà en mémoire remplace celui du disque : une seule
+        # copie de la table de vecteurs par processus
+        nlp = spacy.load(name, vocab=vocab, exclude=exclude + ["vocab"])
+        logger.info(f"♻️ Modèle {name} chargé avec le vocabulaire partagé de {vocab_key}")
+    else:
+        nlp = spacy.load(name, exclude=exclude)
+        _vocabs[vocab_key] = nlp.vocab
+        logger.info(f"✅ Modèle {name} chargé")
+    return nlp
+
+
+def loaded_models() -> List[Tuple[str, Tuple[str, ...]]]:
+    """Liste les instances partagées actuellement chargées"""
+    with _lock:
+        return list(_models)
+
+
+def clear_models() -> None:
+    """Oublie toutes les instances et vocabulaires partagés (tests, rechargement)"""
+    with _lock:
+        _models.clear()
+        _vocabs.clear()
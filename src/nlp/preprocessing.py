@@ -0,0 +1,141 @@
+import re
+from typing import Dict, Iterable, List, Optional
+from ..core.match_cache import MatchCache
+from .spell_checker import SpellingCorrector
+
+# Expressions génériques à supprimer en tête de requête
+GENERIC_PATTERNS = [
+    r"^est-ce que\s+", r"^peut-on\s+", r"^je voudrais\s+", r"^je veux\s+",
+    r"^comment faire( pour)?\s+", r"^j'aimerais savoir\s+", r"^je souhaite\s+",
+    r"^pourriez-vous\s+", r"^pouvez-vous\s+", r"^serait-il possible de\s+"
+]
+
+# Fautes fréquentes
+COMMON_MISTAKES = {
+    "modifiacation": "modification",
+    "modifiaction": "modification",
+    "modifcation": "modification",
+    "modiffication": "modification"
+}
+
+
+def compile_patterns(patterns: Iterable[str]) -> "re.Pattern":
+    """Regroupe les expressions en une seule alternative compilée"""
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+
+class TextPreprocessor:
+    """
+    Prétraitement des textes avant la détection d'intention.
+
+    Normalisation (minuscules, tournures génériques, fautes de frappe) puis
+    lemmatisation spaCy sans mots vides ni ponctuation. Les tournures
+    génériques forment une seule expression compilée ; les textes déjà
+    prétraités sont mémorisés dans un cache LRU borné, vidé quand le
+    correcteur orthographique change.
+    """
+
+    def __init__(self, nlp, patterns: Iterable[str] = GENERIC_PATTERNS,
+                 common_mistakes: Optional[Dict[str, str]] = None,
+                 speller: Optional[SpellingCorrector] = None,
+                 use_lemmas: bool = True, cache_size: int = 4096):
+        """
+        Args:
+            nlp: Pipeline spaCy
+            patterns: Expressions génériques à supprimer en tête de texte
+            common_mistakes: Corrections exactes appliquées avant le correcteur
+            speller: Correcteur orthographique
+            use_lemmas: Lemmes (True) ou formes minuscules (False, sans lemmatiseur)
+            cache_size: Nombre maximal de textes mémorisés (0 : pas de cache)
+        """
+        self.nlp = nlp
+        self.patterns = list(patterns)
+        self.generic = compile_patterns(self.patterns)
+        self.common_mistakes = dict(COMMON_MISTAKES if common_mistakes is None else common_mistakes)
+        self.speller = speller
+        self.use_lemmas = use_lemmas
+        self.cache = MatchCache(cache_size) if cache_size > 0 else None
+
+    def set_speller(self, speller: Optional[SpellingCorrector]) -> None:
+        """Remplace le correcteur orthographique (les textes mémorisés sont oubliés)"""
+        self.speller = speller
+        self.clear_cache()
+
+    def normalize(self, text: str) -> str:
+        """Normalisation avant spaCy : minuscules, tournures génériques et fautes fréquentes"""
+        text = text.lower().strip()
+        # Suppression des tournures génériques : chaque suppression peut en
+        # découvrir une autre en tête de texte
+        for _ in range(len(self.patterns)):
+            text, removed = self.generic.subn("", text, count=1)
+            if not removed:
+                break
+        # Correction des fautes fréquentes, puis des fautes de frappe par
+        # rapport au vocabulaire de la base
+        corrected = []
+        for w in text.split():
+            if w in self.common_mistakes:
+                corrected.append(self.common_mistakes[w])
+            elif self.speller is not None:
+                corrected.append(self.speller.correct(w))
+            else:
+                corrected.append(w)
+        return " ".join(corrected)
+
+    def to_text(self, doc) -> str:
+        """Lemmes (ou formes minuscules) des tokens hors mots vides et ponctuation"""
+        if self.use_lemmas:
+            tokens = [token.lemma_ for token in doc if not token.is_stop and not token.is_punct]
+        else:
+            tokens = [token.lower_ for token in doc if not token.is_stop and not token.is_punct]
+        return " ".join(tokens)
+
+    def preprocess(self, text: str) -> str:
+        """Prétraite un texte (depuis le cache s'il a déjà été traité)"""
+        if self.cache is not None:
+            processed = self.cache.get(text)
+            if processed is not None:
+                return processed
+        processed = self.to_text(self.nlp(self.normalize(text)))
+        if self.cache is not None:
+            self.cache.put(text, processed)
+        return processed
+
+    def preprocess_batch(self, texts: List[str], batch_size: int = 64, n_process: int = 1) -> List[str]:
+        """
+        Prétraite une liste de textes, les textes absents du cache en un seul passage spaCy (nlp.pipe)
+
+        Args:
+            texts: Les textes à prétraiter
+            batch_size: Nombre de textes par lot spaCy
+            n_process: Nombre de processus spaCy
+
+        Returns:
+            Les textes prétraités, dans le même ordre
+        """
+        results: List[Optional[str]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            processed = self.cache.get(text) if self.cache is not None else None
+            if processed is None:
+                missing.setdefault(text, []).append(i)
+            else:
+                results[i] = processed
+        normalized = (self.normalize(text) for text in missing)
+        docs = self.nlp.pipe(normalized, batch_size=batch_size, n_process=n_process)
+        for (text, positions), doc in zip(missing.items(), docs):
+            processed = self.to_text(doc)
+            if self.cache is not None:
+                self.cache.put(text, processed)
+            for i in positions:
+                results[i] = processed
+        return results
+
+    def clear_cache(self) -> None:
+        """Oublie les textes mémorisés"""
+        if self.cache is not None:
+            self.cache.clear()
+
+    def cache_stats(self) -> Dict:
+        """Statistiques du cache de prétraitement (vide s'il est désactivé)"""
+        return self.cache.stats() if self.cache is not None else {}
@@ -0,0 +1,136 @@
+from collections import Counter
+from typing import Callable, Dict, Iterable, Optional, Set
+
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    """Le mot et toutes ses variantes obtenues en supprimant jusqu'à distance caractères"""
+    results = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        results |= frontier
+    return results
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Distance de Damerau-Levenshtein (transpositions adjacentes comprises)
+
+    Le calcul s'arrête dès que la distance dépasse max_distance ; la valeur
+    renvoyée vaut alors max_distance + 1.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        # Une transposition peut s'appuyer sur l'avant-dernière ligne
+        if min(current) > max_distance and min(previous) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+
+class SpellingCorrector:
+    """
+    Correcteur orthographique à index de suppressions (principe de SymSpell).
+
+    Chaque mot du vocabulaire est rangé sous toutes les chaînes obtenues en
+    lui retirant jusqu'à max_distance caractères. Pour corriger un mot, on
+    génère ses propres suppressions et on ne compare qu'aux mots partageant
+    une de ces clés : le coût ne dépend que de la longueur du mot, pas de la
+    taille du vocabulaire.
+    """
+
+    def __init__(self, words: Iterable[str] = (), max_distance: int = 2, min_length: int = 5,
+                 known: Optional[Callable[[str], bool]] = None):
+        """
+        Args:
+            words: Vocabulaire de référence (les répétitions servent de fréquence)
+            max_distance: Nombre maximal de modifications corrigées
+            min_length: Longueur minimale d'un mot pour être corrigé
+            known: Prédicat des mots considérés comme corrects bien qu'absents
+                du vocabulaire (par exemple les mots ayant un vecteur spaCy)
+        """
+        self.max_distance = max_distance
+        self.min_length = min_length
+        self.known = known
+        self.frequencies: Counter = Counter()
+        self._index: Dict[str, Set[str]] = {}
+        self.add(words)
+
+    @classmethod
+    def from_index(cls, frequencies: Counter, index: Dict[str, Set[str]], max_distance: int = 2,
+                   min_length: int = 5, known: Optional[Callable[[str], bool]] = None) -> "SpellingCorrector":
+        """
+        Correcteur reconstitué à partir d'un vocabulaire et d'un index de
+        suppressions déjà calculés (base compilée, voir kb_artifact)
+        """
+        speller = cls(max_distance=max_distance, min_length=min_length, known=known)
+        speller.frequencies = frequencies
+        speller._index = index
+        return speller
+
+    def deletion_index(self) -> Dict[str, Set[str]]:
+        """Index de suppressions : variante -> mots du vocabulaire (à ne pas modifier)"""
+        return self._index
+
+    def add(self, words: Iterable[str]) -> None:
+        """Ajoute des mots au vocabulaire"""
+        for word in words:
+            if word not in self.frequencies:
+                for key in _deletes(word, self.max_distance):
+                    self._index.setdefault(key, set()).add(word)
+            self.frequencies[word] += 1
+
+    def max_edits(self, word: str) -> int:
+        """Modifications tolérées : une jusqu'à 6 caractères, deux au-delà"""
+        return min(1 if len(word) <= 6 else 2, self.max_distance)
+
+    def lookup(self, word: str) -> Optional[str]:
+        """
+        Mot du vocabulaire le plus proche
+
+        Returns:
+            Le mot de distance minimale (à égalité le plus fréquent), ou None
+            si aucun n'est à moins de max_edits(word) modifications
+        """
+        if word in self.frequencies:
+            return word
+        edits = self.max_edits(word)
+        candidates = set()
+        for key in _deletes(word, edits):
+            candidates |= self._index.get(key, set())
+        best = None
+        for candidate in candidates:
+            distance = edit_distance(word, candidate, edits)
+            if distance <= edits:
+                rank = (distance, -self.frequencies[candidate], candidate)
+                if best is None or rank < best:
+                    best = rank
+        return best[2] if best else None
+
+    def correct(self, word: str) -> str:
+        """
+        Corrige un mot s'il ressemble à une faute de frappe
+
+        Seuls les mots alphabétiques d'au moins min_length caractères, absents
+        du vocabulaire et non reconnus par le prédicat known, sont corrigés.
+        """
+        if len(word) < self.min_length or not word.isalpha() or word in self.frequencies:
+            return word
+        if self.known is not None and self.known(word):
+            return word
+        return self.lookup(word) or word
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.frequencies
+
+    def __len__(self) -> int:
+        return len(self.frequencies)
@@ -1,6 +1,16 @@
+import argparse
 import logging
+import sys
 from pathlib import Path
-from intent_classifier import IntentClassifier
+
+try:
+    from .intent_classifier import IntentClassifier
+    from .model_registry import DEFAULT_MODEL
+except ImportError:
+    # Exécution directe du script : python src/nlp/train_intent_classifier.py
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+    from src.nlp.intent_classifier import IntentClassifier
+    from src.nlp.model_registry import DEFAULT_MODEL
 
 # Configuration du logging
 logging.basicConfig(
@@ -10,22 +20,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Entraîne le classificateur d'intentions")
+    parser.add_argument("--data", default="legal_data.json", help="Base de connaissances JSON")
+    parser.add_argument("--model-dir", default="models/intent_classifier", help="Répertoire du modèle entraîné")
+    parser.add_argument("--cache-dir", default="models/training_cache",
+                        help="Cache DocBin des documents d'entraînement ('' pour le désactiver)")
+    parser.add_argument("--n-iter", type=int, default=30, help="Nombre maximal d'époques")
+    parser.add_argument("--threads", type=int, default=None, help="Nombre de threads de calcul")
+    parser.add_argument("--base-model", default=DEFAULT_MODEL, help="Modèle spaCy de base (nom ou chemin)")
+    args = parser.parse_args(argv)
+    
     # Chemins des fichiers
-    data_file = Path("legal_data.json")
-    model_dir = Path("models/intent_classifier")
+    data_file = Path(args.data)
+    model_dir = Path(args.model_dir)
     
     # Création du classificateur
-    classifier = IntentClassifier()
+    classifier = IntentClassifier(base_model=args.base_model)
     
-    # Préparation des données d'entraînement
+    # Préparation des données d'entraînement (relues depuis le cache si la base n'a pas changé)
     logger.info("📚 Préparation des données d'entraînement...")
-    training_data = classifier.prepare_training_data(str(data_file))
+    training_data = classifier.prepare_training_data(str(data_file), cache_dir=args.cache_dir or None)
     logger.info(f"✅ {len(training_data)} exemples préparés")
     
     # Entraînement du modèle
     logger.info("🎯 Début de l'entraînement...")
-    classifier.train(training_data, str(model_dir), n_iter=30)
+    classifier.train(training_data, str(model_dir), n_iter=args.n_iter, n_threads=args.threads)
     
     # Test du modèle
     test_phrases = [
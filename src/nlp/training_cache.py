@@ -0,0 +1,115 @@
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from spacy.language import Language
+from spacy.tokens import Doc, DocBin
+from ..core.kb_index import INTENT_FAMILIES
+
+logger = logging.getLogger(__name__)
+
+DOCS_FILE = "docs.spacy"
+MANIFEST_FILE = "manifest.json"
+
+
+def collect_training_texts(data: Dict) -> Tuple[List[Tuple[str, str]], List[str]]:
+    """
+    Extrait les textes d'entraînement de la base de connaissances
+
+    Args:
+        data: Contenu du fichier JSON
+
+    Returns:
+        Les couples (texte, intention) et la liste complète des intentions
+    """
+    pairs = []
+    labels = []
+    for family in INTENT_FAMILIES:
+        for key, entry in family.entries(data).items():
+            label = f"{family.prefix}{key}"
+            labels.append(label)
+            examples = entry.get("examples", {})
+            for text in examples.get("questions", []) + examples.get("variations", []):
+                pairs.append((text, label))
+    return pairs, labels
+
+
+def fingerprint(pairs: List[Tuple[str, str]], labels: List[str]) -> str:
+    """Empreinte SHA-256 du contenu d'entraînement (textes, intentions)"""
+    payload = json.dumps({"pairs": pairs, "labels": labels}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def pipeline_signature(nlp: Language) -> str:
+    """Identifie le pipeline ayant produit les documents (nom, version, composants)"""
+    meta = nlp.meta
+    return f"{meta.get('lang')}_{meta.get('name')}-{meta.get('version')}:{','.join(nlp.pipe_names)}"
+
+
+class TrainingDataCache:
+    """
+    Cache sur disque des documents d'entraînement, au format DocBin.
+
+    Les documents sont indexés par leur texte : quand la base change, seuls les
+    textes nouveaux ou modifiés sont analysés par spaCy, les autres sont relus
+    depuis le cache. Le manifeste conserve l'empreinte du contenu d'entraînement
+    et la signature du pipeline qui a produit les documents.
+    """
+
+    def __init__(self, cache_dir: str = "models/training_cache"):
+        """
+        Args:
+            cache_dir: Répertoire du cache
+        """
+        self.cache_dir = Path(cache_dir)
+
+    def get_docs(self, nlp: Language, texts: Iterable[str], kb_hash: str,
+                 batch_size: int = 64) -> Dict[str, Doc]:
+        """
+        Renvoie les documents spaCy des textes, en n'analysant que ceux absents du cache
+
+        Args:
+            nlp: Pipeline utilisé pour analyser les textes (sans le textcat)
+            texts: Textes d'entraînement
+            kb_hash: Empreinte du contenu d'entraînement
+            batch_size: Nombre de textes par lot spaCy
+
+        Returns:
+            Dictionnaire texte -> document
+        """
+        texts = list(dict.fromkeys(texts))
+        signature = pipeline_signature(nlp)
+        manifest = self._read_manifest()
+        cached: Dict[str, Doc] = {}
+        if manifest and manifest.get("pipeline") == signature and (self.cache_dir / DOCS_FILE).exists():
+            doc_bin = DocBin().from_disk(self.cache_dir / DOCS_FILE)
+            cached = {doc.text: doc for doc in doc_bin.get_docs(nlp.vocab)}
+
+        if manifest and manifest.get("kb_hash") == kb_hash and all(text in cached for text in texts):
+            logger.info(f"♻️ {len(texts)} documents d'entraînement relus depuis {self.cache_dir}")
+            return cached
+
+        missing = [text for text in texts if text not in cached]
+        for text, doc in zip(missing, nlp.pipe(missing, batch_size=batch_size)):
+            cached[text] = doc
+        logger.info(f"📝 {len(missing)} textes analysés, {len(texts) - len(missing)} relus depuis le cache")
+
+        docs = {text: cached[text] for text in texts}
+        self._write(docs, kb_hash, signature)
+        return docs
+
+    def _read_manifest(self) -> Optional[Dict]:
+        try:
+            with open(self.cache_dir / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write(self, docs: Dict[str, Doc], kb_hash: str, signature: str) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        doc_bin = DocBin(docs=docs.values())
+        doc_bin.to_disk(self.cache_dir / DOCS_FILE)
+        with open(self.cache_dir / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump({"kb_hash": kb_hash, "pipeline": signature, "n_docs": len(docs)}, f, indent=2)
+        logger.info(f"💾 Cache d'entraînement écrit dans {self.cache_dir}")
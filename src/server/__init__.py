@@ -0,0 +1,3 @@
+"""
+Package contenant le serveur HTTP du chatbot.
+"""
\ No newline at end of file
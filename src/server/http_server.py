@@ -0,0 +1,437 @@
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_SIZE = 64 * 1024
+IDLE_TIMEOUT = 30.0
+
+
+class SessionStore:
+    """
+    Historiques de conversation par session, bornés en nombre et en durée de vie.
+
+    Les sessions les moins récemment utilisées sont évincées au-delà de
+    max_sessions, les sessions expirées à chaque accès ; chaque historique
+    est limité aux max_history derniers messages.
+    """
+
+    def __init__(self, max_sessions: int = 10000, ttl: float = 3600.0, max_history: int = 50):
+        """
+        Args:
+            max_sessions: Nombre maximal de sessions conservées
+            ttl: Durée d'inactivité après laquelle une session expire, en secondes
+            max_history: Nombre maximal de messages conservés par session
+        """
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_history = max_history
+        self._sessions: "OrderedDict[str, Tuple[float, List[Dict]]]" = OrderedDict()
+
+    def _prune(self) -> None:
+        """Évince les sessions expirées (les plus anciennes sont en tête)"""
+        deadline = time.monotonic() - self.ttl
+        while self._sessions:
+            session_id, (last_used, _) = next(iter(self._sessions.items()))
+            if last_used >= deadline:
+                break
+            del self._sessions[session_id]
+
+    def history(self, session_id: str) -> List[Dict]:
+        """Historique d'une session (vide si la session est inconnue ou expirée)"""
+        self._prune()
+        entry = self._sessions.get(session_id)
+        return entry[1] if entry is not None else []
+
+    def append(self, session_id: str, user_message: str, response: str) -> None:
+        """Ajoute un échange à l'historique de la session"""
+        history = self.history(session_id)
+        history.append({"role": "user", "content": user_message})
+        history.append({"role": "assistant", "content": response})
+        del history[:-self.max_history]
+        self._sessions[session_id] = (time.monotonic(), history)
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def __len__(self) -> int:
+        self._prune()
+        return len(self._sessions)
+
+
+class ChatServer:
+    """
+    Serveur HTTP/JSON asynchrone (bibliothèque standard uniquement).
+
+    La boucle asyncio ne fait que lire et écrire les requêtes ; le calcul de la
+    réponse, coûteux en CPU, est délégué à un pool de threads ou de processus
+    de taille bornée. Au-delà de workers + max_queue requêtes en cours, le
+    serveur répond immédiatement 429 ; une réponse qui dépasse le délai
+    imparti donne 504.
+
+    Routes :
+        POST /chat   {"message": "...", "session_id": "..."} -> réponse du chatbot
+        GET  /health état du serveur
+        GET  /ready  200 une fois les modèles chargés, 503 pendant le chargement
+        GET  /metrics compteurs du serveur et durées par étape du pipeline (format Prometheus)
+    """
+
+    def __init__(self, respond: Callable[[str], str], executor: Executor, workers: int,
+                 max_queue: int = 64, timeout: float = 5.0, sessions: Optional[SessionStore] = None,
+                 readiness: Optional[Callable[[], Dict]] = None,
+                 metrics: Optional[Callable[[], str]] = None):
+        """
+        Args:
+            respond: Fonction calculant la réponse à un message (exécutée dans le pool)
+            executor: Pool de threads ou de processus
+            workers: Nombre de workers du pool
+            max_queue: Nombre de requêtes pouvant attendre un worker libre
+            timeout: Délai maximal de calcul d'une réponse, en secondes
+            sessions: Stockage des historiques de conversation
+            readiness: Fonction renvoyant l'état du chargement des modèles
+                (get_readiness) ; sans elle le serveur est considéré prêt
+            metrics: Fonction renvoyant les mesures du pipeline au format
+                Prometheus (PipelineMetrics.to_prometheus), ajoutées à /metrics
+        """
+        self.respond = respond
+        self.executor = executor
+        self.capacity = workers + max_queue
+        self.timeout = timeout
+        self.sessions = sessions or SessionStore()
+        self.readiness = readiness
+        self.metrics = metrics
+        self.in_flight = 0
+        self.counters = {"requests": 0, "rejected": 0, "timeouts": 0, "errors": 0}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000) -> asyncio.AbstractServer:
+        """Démarre l'écoute et renvoie le serveur asyncio"""
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        sockets = ", ".join(str(s.getsockname()) for s in self._server.sockets)
+        logger.info(f"🌐 Serveur HTTP à l'écoute sur {sockets}")
+        return self._server
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8000) -> None:
+        """Démarre le serveur et traite les requêtes jusqu'à l'arrêt"""
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            keep_alive = True
+            while keep_alive:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body, keep_alive = request
+                status, payload = await self._dispatch(method, path, body)
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except _BadRequest as e:
+            self._write_response(writer, e.status, {"error": e.message}, False)
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+        if not line:
+            return None
+        try:
+            method, path, version = line.decode("latin-1").split()
+        except ValueError:
+            raise _BadRequest(HTTPStatus.BAD_REQUEST, "Ligne de requête invalide")
+
+        headers = {}
+        while True:
+            line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            raise _BadRequest(HTTPStatus.BAD_REQUEST, "En-tête Content-Length invalide")
+        if length < 0:
+            raise _BadRequest(HTTPStatus.BAD_REQUEST, "En-tête Content-Length invalide")
+        if length > MAX_BODY_SIZE:
+            raise _BadRequest(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Corps de requête trop volumineux")
+        body = await asyncio.wait_for(reader.readexactly(length), IDLE_TIMEOUT) if length else b""
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return method.upper(), path.split("?", 1)[0], headers, body, keep_alive
+
+    def is_ready(self) -> bool:
+        """Indique si les modèles du chatbot sont chargés"""
+        return self.readiness is None or self.readiness()["ready"]
+
+    def prometheus(self) -> str:
+        """Compteurs du serveur, suivis des mesures du pipeline, au format Prometheus"""
+        lines = [
+            "# TYPE chatbot_http_in_flight gauge",
+            f"chatbot_http_in_flight {self.in_flight}",
+            "# TYPE chatbot_http_sessions gauge",
+            f"chatbot_http_sessions {len(self.sessions)}",
+        ]
+        for name, value in self.counters.items():
+            lines.append(f"# TYPE chatbot_http_{name}_total counter")
+            lines.append(f"chatbot_http_{name}_total {value}")
+        text = "\n".join(lines) + "\n"
+        return text + self.metrics() if self.metrics is not None else text
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Union[Dict, str]]:
+        if path == "/health":
+            if method != "GET":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Méthode non autorisée"}
+            return HTTPStatus.OK, {
+                "status": "ok",
+                "ready": self.is_ready(),
+                "in_flight": self.in_flight,
+                "capacity": self.capacity,
+                "sessions": len(self.sessions),
+                **self.counters,
+            }
+        if path == "/ready":
+            if method != "GET":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Méthode non autorisée"}
+            readiness = self.readiness() if self.readiness is not None else {"ready": True}
+            status = HTTPStatus.OK if readiness["ready"] else HTTPStatus.SERVICE_UNAVAILABLE
+            return status, readiness
+        if path == "/metrics":
+            if method != "GET":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Méthode non autorisée"}
+            return HTTPStatus.OK, self.prometheus()
+        if path == "/chat":
+            if method != "POST":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Méthode non autorisée"}
+            return await self._chat(body)
+        return HTTPStatus.NOT_FOUND, {"error": "Ressource introuvable"}
+
+    async def _chat(self, body: bytes) -> Tuple[int, Dict]:
+        self.counters["requests"] += 1
+        try:
+            payload = json.loads(body.decode("utf-8") or "{}")
+            message = payload["message"]
+            if not isinstance(message, str) or not message.strip():
+                raise ValueError
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return HTTPStatus.BAD_REQUEST, {"error": "Champ 'message' manquant ou invalide"}
+        session_id = str(payload.get("session_id") or uuid.uuid4().hex)
+
+        # Contre-pression : pool et file d'attente pleins
+        if self.in_flight >= self.capacity:
+            self.counters["rejected"] += 1
+            return HTTPStatus.TOO_MANY_REQUESTS, {"error": "Serveur saturé, réessayez plus tard"}
+
+        self.in_flight += 1
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        future = loop.run_in_executor(self.executor, self.respond, message)
+        # La place n'est libérée qu'à la fin réelle du calcul, même après un 504
+        future.add_done_callback(self._release)
+        try:
+            response = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            return HTTPStatus.GATEWAY_TIMEOUT, {"error": "Délai de réponse dépassé", "session_id": session_id}
+        except Exception:
+            self.counters["errors"] += 1
+            logger.exception("❌ Erreur lors du calcul de la réponse")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Erreur interne"}
+
+        self.sessions.append(session_id, message, response)
+        return HTTPStatus.OK, {
+            "session_id": session_id,
+            "response": response,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+
+    def _release(self, future) -> None:
+        self.in_flight -= 1
+        if not future.cancelled() and future.exception() is not None:
+            logger.debug(f"Calcul terminé en erreur: {future.exception()}")
+
+    @staticmethod
+    def _write_response(writer: asyncio.StreamWriter, status: int, payload: Union[Dict, str],
+                        keep_alive: bool) -> None:
+        status = HTTPStatus(status)
+        if isinstance(payload, str):
+            # Texte brut (format d'exposition Prometheus)
+            body = payload.encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+
+
+class _BadRequest(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# Chatbot propre à chaque processus du pool (mode "process")
+_worker_chatbot = None
+# Compteurs partagés du pool, hérités à la création du processus
+_worker_state = None
+
+
+class _PoolReadiness:
+    """
+    État du chargement des modèles dans les processus du pool
+
+    Chaque processus incrémente des compteurs partagés au démarrage puis à la
+    fin du chargement de ses modèles (ou à son échec) : le pool est prêt quand
+    tous ses processus ont chargé les leurs.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.started = multiprocessing.Value('i', 0)
+        self.loaded = multiprocessing.Value('i', 0)
+        self.failed = multiprocessing.Value('i', 0)
+
+    def __call__(self) -> Dict:
+        loaded, failed = self.loaded.value, self.failed.value
+        return {
+            "ready": loaded >= self.workers,
+            "loading": loaded + failed < self.workers,
+            "error": f"{failed} processus n'ont pas pu charger les modèles" if failed else None,
+            "workers": {"started": self.started.value, "loaded": loaded, "failed": failed},
+        }
+
+
+def _increment(counter) -> None:
+    with counter.get_lock():
+        counter.value += 1
+
+
+def _init_worker(data_file: str, started, loaded, failed) -> None:
+    global _worker_chatbot, _worker_state
+    from ..core.chatbot import LegalAnnouncementChatbot
+    _worker_state = started
+    # Chargement différé : le processus est disponible immédiatement et les
+    # salutations n'attendent pas le modèle
+    _worker_chatbot = LegalAnnouncementChatbot(data_file, lazy=True)
+    _increment(started)
+
+    def load():
+        try:
+            _worker_chatbot.intent_matcher.ensure_ready()
+        except Exception as e:
+            logger.error(f"❌ Échec du préchargement du processus {os.getpid()}: {e}")
+            _increment(failed)
+            return
+        _increment(loaded)
+
+    threading.Thread(target=load, name="worker-warmup", daemon=True).start()
+
+
+def _worker_spawn(workers: int, timeout: float) -> None:
+    """Occupe un processus jusqu'au démarrage de tout le pool, qui ne crée ses processus qu'à la demande"""
+    deadline = time.monotonic() + timeout
+    while _worker_state.value < workers and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def _worker_respond(message: str) -> str:
+    return _worker_chatbot.intent_matcher.get_response(message)
+
+
+def create_server(data_file: str = "legal_data.json", mode: str = "thread", workers: Optional[int] = None,
+                  max_queue: int = 64, timeout: float = 5.0) -> ChatServer:
+    """
+    Construit le serveur autour de LegalAnnouncementChatbot
+
+    Args:
+        data_file: Chemin vers le fichier JSON contenant les données
+        mode: "thread" (un chatbot partagé par un pool de threads) ou
+            "process" (un chatbot par processus, pour exploiter tous les cœurs)
+        workers: Taille du pool (par défaut le nombre de cœurs)
+        max_queue: Nombre de requêtes pouvant attendre un worker libre
+        timeout: Délai maximal de calcul d'une réponse, en secondes
+
+    Returns:
+        Le serveur, à démarrer avec serve_forever
+    """
+    workers = workers or os.cpu_count() or 1
+    readiness = None
+    metrics = None
+    if mode == "process":
+        readiness = _PoolReadiness(workers)
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                       initargs=(data_file, readiness.started, readiness.loaded, readiness.failed))
+        # Une tâche par processus : tout le pool démarre et précharge ses
+        # modèles sans attendre les premières requêtes
+        for _ in range(workers):
+            executor.submit(_worker_spawn, workers, 30.0)
+        respond = _worker_respond
+    elif mode == "thread":
+        from ..core.chatbot import LegalAnnouncementChatbot
+        # Le serveur écoute immédiatement, les modèles se chargent en arrière-plan
+        chatbot = LegalAnnouncementChatbot(data_file, lazy=True)
+        chatbot.warm_up()
+        readiness = chatbot.get_readiness
+        metrics = chatbot.intent_matcher.metrics.to_prometheus
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chatbot")
+        # L'historique est conservé par session côté serveur
+        respond = chatbot.intent_matcher.get_response
+    else:
+        raise ValueError(f"Mode inconnu: {mode} (modes disponibles: thread, process)")
+    # En mode "process", les mesures du pipeline restent propres à chaque
+    # processus : /metrics n'expose que les compteurs du serveur
+    return ChatServer(respond, executor, workers, max_queue=max_queue, timeout=timeout,
+                      readiness=readiness, metrics=metrics)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur HTTP du chatbot d'annonces légales")
+    parser.add_argument("--data", default="legal_data.json", help="Base de connaissances JSON ou compilée")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+    parser.add_argument("--workers", type=int, default=None, help="Taille du pool (défaut : nombre de cœurs)")
+    parser.add_argument("--queue", type=int, default=64, help="Requêtes en attente avant de répondre 429")
+    parser.add_argument("--timeout", type=float, default=5.0, help="Délai maximal par requête, en secondes")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    server = create_server(args.data, args.mode, args.workers, args.queue, args.timeout)
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        logger.info("👋 Arrêt du serveur")
+    finally:
+        server.executor.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    main()
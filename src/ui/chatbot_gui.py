@@ -1,17 +1,46 @@
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, scrolledtext, font
-from typing import Callable
+from typing import Callable, Optional, Union
 from ..core.chatbot import LegalAnnouncementChatbot
 
+# Identifiant réservé au résultat du préchargement du chatbot
+WARMUP = 0
+
+# Intervalle de consultation de la file des réponses (ms)
+POLL_INTERVAL = 50
+
+
 class ChatbotGUI:
-    def __init__(self, chatbot: LegalAnnouncementChatbot):
+    def __init__(self, chatbot: Union[LegalAnnouncementChatbot, Callable[[], LegalAnnouncementChatbot]]):
         """
         Initialise l'interface graphique du chatbot
         
+        Les réponses sont calculées par un thread de travail : la boucle Tk ne
+        fait qu'envoyer les questions et consulter la file des réponses.
+        
         Args:
-            chatbot: Instance du chatbot
+            chatbot: Instance du chatbot, ou fonction la construisant. Dans ce
+                cas la fenêtre s'affiche immédiatement et le chatbot est chargé
+                en arrière-plan.
         """
-        self.chatbot = chatbot
+        if isinstance(chatbot, LegalAnnouncementChatbot):
+            self.chatbot: Optional[LegalAnnouncementChatbot] = chatbot
+            self._factory = None
+        else:
+            self.chatbot = None
+            self._factory = chatbot
+        
+        # Files d'échange avec le thread de travail
+        self.requests: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self.results: "queue.Queue[tuple]" = queue.Queue()
+        # Dernière question envoyée : toute réponse à une question antérieure est obsolète
+        self._latest_request = 0
+        self._pending: Optional[int] = None
+        self._ready = self.chatbot is not None
+        self._dots = 0
+        
         self.root = tk.Tk()
         self.root.title("Chatbot - La Gazette")
         self.root.geometry("600x500")
@@ -36,6 +65,11 @@ class ChatbotGUI:
         }
         
         self.setup_ui()
+        
+        self._worker_thread = threading.Thread(target=self._worker, name="chatbot-worker", daemon=True)
+        self._worker_thread.start()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.root.after(POLL_INTERVAL, self._poll_results)
     
     def setup_ui(self):
         """Configure l'interface utilisateur"""
@@ -85,6 +119,7 @@ class ChatbotGUI:
         )
         self.input_field.grid(row=0, column=0, sticky="we", padx=(0, 10))
         self.input_field.bind("<Return>", self.send_message)
+        self.input_field.bind("<Escape>", self.cancel_pending)
         
         # Style personnalisé pour le bouton
         style = ttk.Style()
@@ -105,6 +140,17 @@ class ChatbotGUI:
         )
         send_button.grid(row=0, column=1, sticky=(tk.E))
         
+        # Indicateur d'activité (chargement du modèle, réponse en cours)
+        self.status_label = tk.Label(
+            main_frame,
+            text="",
+            font=self.fonts["chat"],
+            bg=self.colors["bg"],
+            fg="#4A5568",
+            anchor="w"
+        )
+        self.status_label.grid(row=3, column=0, columnspan=2, sticky="we", pady=(5, 0))
+        
         # Configuration du redimensionnement
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(0, weight=1)
@@ -139,19 +185,91 @@ class ChatbotGUI:
         self.chat_area.config(state=tk.DISABLED)
     
     def send_message(self, event=None):
-        """Envoie le message de l'utilisateur et obtient la réponse du chatbot"""
+        """Envoie le message de l'utilisateur au thread de travail sans bloquer l'interface"""
         message = self.input_field.get().strip()
         if message:
             # Afficher le message de l'utilisateur
             self.add_message("Vous", message)
             
-            # Obtenir et afficher la réponse du chatbot
-            response = self.chatbot.get_response(message)
-            self.add_message("Assistant", response)
+            # Une nouvelle question rend obsolète celle encore en attente
+            self._latest_request += 1
+            self._pending = self._latest_request
+            self.requests.put((self._latest_request, message))
             
             # Effacer le champ de saisie
             self.input_field.delete(0, tk.END)
     
+    def cancel_pending(self, event=None):
+        """Abandonne la question en attente : sa réponse ne sera pas affichée"""
+        if self._pending is not None:
+            self._latest_request += 1
+            self._pending = None
+    
+    def _worker(self):
+        """Thread de travail : charge le chatbot puis calcule les réponses"""
+        if self.chatbot is None:
+            try:
+                self.chatbot = self._factory()
+            except Exception as e:
+                self.results.put((WARMUP, None, e))
+                return
+            self.results.put((WARMUP, None, None))
+        
+        while True:
+            item = self.requests.get()
+            if item is None:
+                return
+            request_id, message = item
+            # Question remplacée ou annulée avant son traitement : inutile de la calculer
+            if request_id != self._latest_request:
+                continue
+            try:
+                self.results.put((request_id, self.chatbot.get_response(message), None))
+            except Exception as e:
+                self.results.put((request_id, None, e))
+    
+    def _poll_results(self):
+        """Affiche les réponses disponibles puis se replanifie dans la boucle Tk"""
+        try:
+            while True:
+                request_id, response, error = self.results.get_nowait()
+                if request_id == WARMUP:
+                    self._ready = error is None
+                    if error is not None:
+                        self.add_message("Assistant", f"Impossible de charger le chatbot : {error}")
+                elif request_id == self._latest_request:
+                    self._pending = None
+                    if error is not None:
+                        self.add_message("Assistant", f"Une erreur est survenue : {error}")
+                    else:
+                        self.add_message("Assistant", response)
+        except queue.Empty:
+            pass
+        
+        self._update_status()
+        self.root.after(POLL_INTERVAL, self._poll_results)
+    
+    def _update_status(self):
+        """Met à jour l'indicateur d'activité (points animés)"""
+        loading = not self._ready and self._worker_thread.is_alive()
+        if self._ready and hasattr(self.chatbot, "get_readiness"):
+            # Chatbot différé : les modèles peuvent encore se charger en arrière-plan
+            loading = self.chatbot.get_readiness()["loading"]
+        if loading:
+            text = "Chargement du modèle"
+        elif self._pending is not None:
+            text = "L'assistant écrit"
+        else:
+            self.status_label.config(text="")
+            return
+        self._dots = (self._dots + 1) % 24
+        self.status_label.config(text=text + "." * (self._dots // 6 + 1))
+    
+    def close(self):
+        """Arrête le thread de travail et ferme la fenêtre"""
+        self.requests.put(None)
+        self.root.destroy()
+    
     def run(self):
         """Lance l'interface graphique"""
         self.root.mainloop() 
\ No newline at end of file
@@ -0,0 +1,42 @@
+import unittest
+import numpy as np
+from src.core.kb_index import KnowledgeBaseIndex
+
+
+def vectorize(text):
+    return np.zeros(4, dtype=np.float32), False
+
+
+class TestFastPath(unittest.TestCase):
+    def setUp(self):
+        """Base minimale prétraitée en minuscules, avec un mot-clé partagé"""
+        knowledge_base = {
+            "categories": {
+                "dissolution": {"keywords": ["dissolution", "fermeture", "annonce"],
+                                "examples": {"questions": ["Comment fermer ma société ?"]}},
+            },
+            "faq": {
+                "tarifs": {"keywords": ["prix", "tarif", "annonce"],
+                           "examples": {"questions": ["Combien coûte une annonce ?"],
+                                        "variations": ["Quel est le prix ?"]}},
+            },
+        }
+        self.index = KnowledgeBaseIndex(knowledge_base, str.lower, vectorize)
+
+    def test_exact_lookup_ignores_case_spacing_and_punctuation(self):
+        """Une question de la base, même recopiée approximativement, est reconnue"""
+        self.assertEqual(self.index.lookup_exact("  combien coûte une   annonce").intent_id, "faq_tarifs")
+        self.assertEqual(self.index.lookup_exact("Quel est le prix ?!").intent_id, "faq_tarifs")
+        self.assertIsNone(self.index.lookup_exact("Quel est le prix de la dissolution ?"))
+
+    def test_keyword_rule_requires_a_single_owner(self):
+        """Les lemmes doivent tous être des mots-clés propres à la même intention"""
+        self.assertEqual(self.index.lookup_keywords(["prix", "tarif"]).intent_id, "faq_tarifs")
+        self.assertIsNone(self.index.lookup_keywords(["prix", "dissolution"]))
+        self.assertIsNone(self.index.lookup_keywords(["annonce"]))
+        self.assertIsNone(self.index.lookup_keywords(["prix", "journal"]))
+        self.assertIsNone(self.index.lookup_keywords([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
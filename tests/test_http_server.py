@@ -0,0 +1,139 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from src.server.http_server import ChatServer, SessionStore, create_server
+
+
+async def request(port: int, method: str, path: str, payload=None):
+    """Envoie une requête HTTP et renvoie (statut, corps JSON)"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n"
+        f"Connection: close\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, content = raw.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(content)
+
+
+class TestChatServer(unittest.TestCase):
+    def run_with_server(self, respond, scenario, workers=1, max_queue=0, timeout=1.0, readiness=None):
+        """Démarre un serveur sur un port libre et exécute le scénario"""
+        async def main():
+            server = ChatServer(respond, ThreadPoolExecutor(workers), workers,
+                                max_queue=max_queue, timeout=timeout, readiness=readiness)
+            started = await server.start(port=0)
+            port = started.sockets[0].getsockname()[1]
+            try:
+                return await scenario(server, port)
+            finally:
+                started.close()
+                server.executor.shutdown(wait=False)
+        return asyncio.run(main())
+
+    def test_chat_keeps_session_history(self):
+        """Les échanges d'une même session sont conservés"""
+        async def scenario(server, port):
+            status, first = await request(port, "POST", "/chat", {"message": "bonjour"})
+            await request(port, "POST", "/chat", {"message": "prix", "session_id": first["session_id"]})
+            return status, first, server.sessions.history(first["session_id"])
+
+        status, first, history = self.run_with_server(lambda message: f"écho: {message}", scenario)
+        self.assertEqual(status, 200)
+        self.assertEqual(first["response"], "écho: bonjour")
+        self.assertEqual([m["content"] for m in history], ["bonjour", "écho: bonjour", "prix", "écho: prix"])
+
+    def test_invalid_requests(self):
+        """Message manquant, route inconnue et méthode non autorisée"""
+        async def scenario(server, port):
+            return [
+                (await request(port, "POST", "/chat", {"text": "x"}))[0],
+                (await request(port, "GET", "/inconnu"))[0],
+                (await request(port, "GET", "/chat"))[0],
+                (await request(port, "GET", "/health"))[0],
+            ]
+
+        self.assertEqual(self.run_with_server(str.upper, scenario), [400, 404, 405, 200])
+
+    def test_invalid_content_length(self):
+        """Longueur négative : 400, au lieu d'une connexion coupée"""
+        async def scenario(server, port):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"POST /chat HTTP/1.1\r\nContent-Length: -5\r\n\r\n")
+            await writer.drain()
+            raw = await reader.read()
+            writer.close()
+            return int(raw.split()[1])
+
+        self.assertEqual(self.run_with_server(str.upper, scenario), 400)
+
+    def test_readiness(self):
+        """/ready répond 503 tant que les modèles se chargent"""
+        state = {"ready": False, "loading": True, "error": None}
+
+        async def scenario(server, port):
+            loading = (await request(port, "GET", "/ready"))[0]
+            state.update(ready=True, loading=False)
+            return loading, (await request(port, "GET", "/ready"))[0]
+
+        self.assertEqual(self.run_with_server(str.upper, scenario, readiness=lambda: dict(state)), (503, 200))
+
+    def test_process_pool_reports_the_loading_of_every_worker(self):
+        """En mode process, /ready attend que chaque processus ait fini de charger ses modèles"""
+        server = create_server("legal_data.json", mode="process", workers=2)
+        self.addCleanup(server.executor.shutdown, cancel_futures=True)
+        deadline = time.monotonic() + 120
+        while server.readiness()["loading"] and time.monotonic() < deadline:
+            time.sleep(0.1)
+
+        readiness = server.readiness()
+        workers = readiness["workers"]
+        self.assertFalse(readiness["loading"])
+        self.assertEqual(workers["started"], 2)
+        self.assertEqual(workers["loaded"] + workers["failed"], 2)
+        # Sans le modèle spaCy installé, le chargement échoue et le serveur reste indisponible
+        self.assertEqual(readiness["ready"], workers["failed"] == 0)
+        self.assertEqual(readiness["error"] is None, workers["failed"] == 0)
+
+    def test_backpressure_and_timeout(self):
+        """Pool saturé : 429 ; calcul trop long : 504"""
+        release = threading.Event()
+
+        def slow(message):
+            release.wait(2)
+            return message
+
+        async def scenario(server, port):
+            first = asyncio.ensure_future(request(port, "POST", "/chat", {"message": "lent"}))
+            while server.in_flight == 0:
+                await asyncio.sleep(0.01)
+            rejected, _ = await request(port, "POST", "/chat", {"message": "refusé"})
+            timed_out, _ = await first
+            release.set()
+            return rejected, timed_out
+
+        start = time.monotonic()
+        self.assertEqual(self.run_with_server(slow, scenario, timeout=0.2), (429, 504))
+        self.assertLess(time.monotonic() - start, 2)
+
+
+class TestSessionStore(unittest.TestCase):
+    def test_expired_sessions_are_evicted(self):
+        """Les sessions inactives depuis plus de ttl secondes sont retirées du stockage"""
+        sessions = SessionStore(ttl=0.05)
+        sessions.append("a", "bonjour", "bonjour !")
+        time.sleep(0.1)
+        sessions.append("b", "prix", "tarifs")
+        self.assertEqual(len(sessions), 1)
+        self.assertEqual(sessions.history("a"), [])
+        self.assertEqual(len(sessions.history("b")), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+import numpy as np
+from src.nlp.intent_classifier import IntentClassifier
+from tests.test_intent_matcher import KNOWLEDGE_BASE, save_blank_model
+
+TEXTS = [
+    "Comment fermer ma société ?",
+    "créer une SAS",
+    "Combien coûte une annonce légale ?",
+    "liquidation amiable de ma SARL",
+    "texte sans rapport",
+    "immatriculer une société",
+    "prix de publication",
+]
+
+
+class TestBatchPredictions(unittest.TestCase):
+    """Classificateur entraîné quelques époques sur un pipeline français vierge"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = Path(tempfile.mkdtemp())
+        model = str(cls.tmp / "model")
+        save_blank_model(model, [json.dumps(KNOWLEDGE_BASE, ensure_ascii=False)] + TEXTS)
+        data_file = cls.tmp / "base.json"
+        data_file.write_text(json.dumps(KNOWLEDGE_BASE, ensure_ascii=False), encoding="utf-8")
+        cls.classifier = IntentClassifier(base_model=model)
+        examples = cls.classifier.prepare_training_data(str(data_file), seed=0)
+        cls.classifier.train(examples, str(cls.tmp / "classifier"), n_iter=3, eval_split=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def test_batches_match_single_predictions(self):
+        """predict_batch et iter_predictions donnent, lot par lot, les mêmes décisions que predict"""
+        expected = [self.classifier.predict(text) for text in TEXTS]
+        self.assertEqual(len(self.classifier.textcat.labels), 3)
+
+        for batch_size in (1, 3, 64):
+            batch = self.classifier.predict_batch(TEXTS, batch_size=batch_size)
+            streamed = list(self.classifier.iter_predictions(iter(TEXTS), batch_size=batch_size))
+            for predictions in (batch, streamed):
+                self.assertEqual([label for label, _ in predictions], [label for label, _ in expected])
+                np.testing.assert_allclose([score for _, score in predictions],
+                                           [score for _, score in expected], rtol=1e-5)
+
+    def test_generator_is_consumed_batch_by_batch(self):
+        """Un flux de textes est classé au fur et à mesure, sans être lu en entier"""
+        consumed = []
+
+        def stream():
+            for i in range(100):
+                consumed.append(i)
+                yield TEXTS[i % len(TEXTS)]
+
+        predictions = self.classifier.iter_predictions(stream(), batch_size=4)
+        self.assertEqual(next(predictions), self.classifier.predict(TEXTS[0]))
+        self.assertLessEqual(len(consumed), 4)
+        self.assertEqual(len(list(predictions)), 99)
+
+    def test_multiprocess_predictions_match(self):
+        """Répartir le lot sur plusieurs processus ne change pas les prédictions"""
+        expected = self.classifier.predict_batch(TEXTS, batch_size=2)
+        predictions = self.classifier.predict_batch(TEXTS, batch_size=2, n_process=2)
+        self.assertEqual([label for label, _ in predictions], [label for label, _ in expected])
+        np.testing.assert_allclose([score for _, score in predictions], [score for _, score in expected],
+                                   rtol=1e-5)
+
+    def test_top_k_is_sorted_and_starts_with_the_prediction(self):
+        """top_k renvoie les k meilleures intentions par score décroissant, la première étant celle de predict"""
+        labels, scores = self.classifier.predict_batch(TEXTS, batch_size=3, top_k=2)
+        self.assertEqual(labels.shape, (len(TEXTS), 2))
+        self.assertTrue(np.all(scores[:, 0] >= scores[:, 1]))
+        for text, row_labels, row_scores in zip(TEXTS, labels, scores):
+            label, score = self.classifier.predict(text)
+            self.assertEqual(row_labels[0], label)
+            self.assertAlmostEqual(float(row_scores[0]), score, places=5)
+
+        labels, scores = self.classifier.predict_batch([], top_k=2)
+        self.assertEqual((labels.shape, scores.shape), ((0, 2), (0, 2)))
+
+
+
+class TestTraining(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = Path(tempfile.mkdtemp())
+        cls.model = str(cls.tmp / "model")
+        save_blank_model(cls.model, [json.dumps(KNOWLEDGE_BASE, ensure_ascii=False)] + TEXTS)
+        cls.data_file = cls.tmp / "base.json"
+        cls.data_file.write_text(json.dumps(KNOWLEDGE_BASE, ensure_ascii=False), encoding="utf-8")
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def setUp(self):
+        self.classifier = IntentClassifier(base_model=self.model)
+        self.examples = self.classifier.prepare_training_data(str(self.data_file), seed=0)
+        self.output = str(self.tmp / self.id())
+
+    def test_every_intent_is_labeled_in_each_example(self):
+        """Chaque exemple porte toutes les intentions, 1.0 pour la sienne et 0.0 pour les autres"""
+        self.assertEqual(len(self.examples), 10)
+        for example in self.examples:
+            cats = example.reference.cats
+            self.assertEqual(set(cats), {"dissolution", "creation", "faq_tarifs"})
+            self.assertEqual(sorted(cats.values()), [0.0, 0.0, 1.0])
+
+    def test_history_reports_each_epoch(self):
+        """Sans évaluation, toutes les époques sont parcourues et chronométrées ; le modèle est sauvegardé"""
+        history = self.classifier.train(self.examples, self.output, n_iter=4, eval_split=0, n_threads=1)
+        self.assertEqual([epoch["epoch"] for epoch in history], [1, 2, 3, 4])
+        for epoch in history:
+            self.assertIn("textcat", epoch["losses"])
+            self.assertIsNone(epoch["score"])
+            self.assertGreater(epoch["seconds"], 0)
+
+        loaded = IntentClassifier.load(self.output, base_model=self.model)
+        for text in TEXTS:
+            label, score = self.classifier.predict(text)
+            self.assertEqual(loaded.predict(text)[0], label)
+            self.assertAlmostEqual(loaded.predict(text)[1], score, places=5)
+
+    def test_early_stopping_restores_the_best_weights(self):
+        """L'entraînement s'arrête après patience époques sans progrès et reprend les meilleurs poids"""
+        scores = iter([0.5, 0.9, 0.6, 0.4, 0.95])
+        best = {}
+
+        def evaluate(examples):
+            score = next(scores)
+            if score == 0.9:
+                best["weights"] = self.classifier.textcat.to_bytes()
+            return {"cats_score": score}
+
+        with mock.patch.object(self.classifier.nlp, "evaluate", side_effect=evaluate):
+            history = self.classifier.train(self.examples, self.output, n_iter=10, eval_split=0.2, patience=2)
+        self.assertEqual([epoch["score"] for epoch in history], [0.5, 0.9, 0.6, 0.4])
+        self.assertEqual(self.classifier.textcat.to_bytes(), best["weights"])
+
+if __name__ == '__main__':
+    unittest.main()
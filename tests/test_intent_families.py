@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.core.intent_matcher import IntentMatcher
+from src.core.kb_index import KnowledgeBaseIndex, contact_intents, find_intent_data
+
+
+def vectorize(text):
+    """Vecteur déterministe dérivé du texte"""
+    rng = np.random.default_rng(sum(map(ord, text)))
+    return rng.standard_normal(8).astype(np.float32), True
+
+
+class TestIntentFamilies(unittest.TestCase):
+    def setUp(self):
+        """Base avec une catégorie, une FAQ et un bloc de coordonnées"""
+        self.knowledge_base = {
+            "categories": {"dissolution": {"keywords": ["dissolution", "email"], "responses": ["Dissolution"]}},
+            "faq": {"tarifs": {"keywords": ["prix"], "responses": ["Tarifs"]}},
+            "contact": {"email": "contact@example.fr", "telephone": "01 23 45 67 89",
+                        "labels": {"telephone": "Téléphone"},
+                        "examples": {"questions": ["Comment vous contacter ?"]},
+                        "responses": ["Écrivez-nous :"]},
+        }
+
+    def test_contact_block_becomes_an_intent(self):
+        """Le bloc de coordonnées rejoint la table à plat comme une intention ordinaire"""
+        index = KnowledgeBaseIndex(self.knowledge_base, str.lower, vectorize)
+        self.assertEqual([intent.intent_id for intent in index.intent_list],
+                         ["dissolution", "faq_tarifs", "contact_coordonnees"])
+        contact = index.by_id["contact_coordonnees"]
+        self.assertEqual(contact.family, "contact")
+        self.assertEqual(contact.data["responses"],
+                         ["Écrivez-nous :\nemail : contact@example.fr\nTéléphone : 01 23 45 67 89"])
+        self.assertEqual(index.lookup_exact("Comment vous contacter ?").intent_id, "contact_coordonnees")
+
+    def test_contact_intent_is_derived_from_the_block(self):
+        """Sans définition dans le bloc, les libellés des coordonnées servent de mots-clés"""
+        contact = contact_intents({"email": "contact@example.fr", "adresse": "1 rue de Paris"})["coordonnees"]
+        self.assertEqual(contact["keywords"], ["email", "adresse"])
+        self.assertEqual(contact["examples"], {})
+        self.assertEqual(contact["responses"], ["email : contact@example.fr\nadresse : 1 rue de Paris"])
+        self.assertNotIn("title", contact)
+        self.assertEqual(contact_intents({"labels": {"email": "Email"}}), {})
+
+    def test_contact_keywords_never_answer_directly(self):
+        """Les mots-clés de la fiche contact ne donnent pas de réponse directe, ni ne l'accordent à d'autres"""
+        index = KnowledgeBaseIndex(self.knowledge_base, str.lower, vectorize)
+        self.assertIsNone(index.lookup_keywords(["téléphone"]))
+        self.assertIsNone(index.lookup_keywords(["email"]))
+        self.assertEqual(index.lookup_keywords(["dissolution"]).intent_id, "dissolution")
+        # Ni par correspondance exacte, même quand une variation reprend le mot-clé
+        self.knowledge_base["contact"]["examples"]["variations"] = ["Téléphone"]
+        index = KnowledgeBaseIndex(self.knowledge_base, str.lower, vectorize)
+        for keyword in ("email", "Téléphone", "téléphone ?"):
+            self.assertIsNone(index.lookup_exact(keyword))
+        self.assertEqual(index.lookup_exact("Comment vous contacter ?").intent_id, "contact_coordonnees")
+        self.assertEqual(index.lookup_exact("dissolution").intent_id, "dissolution")
+
+    def test_find_intent_data_uses_family_prefixes(self):
+        """L'identifiant désigne sa famille par son préfixe, les catégories n'en ont pas"""
+        self.assertEqual(find_intent_data(self.knowledge_base, "faq_tarifs")["responses"], ["Tarifs"])
+        self.assertEqual(find_intent_data(self.knowledge_base, "dissolution")["responses"], ["Dissolution"])
+        self.assertIsNotNone(find_intent_data(self.knowledge_base, "contact_coordonnees"))
+        self.assertIsNone(find_intent_data(self.knowledge_base, "faq_inconnue"))
+
+
+class TestBlockScoring(unittest.TestCase):
+    def test_scores_by_block_match_single_pass(self):
+        """Évaluer la table à plat par blocs d'intentions donne les mêmes scores"""
+        categories = {
+            f"intention_{i}": {
+                "keywords": [f"mot{i}", f"terme{i % 7}"],
+                "examples": {"questions": [f"question {i} sur le sujet {i % 11}"],
+                             "variations": [f"variante {i % 13}"]},
+            }
+            for i in range(60)
+        }
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+            json.dump({"categories": categories}, f)
+        self.addCleanup(os.unlink, f.name)
+
+        matcher = IntentMatcher(f.name, lazy=True)
+        index = KnowledgeBaseIndex(matcher.knowledge_base, str.lower, vectorize)
+        query = index.index_example("question 42 sur le sujet 9")
+        expected = matcher._score_intents(index, query)
+        for block in np.array_split(np.arange(len(index.intent_list)), 4):
+            for full, partial in zip(expected, matcher._score_intents(index, query, candidates=block)):
+                np.testing.assert_allclose(full[block], partial[block])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,352 @@
+import json
+import re
+import shutil
+import tempfile
+import unittest
+from difflib import SequenceMatcher
+from pathlib import Path
+import numpy as np
+import spacy
+from spacy.lookups import Lookups
+from src.core.chatbot import LegalAnnouncementChatbot
+from src.core.intent_matcher import IntentMatcher
+from src.core.kb_artifact import compile_artifact
+from src.core.vector_engine import SCORE_TOLERANCE
+
+KNOWLEDGE_BASE = {
+    "categories": {
+        "dissolution": {
+            "title": "Dissolution",
+            "keywords": ["dissolution", "fermeture", "liquidation"],
+            "examples": {"questions": ["Comment fermer ma société ?", "Je veux dissoudre mon entreprise"],
+                         "variations": ["fermer une SARL", "liquidation amiable"]},
+            "responses": ["Réponse dissolution"],
+        },
+        "creation": {
+            "title": "Création",
+            "keywords": ["création", "immatriculation", "statuts"],
+            "examples": {"questions": ["Comment créer une entreprise ?", "Publier un avis de constitution"],
+                         "variations": ["créer une SAS", "immatriculer une société"]},
+            "responses": ["Réponse création"],
+        },
+    },
+    "faq": {
+        "tarifs": {
+            "title": "Tarifs",
+            "keywords": ["prix", "tarif", "coût"],
+            "examples": {"questions": ["Combien coûte une annonce légale ?"],
+                         "variations": ["prix de publication"]},
+            "responses": ["Réponse tarifs"],
+        },
+    },
+}
+
+
+def save_blank_model(directory: Path, texts) -> None:
+    """Pipeline français vierge avec des vecteurs aléatoires pour les mots des textes"""
+    nlp = spacy.blank("fr")
+    rng = np.random.default_rng(0)
+    for word in sorted({w for text in texts for w in re.findall(r"\w+", text.lower())}):
+        nlp.vocab.set_vector(word, rng.standard_normal(16).astype(np.float32))
+    nlp.to_disk(directory)
+
+
+class MatcherTestCase(unittest.TestCase):
+    """Base écrite dans un répertoire temporaire et modèle spaCy vierge sur disque"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = Path(tempfile.mkdtemp())
+        cls.model = str(cls.tmp / "model")
+        save_blank_model(cls.model, [json.dumps(KNOWLEDGE_BASE, ensure_ascii=False),
+                                     "nouvelle question publication journal"])
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def setUp(self):
+        self.data_file = tempfile.NamedTemporaryFile("w", suffix=".json", dir=self.tmp, delete=False,
+                                                     encoding="utf-8")
+        json.dump(KNOWLEDGE_BASE, self.data_file, ensure_ascii=False)
+        self.data_file.close()
+
+    def matcher(self, **kwargs) -> IntentMatcher:
+        return IntentMatcher(self.data_file.name, model_name=self.model, **kwargs)
+
+    def write(self, knowledge_base):
+        with open(self.data_file.name, "w", encoding="utf-8") as f:
+            json.dump(knowledge_base, f, ensure_ascii=False)
+
+    def changed_base(self):
+        """Base de test complétée d'une FAQ « journal »"""
+        knowledge_base = json.loads(json.dumps(KNOWLEDGE_BASE))
+        knowledge_base["faq"]["journal"] = {
+            "keywords": ["journal"], "examples": {"questions": ["Nouvelle question publication journal"]},
+            "responses": ["Réponse journal"]}
+        return knowledge_base
+
+
+class TestPrecomputedIndex(MatcherTestCase):
+    QUERIES = ["Comment fermer ma société ?", "je voudrais créer une SAS", "prix de la publication",
+               "liquidation", "question sans rapport", "dissolusion de ma SARL"]
+
+    def per_call_scores(self, matcher, user_input):
+        """Scores calculés sans index : spaCy est appelé sur chaque texte de la base à chaque requête"""
+        nlp, preprocess = matcher.nlp, matcher.preprocessor.preprocess
+
+        def vector_similarity(text1, text2):
+            doc1, doc2 = nlp(text1), nlp(text2)
+            return doc1.similarity(doc2) if doc1.has_vector and doc2.has_vector else 0.0
+
+        query = preprocess(user_input)
+        words = set(query.split())
+        scores = []
+        for intent in matcher.index.intent_list:
+            keywords = intent.data.get("keywords", [])
+            total = 0.0
+            for keyword in keywords:
+                processed = preprocess(keyword)
+                total += ((processed in words) * 1.0
+                          + any(processed in word for word in words) * 0.7
+                          + any(SequenceMatcher(None, processed, word).ratio() > 0.8 for word in words) * 0.5
+                          + (vector_similarity(query, keyword) > 0.7) * 0.8)
+            row = [min(total / len(keywords), 1.0) if keywords else 0.0]
+            for kind in ("questions", "variations"):
+                row.append(max((SequenceMatcher(None, query, preprocess(text)).ratio() * 0.4
+                                + vector_similarity(query, preprocess(text)) * 0.6
+                                for text in intent.data.get("examples", {}).get(kind, [])), default=0.0))
+            scores.append(row)
+        return np.array(scores).T
+
+    def test_precomputed_scores_match_per_call_spacy_scores(self):
+        """Les scores lus dans l'index reproduisent ceux calculés avec spaCy à chaque requête"""
+        matcher = self.matcher(fast_path=False)
+        for query in self.QUERIES:
+            expected = self.per_call_scores(matcher, query)
+            scores = matcher._score_intents(matcher.index, matcher.index.index_example(query))
+            np.testing.assert_allclose(np.array(scores), expected, atol=SCORE_TOLERANCE, err_msg=query)
+
+            weighted = expected.T @ np.array([0.3, 0.5, 0.2])
+            intent_id, score, _ = matcher.find_best_match(query)
+            if weighted.max() >= matcher.similarity_threshold:
+                self.assertEqual(intent_id, matcher.index.intent_list[int(weighted.argmax())].intent_id)
+                self.assertAlmostEqual(score, weighted.max(), delta=SCORE_TOLERANCE)
+            else:
+                self.assertIsNone(intent_id)
+
+    def test_query_does_not_run_the_pipeline_on_the_base(self):
+        """Une requête ne prétraite et ne vectorise que son propre texte"""
+        matcher = self.matcher(fast_path=False, cache_size=0)
+        calls = []
+        vectorize = matcher.index._vectorize
+        matcher.index._vectorize = lambda text: calls.append(text) or vectorize(text)
+        matcher.find_best_match("Comment fermer ma société ?")
+        self.assertEqual(len(calls), 1)
+
+
+class TestPipelineProfiles(MatcherTestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Modèle avec un segmenteur et un lemmatiseur par table, pour distinguer les profils"""
+        super().setUpClass()
+        cls.model = str(cls.tmp / "model_lemmas")
+        save_blank_model(cls.model, [json.dumps(KNOWLEDGE_BASE, ensure_ascii=False), "sociétés"])
+        nlp = spacy.load(cls.model)
+        nlp.add_pipe("sentencizer", name="senter")
+        lookups = Lookups()
+        lookups.add_table("lemma_lookup", {"sociétés": "société", "immatriculer": "immatriculation"})
+        nlp.add_pipe("lemmatizer", config={"mode": "lookup"}).initialize(lookups=lookups)
+        nlp.to_disk(cls.model)
+
+    def test_profiles_load_only_their_components(self):
+        """Chaque profil exclut au chargement les composants qu'il n'utilise pas"""
+        expected = {"full": ["senter", "lemmatizer"], "lemmas": ["lemmatizer"], "vectors-only": []}
+        for profile, components in expected.items():
+            matcher = self.matcher(pipeline_profile=profile)
+            self.assertEqual(matcher.nlp.pipe_names, components)
+            self.assertEqual(matcher.preprocessor.use_lemmas, profile != "vectors-only")
+        with self.assertRaises(ValueError):
+            self.matcher(pipeline_profile="parser-only")
+
+    def test_lemmas_profile_preprocesses_like_the_full_pipeline(self):
+        """Le profil lemmas donne les mêmes textes et les mêmes scores que le pipeline complet"""
+        full, lemmas = self.matcher(pipeline_profile="full"), self.matcher(pipeline_profile="lemmas")
+        vectors_only = self.matcher(pipeline_profile="vectors-only")
+        query = "Je veux fermer mes sociétés"
+        self.assertEqual(lemmas._preprocess_text(query), full._preprocess_text(query))
+        self.assertIn("société", lemmas._preprocess_text(query).split())
+        # Sans lemmatiseur, la forme minuscule remplace le lemme
+        self.assertIn("sociétés", vectors_only._preprocess_text(query).split())
+
+        np.testing.assert_allclose(lemmas.index.engine.matrix, full.index.engine.matrix)
+        for text in ("Comment fermer ma société ?", "immatriculer une SAS"):
+            self.assertEqual(lemmas.find_best_match(text)[:2], full.find_best_match(text)[:2])
+
+
+class TestCandidates(MatcherTestCase):
+    def test_explicit_zero_limit_disables_the_shortlist(self):
+        """limit=0 évalue toute la base au lieu de reprendre candidate_limit"""
+        matcher = self.matcher(candidate_limit=1)
+        query = matcher.index.index_example("fermer société prix")
+        self.assertEqual(len(matcher._candidates(matcher.index, query)), 1)
+        self.assertIsNone(matcher._candidates(matcher.index, query, 0))
+        self.assertEqual(len(matcher._candidates(matcher.index, query, 2)), 2)
+
+    def test_negative_limit_is_rejected(self):
+        """Un nombre de candidates négatif est refusé à la construction comme à l'appel"""
+        with self.assertRaises(ValueError):
+            self.matcher(candidate_limit=-1)
+        matcher = self.matcher(candidate_limit=1)
+        query = matcher.index.index_example("fermer société prix")
+        with self.assertRaises(ValueError):
+            matcher._candidates(matcher.index, query, -1)
+
+
+class TestLoading(MatcherTestCase):
+    def test_lazy_matcher_loads_in_the_background(self):
+        """lazy=True diffère le chargement ; warm_up le lance et get_readiness le suit"""
+        matcher = self.matcher(lazy=True)
+        self.assertFalse(matcher.is_ready())
+        self.assertIsNone(matcher.index)
+        self.assertEqual(matcher.get_readiness(), {"ready": False, "loading": False, "error": None})
+
+        matcher.warm_up()
+        self.assertTrue(matcher.wait_until_ready(60))
+        self.assertEqual(matcher.get_readiness(), {"ready": True, "loading": False, "error": None})
+        self.assertEqual(matcher.find_best_match("Comment fermer ma société ?")[0], "dissolution")
+
+    def test_failed_load_is_reported_then_retried(self):
+        """Un échec de chargement est signalé et un nouvel appel à ensure_ready le retente"""
+        matcher = self.matcher(lazy=True)
+        matcher.model_name = str(self.tmp / "absent")
+        with self.assertLogs("src.core.intent_matcher", level="ERROR"), self.assertRaises(OSError):
+            matcher.ensure_ready()
+        readiness = matcher.get_readiness()
+        self.assertFalse(readiness["ready"])
+        self.assertFalse(readiness["loading"])
+        self.assertIsNotNone(readiness["error"])
+
+        matcher.model_name = self.model
+        matcher.ensure_ready()
+        self.assertEqual(matcher.get_readiness(), {"ready": True, "loading": False, "error": None})
+
+
+class TestReload(MatcherTestCase):
+    def test_changed_file_is_reindexed_with_its_vocabulary(self):
+        """Le nouvel index et son correcteur sont mis en service ensemble"""
+        matcher = self.matcher()
+        version = matcher.kb_version
+        self.assertNotIn("journal", matcher.preprocessor.speller)
+        self.write(self.changed_base())
+
+        self.assertTrue(matcher.reload())
+        self.assertEqual(matcher.kb_version, version + 1)
+        self.assertIs(matcher.preprocessor, matcher.index.preprocessor)
+        self.assertIn("journal", matcher.preprocessor.speller)
+        self.assertEqual(matcher.find_best_match("Nouvelle question publication journal")[0], "faq_journal")
+        self.assertFalse(matcher.reload())
+
+    def test_failed_build_keeps_the_serving_index_and_speller(self):
+        """Une indexation qui échoue laisse l'index et le correcteur en service intacts"""
+        matcher = self.matcher()
+        index, preprocessor = matcher.index, matcher.preprocessor
+        self.write(self.changed_base())
+
+        def fail(text):
+            raise RuntimeError("vectorisation impossible")
+        matcher._vectorize = fail
+        with self.assertLogs("src.core.intent_matcher", level="ERROR"):
+            self.assertFalse(matcher.reload())
+        self.assertIs(matcher.index, index)
+        self.assertIs(matcher.preprocessor, preprocessor)
+        self.assertNotIn("journal", matcher.preprocessor.speller)
+        self.assertEqual(matcher.find_best_match("Comment fermer ma société ?")[0], "dissolution")
+
+
+class TestContactIntent(MatcherTestCase):
+    def test_contact_keyword_alone_goes_through_scoring(self):
+        """Un mot-clé générique de la fiche contact n'obtient pas de réponse directe"""
+        knowledge_base = json.loads(json.dumps(KNOWLEDGE_BASE))
+        knowledge_base["contact"] = {"email": "contact@example.fr", "telephone": "01 23 45 67 89",
+                                     "keywords": ["contact", "email", "téléphone"],
+                                     "examples": {"questions": ["Comment vous contacter ?"],
+                                                  "variations": ["contact"]}}
+        self.write(knowledge_base)
+        matcher = self.matcher()
+        for keyword in ("email", "téléphone", "Contact"):
+            self.assertIsNone(matcher.index.lookup_exact(keyword))
+            self.assertNotIn(matcher.find_best_match_with_path(keyword)[3], ("exact", "keyword"))
+        self.assertEqual(matcher.find_best_match_with_path("Comment vous contacter ?")[::3],
+                         ("contact_coordonnees", "exact"))
+
+
+class TestBatchMatching(MatcherTestCase):
+    QUERIES = ["Comment fermer ma société ?", "prix tarif", "je voudrais créer une SAS", "liquidation",
+               "question sans rapport", "dissolusion de ma SARL", "Combien coûte une annonce légale ?",
+               "immatriculer une société", "", "prix de publication", "Comment fermer ma société ?"]
+
+    def assert_same_as_single_queries(self, matcher, **kwargs):
+        expected = [matcher.find_best_match_with_path(query)[:3] for query in self.QUERIES]
+        results = matcher.find_best_matches(self.QUERIES, batch_size=4, **kwargs)
+        self.assertEqual([r[0] for r in results], [e[0] for e in expected])
+        np.testing.assert_allclose([r[1] for r in results], [e[1] for e in expected], atol=SCORE_TOLERANCE)
+        self.assertEqual([r[2] for r in results], [e[2] for e in expected])
+
+    def test_batch_matches_single_queries(self):
+        """Le traitement par lot donne, requête par requête, le résultat de find_best_match_with_path"""
+        for options in ({"fast_path": True}, {"fast_path": False}, {"candidate_limit": 1},
+                        {"fast_path": False, "candidate_limit": 2}):
+            with self.subTest(**options):
+                self.assert_same_as_single_queries(self.matcher(cache_size=0, **options))
+
+    def test_multiprocess_batch_matches_single_queries(self):
+        """Le prétraitement réparti sur plusieurs processus ne change pas les résultats"""
+        self.assert_same_as_single_queries(self.matcher(cache_size=0, fast_path=False), n_process=2)
+        self.assert_same_as_single_queries(self.matcher(cache_size=0), n_process=2)
+
+    def test_chatbot_batch_leaves_the_history_alone(self):
+        """LegalAnnouncementChatbot.find_best_matches délègue au détecteur sans toucher à l'historique"""
+        matcher = self.matcher(cache_size=0)
+        chatbot = LegalAnnouncementChatbot(intent_matcher=matcher)
+        self.assertEqual(chatbot.find_best_matches(self.QUERIES, batch_size=3),
+                         matcher.find_best_matches(self.QUERIES))
+        self.assertEqual(chatbot.get_conversation_history(), [])
+
+
+class TestCompiledBase(MatcherTestCase):
+    def test_compiled_base_restores_the_query_speller(self):
+        """Le correcteur des requêtes est relu de l'artefact avec son index de suppressions"""
+        matcher = self.matcher()
+        artifact = self.tmp / "speller.kb"
+        with open(self.data_file.name, "rb") as f:
+            compile_artifact(matcher.index, artifact, f.read(), matcher.pipeline_signature())
+        compiled = IntentMatcher(str(artifact), model_name=self.model)
+
+        built, opened = matcher.preprocessor.speller, compiled.preprocessor.speller
+        self.assertEqual(opened.frequencies, built.frequencies)
+        self.assertEqual(opened.deletion_index(), built.deletion_index())
+        self.assertEqual(opened.correct("dissolusion"), "dissolution")
+        self.assertEqual(compiled.find_best_match("Comment fermer ma société ?")[0], "dissolution")
+
+
+class TestIncrementalUpdates(MatcherTestCase):
+    def test_update_of_a_compiled_base_skips_the_artifact(self):
+        """Une modification incrémentale réindexe sans consulter ni signaler l'artefact"""
+        matcher = self.matcher()
+        artifact = self.tmp / "base.kb"
+        with open(self.data_file.name, "rb") as f:
+            compile_artifact(matcher.index, artifact, f.read(), matcher.pipeline_signature())
+        compiled = IntentMatcher(str(artifact), model_name=self.model)
+
+        knowledge_base = dict(compiled.knowledge_base)
+        knowledge_base["faq"] = dict(knowledge_base["faq"], delais={
+            "keywords": ["délai"], "examples": {"questions": ["Quel est le délai de publication ?"]},
+            "responses": ["Réponse délais"]})
+        with self.assertNoLogs("src.core.intent_matcher", level="WARNING"):
+            compiled.update_intents(knowledge_base, {"faq_delais"})
+        self.assertEqual(compiled.find_best_match("Quel est le délai de publication ?")[0], "faq_delais")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import hashlib
+import json
+import tempfile
+import unittest
+import numpy as np
+from src.core.kb_artifact import KnowledgeBaseArtifact, artifact_source, compile_artifact
+from src.core.kb_index import KnowledgeBaseIndex
+
+
+def vectorize(text):
+    """Vecteur déterministe, nul pour les textes sans voyelle"""
+    vector = np.array([text.count(c) for c in "aeiu"], dtype=np.float32)
+    return vector, bool(vector.any())
+
+
+class TestKnowledgeBaseArtifact(unittest.TestCase):
+    def setUp(self):
+        self.knowledge_base = {
+            "categories": {
+                "dissolution": {"keywords": ["dissolution", "fermeture"],
+                                "examples": {"questions": ["Comment fermer ma société ?"],
+                                             "variations": ["Fermer une SARL"]}},
+            },
+            "faq": {
+                "tarifs": {"keywords": ["prix", "tarif"],
+                           "examples": {"questions": ["Combien coûte une annonce ?"]}},
+            },
+            "contact": {"email": "contact@exemple.fr"},
+        }
+        self.source = json.dumps(self.knowledge_base, ensure_ascii=False).encode("utf-8")
+        self.index = KnowledgeBaseIndex(self.knowledge_base, str.lower, vectorize)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        compile_artifact(self.index, self.tmp.name, self.source, "test")
+
+    def test_reopened_index_is_identical(self):
+        """L'index ouvert depuis l'artefact reproduit l'index construit"""
+        artifact = KnowledgeBaseArtifact(self.tmp.name)
+        self.assertIsInstance(artifact.vectors, np.memmap)
+        index = KnowledgeBaseIndex.from_artifact(artifact, self.knowledge_base, str.lower, vectorize)
+
+        self.assertEqual([i.intent_id for i in index.intent_list], [i.intent_id for i in self.index.intent_list])
+        for built, opened in zip(self.index.intent_list, index.intent_list):
+            self.assertEqual([t.processed for t in built.examples], [t.processed for t in opened.examples])
+            self.assertEqual([t.raw for t in built.keywords], [t.raw for t in opened.keywords])
+            self.assertEqual(opened.data, built.data)
+        np.testing.assert_array_equal(index.engine.matrix, self.index.engine.matrix)
+        np.testing.assert_array_equal(index.lexical.scores(["fermer", "prix"]),
+                                      self.index.lexical.scores(["fermer", "prix"]))
+        self.assertEqual(index.lookup_exact("combien coûte une annonce").intent_id, "faq_tarifs")
+        # Index construit sans préprocesseur : pas de correcteur enregistré
+        self.assertIsNone(artifact.speller())
+
+    def test_manifest_guards_derived_data(self):
+        """Les données dérivées ne valent que pour la même source et le même prétraitement"""
+        artifact = KnowledgeBaseArtifact(self.tmp.name)
+        digest = hashlib.sha256(self.source).hexdigest()
+        self.assertTrue(artifact.matches(digest, "test"))
+        self.assertFalse(artifact.matches(digest, "autre"))
+        self.assertFalse(artifact.matches(hashlib.sha256(b"{}").hexdigest(), "test"))
+        with open(artifact_source(self.tmp.name), "rb") as f:
+            self.assertEqual(f.read(), self.source)
+
+
+if __name__ == '__main__':
+    unittest.main()
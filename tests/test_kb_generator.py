@@ -0,0 +1,47 @@
+import unittest
+import numpy as np
+from src.core.kb_index import KnowledgeBaseIndex
+from src.data.kb_generator import KnowledgeBaseGenerator
+
+
+def vectorize(text):
+    return np.zeros(4, dtype=np.float32), False
+
+
+class TestKnowledgeBaseGenerator(unittest.TestCase):
+    def setUp(self):
+        self.knowledge_base, self.queries = KnowledgeBaseGenerator(seed=1).generate(
+            300, faq_ratio=0.1, queries_per_intent=2
+        )
+
+    def test_schema_and_size(self):
+        """Même schéma que legal_data.json, au nombre d'intentions demandé"""
+        categories, faq = self.knowledge_base["categories"], self.knowledge_base["faq"]
+        self.assertEqual(len(categories) + len(faq), 300)
+        self.assertEqual(len(faq), 30)
+        for entry in list(categories.values()) + list(faq.values()):
+            self.assertTrue(entry["keywords"])
+            self.assertTrue(entry["examples"]["questions"])
+            self.assertTrue(entry["examples"]["variations"])
+            self.assertTrue(entry["responses"][0]["content"])
+            self.assertIn("type", entry["context"])
+
+    def test_queries_are_labeled_and_held_out(self):
+        """Chaque requête désigne une intention de l'index et ne recopie pas un exemple"""
+        index = KnowledgeBaseIndex(self.knowledge_base, str.lower, vectorize)
+        examples = {text for intent in index.intent_list for text in intent.data["examples"]["questions"]}
+        self.assertEqual(len(self.queries), 270 * 2 + 30)
+        for query in self.queries:
+            self.assertIn(query["intent"], index.by_id)
+            self.assertNotIn(query["text"], examples)
+
+    def test_generation_is_deterministic(self):
+        """Une même graine produit la même base et les mêmes requêtes"""
+        again = KnowledgeBaseGenerator(seed=1).generate(300, faq_ratio=0.1, queries_per_intent=2)
+        self.assertEqual(again, (self.knowledge_base, self.queries))
+        other = KnowledgeBaseGenerator(seed=2).generate(300, faq_ratio=0.1, queries_per_intent=2)
+        self.assertNotEqual(other[1], self.queries)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from src.data.data_manager import DataManager
+from src.data.kb_store import KnowledgeBaseStore
+
+
+class TestKnowledgeBaseStore(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.data_file = Path(tmp.name) / "base.json"
+        self.store = KnowledgeBaseStore(self.data_file)
+        self.store.write_snapshot({"faq": {"tarifs": {"question": "Prix ?"}}})
+
+    def test_journal_is_replayed_and_torn_lines_ignored(self):
+        """Un lot interrompu en cours d'écriture n'est pas appliqué et n'absorbe pas le suivant"""
+        self.store.append([{"path": ["faq", "delais"], "value": {"question": "Délais ?"}}])
+        with open(self.store.journal_file, "ab") as f:
+            f.write(b'[{"path": ["faq", "perdu"], "val')
+        self.store.append([{"path": ["contact", "email"], "value": "a@b.fr"}])
+
+        data = self.store.load()
+        self.assertEqual(sorted(data["faq"]), ["delais", "tarifs"])
+        self.assertEqual(data["contact"], {"email": "a@b.fr"})
+
+    def test_snapshot_merges_the_journal(self):
+        """La fusion remplace le fichier JSON et supprime le journal, sans changer la base"""
+        self.store.append([{"path": ["faq", "delais"], "value": {"question": "Délais ?"}}])
+        data = self.store.load()
+        self.store.write_snapshot(data)
+        self.assertFalse(self.store.journal_file.exists())
+        with open(self.data_file, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), data)
+        self.assertEqual(sorted(p.name for p in self.data_file.parent.iterdir()), ["base.json", "base.json.lock"])
+
+    def test_snapshot_keeps_the_file_permissions(self):
+        """Le nouvel instantané garde les droits du fichier qu'il remplace"""
+        os.chmod(self.data_file, 0o640)
+        self.store.write_snapshot({"faq": {}})
+        self.assertEqual(self.data_file.stat().st_mode & 0o777, 0o640)
+
+
+class TestDataManager(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.data_file = Path(tmp.name) / "base.json"
+        self.manager = DataManager(str(self.data_file), compact_ratio=100)
+        self.notifications = []
+        self.manager.subscribe(lambda data, changed: self.notifications.append(changed))
+
+    def test_default_data_is_created(self):
+        self.assertTrue(self.data_file.exists())
+        self.assertIn("tarifs", self.manager.knowledge_base["faq"])
+
+    def test_edits_are_journaled_without_rewriting_the_file(self):
+        """Chaque modification ajoute une ligne au journal et désigne les intentions touchées"""
+        content = self.data_file.read_bytes()
+        self.manager.add_faq("devis", "Comment obtenir un devis ?", "Sur demande.")
+        self.manager.set_value(["contact", "email"], "nouveau@exemple.fr")
+
+        self.assertEqual(self.data_file.read_bytes(), content)
+        self.assertEqual(len(self.manager.store.journal_file.read_text(encoding="utf-8").splitlines()), 2)
+        self.assertEqual(self.notifications, [{"faq_devis"}, {"contact_coordonnees"}])
+        reloaded = DataManager(str(self.data_file))
+        self.assertEqual(reloaded.knowledge_base, self.manager.knowledge_base)
+
+    def test_batch_commits_once_or_not_at_all(self):
+        """Un lot est validé en une fois ; interrompu par une exception, il est annulé"""
+        with self.manager.batch():
+            self.manager.add_category("cession", "Cession", ["cession"], ["..."])
+            self.manager.add_faq("devis", "Devis ?", "Sur demande.")
+        self.assertEqual(self.notifications, [{"cession", "faq_devis"}])
+
+        before = json.loads(json.dumps(self.manager.knowledge_base))
+        with self.assertRaises(RuntimeError):
+            with self.manager.batch():
+                self.manager.add_faq("devis", "Autre ?", "Autre.")
+                self.manager.add_faq("annule", "Annulée ?", "Oui.")
+                raise RuntimeError
+        self.assertEqual(self.manager.knowledge_base, before)
+        self.assertEqual(len(self.notifications), 1)
+        self.assertEqual(DataManager(str(self.data_file)).knowledge_base, before)
+
+    def test_notified_base_is_never_modified_afterwards(self):
+        """Les modifications d'un lot en cours ou annulé n'atteignent pas la base transmise"""
+        received = []
+        self.manager.subscribe(lambda data, changed: received.append(data))
+        self.manager.add_faq("devis", "Devis ?", "Sur demande.")
+        served = json.loads(json.dumps(received[0]))
+        with self.assertRaises(RuntimeError):
+            with self.manager.batch():
+                self.manager.set_value(["faq", "devis", "answer"], "NON VALIDÉ")
+                self.manager.set_value(["faq", "tarifs", "answer"], "NON VALIDÉ")
+                self.assertEqual(received[0], served)
+                raise RuntimeError
+        self.assertEqual(received[0], served)
+        self.assertEqual(self.manager.knowledge_base, served)
+
+    def test_failed_write_is_rolled_back_and_not_notified(self):
+        """Une modification qui n'a pas pu être journalisée n'est ni conservée ni transmise"""
+        before = self.manager.knowledge_base
+
+        def fail(changes):
+            raise OSError("disque plein")
+        self.manager.store.append = fail
+        with self.assertRaises(OSError):
+            self.manager.add_faq("devis", "Devis ?", "Sur demande.")
+        self.assertEqual(self.manager.knowledge_base, before)
+        self.assertEqual(self.notifications, [])
+
+    def test_compaction_keeps_edits_of_other_writers(self):
+        """La fusion relit le journal : les modifications d'une autre instance sont conservées"""
+        other = DataManager(str(self.data_file))
+        other.add_faq("de_b", "B ?", "B")
+        self.manager.add_faq("de_a", "A ?", "A")
+        self.manager.compact()
+        self.assertFalse(self.manager.store.journal_file.exists())
+        faq = DataManager(str(self.data_file)).knowledge_base["faq"]
+        self.assertIn("de_a", faq)
+        self.assertIn("de_b", faq)
+        self.assertIn("de_b", self.manager.knowledge_base["faq"])
+
+
+if __name__ == '__main__':
+    unittest.main()
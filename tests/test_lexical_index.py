@@ -0,0 +1,41 @@
+import unittest
+import numpy as np
+from src.core.kb_index import IndexedIntent, IndexedText
+from src.core.lexical_index import LexicalIndex
+
+
+def make_texts(*texts):
+    return [IndexedText(text, text, np.zeros(0, dtype=np.float32), False) for text in texts]
+
+
+class TestLexicalIndex(unittest.TestCase):
+    def setUp(self):
+        """Trois intentions partageant certains lemmes"""
+        self.intents = [
+            IndexedIntent("creation", "categories", "creation", {},
+                          keywords=make_texts("créer", "entreprise"),
+                          examples=make_texts("créer entreprise", "créer société"), variations=[]),
+            IndexedIntent("dissolution", "categories", "dissolution", {},
+                          keywords=make_texts("dissolution"),
+                          examples=make_texts("fermer société", "dissolution entreprise"), variations=[]),
+            IndexedIntent("faq_tarifs", "faq", "tarifs", {},
+                          keywords=make_texts("prix", "tarif"),
+                          examples=make_texts("prix annonce"), variations=make_texts("coût annonce")),
+        ]
+        self.index = LexicalIndex(self.intents)
+
+    def test_scores_favour_specific_terms(self):
+        """Un lemme présent dans une seule intention pèse plus qu'un lemme partagé"""
+        scores = self.index.scores(["créer", "société"])
+        self.assertGreater(scores[0], scores[1])
+        self.assertEqual(scores[2], 0.0)
+
+    def test_shortlist_keeps_index_order(self):
+        """Les candidates sont limitées, de score positif et dans l'ordre de l'index"""
+        np.testing.assert_array_equal(self.index.shortlist(["prix", "entreprise"], 5), [0, 1, 2])
+        np.testing.assert_array_equal(self.index.shortlist(["prix", "entreprise"], 1), [2])
+        self.assertEqual(len(self.index.shortlist(["inconnu"], 5)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from unittest import mock
+from src.core.match_cache import MatchCache, normalize_query
+from tests.test_intent_matcher import MatcherTestCase
+
+
+class TestMatchCache(unittest.TestCase):
+    def test_normalize_query(self):
+        """Les variantes de casse, d'espaces et de ponctuation finale partagent la même clé"""
+        self.assertEqual(
+            normalize_query("  Combien coûte   une annonce légale ? "),
+            normalize_query("combien coûte une annonce légale")
+        )
+
+    def test_lru_eviction(self):
+        """L'entrée la moins récemment utilisée est évincée"""
+        cache = MatchCache(maxsize=2)
+        cache.put("a", ("faq_tarifs", 0.9))
+        cache.put("b", ("faq_delais", 0.8))
+        cache.get("a")
+        cache.put("c", (None, 0.0))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), ("faq_tarifs", 0.9))
+        self.assertEqual(cache.get("c"), (None, 0.0))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_version_invalidation(self):
+        """Une entrée d'une version antérieure de la base n'est jamais renvoyée"""
+        cache = MatchCache()
+        cache.put("prix", ("faq_tarifs", 0.9), version=1)
+        self.assertIsNone(cache.get("prix", version=2))
+        self.assertEqual(len(cache), 0)
+
+    def test_ttl_expiration(self):
+        """Les entrées expirent après leur durée de vie"""
+        cache = MatchCache(ttl=10)
+        with mock.patch("src.core.match_cache.time.monotonic", return_value=100.0):
+            cache.put("prix", ("faq_tarifs", 0.9))
+        with mock.patch("src.core.match_cache.time.monotonic", return_value=105.0):
+            self.assertIsNotNone(cache.get("prix"))
+        with mock.patch("src.core.match_cache.time.monotonic", return_value=111.0):
+            self.assertIsNone(cache.get("prix"))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["expirations"]), (1, 1, 1))
+
+
+class TestMatcherCache(MatcherTestCase):
+    def test_index_swap_invalidates_cached_decisions(self):
+        """Après un rechargement ou une mise à jour, les décisions de l'ancien index ne sont plus servies"""
+        matcher = self.matcher(cache_size=8)
+        query = "Nouvelle question publication journal"
+        before = matcher.match(query)[0]
+        self.assertEqual(matcher.match(query)[0], before)
+        self.assertEqual(matcher.get_cache_stats()["hits"], 1)
+
+        self.write(self.changed_base())
+        self.assertTrue(matcher.reload())
+        self.assertEqual(matcher.match(query)[0], "faq_journal")
+        self.assertEqual(matcher.get_cache_stats()["hits"], 1)
+
+        knowledge_base = self.changed_base()
+        knowledge_base["faq"]["journal"]["examples"]["questions"] = ["Autre question"]
+        knowledge_base["faq"]["publication"] = {"examples": {"questions": [query]}, "responses": ["Réponse"]}
+        matcher.update_intents(knowledge_base, {"faq_journal", "faq_publication"})
+        self.assertEqual(matcher.match(query)[0], "faq_publication")
+        self.assertEqual(matcher.path_counts["cache"], 1)
+
+    def test_cached_decisions_expire(self):
+        """Une décision plus ancienne que cache_ttl est recalculée"""
+        matcher = self.matcher(cache_size=8, cache_ttl=10)
+        query = "Comment fermer ma société ?"
+        with mock.patch("src.core.match_cache.time.monotonic", return_value=100.0):
+            matcher.match(query)
+        with mock.patch("src.core.match_cache.time.monotonic", return_value=105.0):
+            self.assertEqual(matcher.match(query)[0], "dissolution")
+        self.assertEqual(matcher.path_counts["cache"], 1)
+        with mock.patch("src.core.match_cache.time.monotonic", return_value=111.0):
+            self.assertEqual(matcher.match(query)[0], "dissolution")
+        self.assertEqual(matcher.path_counts["cache"], 1)
+        self.assertEqual(matcher.get_cache_stats()["expirations"], 1)
+
+    def test_least_recently_used_decision_is_evicted(self):
+        """Le cache garde au plus cache_size décisions, en évinçant la moins récemment servie"""
+        matcher = self.matcher(cache_size=2)
+        dissolution, creation, tarifs = ("Comment fermer ma société ?", "Comment créer une entreprise ?",
+                                         "Combien coûte une annonce légale ?")
+        for query in (dissolution, creation, dissolution, tarifs):
+            matcher.match(query)
+        stats = matcher.get_cache_stats()
+        self.assertEqual((stats["size"], stats["evictions"], stats["hits"]), (2, 1, 1))
+
+        matcher.match(dissolution)
+        self.assertEqual(matcher.get_cache_stats()["hits"], 2)
+        self.assertEqual(matcher.match(creation)[0], "creation")
+        self.assertEqual(matcher.get_cache_stats()["hits"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
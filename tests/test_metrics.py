@@ -0,0 +1,55 @@
+import json
+import unittest
+from src.core.metrics import Histogram, PipelineMetrics
+
+
+class TestHistogram(unittest.TestCase):
+    def test_cumulative_buckets_and_quantiles(self):
+        """Chaque borne compte les valeurs inférieures ou égales"""
+        histogram = Histogram((0.01, 0.1, 1.0))
+        for value in (0.005, 0.01, 0.05, 0.5, 2.0):
+            histogram.observe(value)
+        self.assertEqual(histogram.cumulative(), [("0.01", 2), ("0.1", 3), ("1.0", 4), ("+Inf", 5)])
+        self.assertEqual(histogram.quantile(0.5), 0.1)
+        self.assertIsNone(histogram.quantile(1.0))
+        self.assertAlmostEqual(histogram.sum, 2.565)
+
+
+class TestPipelineMetrics(unittest.TestCase):
+    def test_stages_follow_the_query_sampling_decision(self):
+        """Une requête non échantillonnée ne mesure aucune étape, les compteurs restent tenus"""
+        metrics = PipelineMetrics(sample_rate=0.0)
+        with metrics.query():
+            with metrics.stage("preprocessing"):
+                pass
+            metrics.increment("queries", path="exact")
+        self.assertEqual(metrics.histograms, {})
+        self.assertEqual(metrics.snapshot()["counters"]["queries"], [{"labels": {"path": "exact"}, "value": 1}])
+
+        metrics = PipelineMetrics(sample_rate=1.0)
+        with metrics.query():
+            with metrics.query():
+                with metrics.stage("preprocessing"):
+                    pass
+        self.assertEqual(metrics.histograms["preprocessing"].count, 1)
+        # Les portées imbriquées ne mesurent la durée totale qu'une fois
+        self.assertEqual(metrics.histograms["total"].count, 1)
+
+    def test_exports(self):
+        """Format texte Prometheus et JSON"""
+        metrics = PipelineMetrics(buckets=(0.1,))
+        metrics.observe("keywords", 0.05)
+        metrics.increment("queries", 2, path="scoring")
+        text = metrics.to_prometheus()
+        self.assertIn('chatbot_stage_seconds_bucket{stage="keywords",le="0.1"} 1', text)
+        self.assertIn('chatbot_stage_seconds_count{stage="keywords"} 1', text)
+        self.assertIn('chatbot_queries_total{path="scoring"} 2', text)
+        self.assertEqual(json.loads(metrics.to_json())["stages"]["keywords"]["count"], 1)
+
+    def test_invalid_sample_rate(self):
+        with self.assertRaises(ValueError):
+            PipelineMetrics(sample_rate=1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
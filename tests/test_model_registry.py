@@ -0,0 +1,70 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+import spacy
+from src.nlp import model_registry
+from src.nlp.intent_classifier import IntentClassifier
+from tests.test_intent_matcher import save_blank_model
+
+
+class TestModelRegistry(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = Path(tempfile.mkdtemp())
+        cls.model = str(cls.tmp / "model")
+        save_blank_model(cls.model, ["fermer une société", "créer une entreprise"])
+        nlp = spacy.load(cls.model)
+        nlp.add_pipe("sentencizer", name="senter")
+        nlp.to_disk(cls.model)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def setUp(self):
+        model_registry.clear_models()
+        self.addCleanup(model_registry.clear_models)
+
+    def test_model_is_loaded_once_per_process(self):
+        """Un même modèle est chargé une seule fois ; ses variantes partagent le vocabulaire"""
+        with mock.patch("spacy.load", wraps=spacy.load) as load:
+            nlp = model_registry.load_model(self.model)
+            self.assertIs(model_registry.load_model(self.model), nlp)
+            self.assertEqual(load.call_count, 1)
+
+            light = model_registry.load_model(self.model, exclude=["senter"])
+            self.assertIsNot(light, nlp)
+            self.assertEqual(light.pipe_names, [])
+            self.assertIs(light.vocab, nlp.vocab)
+            self.assertEqual(load.call_count, 2)
+        self.assertEqual(model_registry.loaded_models(), [(self.model, ()), (self.model, ("senter",))])
+
+    def test_private_pipeline_shares_the_vocabulary(self):
+        """Une copie privée peut être modifiée sans toucher à l'instance partagée, mais partage ses vecteurs"""
+        shared = model_registry.load_model(self.model)
+        private = model_registry.new_pipeline(self.model)
+        private.add_pipe("textcat")
+        self.assertIs(private.vocab, shared.vocab)
+        self.assertNotIn("textcat", shared.pipe_names)
+        self.assertEqual(model_registry.load_model(self.model).pipe_names, ["senter"])
+
+    def test_classifier_reuses_the_base_model(self):
+        """Le classificateur réutilise le vocabulaire du modèle de base, sans le recharger à chaque appel"""
+        base = model_registry.load_model(self.model)
+        classifier = IntentClassifier(base_model=self.model)
+        self.assertIs(classifier.nlp.vocab, base.vocab)
+        for label in ("dissolution", "creation"):
+            classifier.textcat.add_label(label)
+        classifier.nlp.initialize()
+        classifier.save(str(self.tmp / "classifier"))
+
+        loaded = IntentClassifier.load(str(self.tmp / "classifier"), base_model=self.model)
+        self.assertIs(loaded.nlp.vocab, base.vocab)
+        self.assertEqual(loaded.nlp.pipe_names, ["textcat"])
+        self.assertIs(IntentClassifier.load(str(self.tmp / "classifier"), base_model=self.model).nlp, loaded.nlp)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+import numpy as np
+from src.core.ngram_similarity import NgramSimilarityIndex, char_ngrams
+
+
+def dice(a: str, b: str) -> float:
+    """Coefficient de Dice calculé directement sur les multiensembles"""
+    grams_a, grams_b = char_ngrams(a), char_ngrams(b)
+    total = sum(grams_a.values()) + sum(grams_b.values())
+    return 2 * sum((grams_a & grams_b).values()) / total if total else 0.0
+
+
+class TestNgramSimilarityIndex(unittest.TestCase):
+    def setUp(self):
+        self.texts = ["créer entreprise", "modifier statut société", "prix annonce légal", "", "aaaa"]
+        self.index = NgramSimilarityIndex(self.texts)
+
+    def test_matches_direct_dice(self):
+        """Les scores de l'index égalent le coefficient de Dice paire à paire"""
+        for query in ["créer société", "prix annonce", "aa", "zzz"]:
+            expected = [dice(query, text) for text in self.texts]
+            np.testing.assert_allclose(self.index.similarity(query), expected)
+
+    def test_bounds(self):
+        """Texte identique : 1 ; aucun trigramme commun : 0"""
+        scores = self.index.similarity("prix annonce légal")
+        self.assertAlmostEqual(scores[2], 1.0)
+        self.assertEqual(self.index.similarity("xyz")[0], 0.0)
+
+    def test_max_similarity(self):
+        """Meilleur score de chaque texte parmi plusieurs mots"""
+        words = ["prix", "statut"]
+        expected = np.maximum(self.index.similarity("prix"), self.index.similarity("statut"))
+        np.testing.assert_allclose(self.index.max_similarity(words), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,9 +2,10 @@ import unittest
 from src.core.intent_matcher import IntentMatcher
 
 class TestPreprocessing(unittest.TestCase):
-    def setUp(self):
-        """Initialisation avant chaque test"""
-        self.intent_matcher = IntentMatcher()
+    @classmethod
+    def setUpClass(cls):
+        """Chargement unique du modèle et de l'index, partagés par les tests"""
+        cls.intent_matcher = IntentMatcher()
     
     def test_preprocessing(self):
         """Test du prétraitement des questions"""
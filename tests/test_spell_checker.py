@@ -0,0 +1,37 @@
+import unittest
+from src.nlp.spell_checker import SpellingCorrector, edit_distance
+
+
+class TestSpellingCorrector(unittest.TestCase):
+    def setUp(self):
+        """Vocabulaire réduit de la base"""
+        self.speller = SpellingCorrector(["modification", "dissolution", "entreprise", "statuts",
+                                          "tarif", "tarifs", "tarifs", "société"])
+
+    def test_edit_distance(self):
+        """Insertions, suppressions, substitutions et transpositions comptent pour une modification"""
+        self.assertEqual(edit_distance("tarif", "tarrif", 2), 1)
+        self.assertEqual(edit_distance("statuts", "sattuts", 2), 1)
+        self.assertEqual(edit_distance("société", "societe", 2), 2)
+        self.assertEqual(edit_distance("abc", "xyzuvw", 2), 3)
+
+    def test_corrects_typos(self):
+        """Les fautes de frappe sont ramenées au mot le plus proche du vocabulaire"""
+        self.assertEqual(self.speller.correct("modifiacation"), "modification")
+        self.assertEqual(self.speller.correct("dissolusion"), "dissolution")
+        self.assertEqual(self.speller.correct("entreprize"), "entreprise")
+        # À distance égale, le mot le plus fréquent l'emporte
+        self.assertEqual(self.speller.correct("tarifz"), "tarifs")
+
+    def test_leaves_other_words_untouched(self):
+        """Mots courts, non alphabétiques, trop éloignés ou reconnus : aucune correction"""
+        self.assertEqual(self.speller.correct("tarf"), "tarf")
+        self.assertEqual(self.speller.correct("l'entreprize"), "l'entreprize")
+        self.assertEqual(self.speller.correct("sociiiéte"), "sociiiéte")
+        self.assertEqual(self.speller.correct("statut"), "statuts")
+        known = SpellingCorrector(["statuts"], known=lambda word: word == "statut")
+        self.assertEqual(known.correct("statut"), "statut")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+import spacy
+from src.nlp.preprocessing import TextPreprocessor
+from src.nlp.spell_checker import SpellingCorrector
+
+
+class TestTextPreprocessor(unittest.TestCase):
+    def setUp(self):
+        """Pipeline français vierge : formes minuscules, mots vides retirés"""
+        self.preprocessor = TextPreprocessor(spacy.blank("fr"), use_lemmas=False, cache_size=2)
+
+    def test_generic_patterns_removed_repeatedly(self):
+        """Les tournures génériques successives sont toutes retirées, quel que soit leur ordre"""
+        self.assertEqual(self.preprocessor.normalize("Est-ce que je voudrais créer"), "créer")
+        self.assertEqual(self.preprocessor.normalize("Je veux est-ce que publier"), "publier")
+        self.assertEqual(self.preprocessor.normalize("Comment faire pour modifiacation"), "modification")
+
+    def test_memoization_and_stats(self):
+        """Un texte déjà prétraité est relu depuis le cache"""
+        first = self.preprocessor.preprocess("Je souhaite publier une annonce")
+        self.assertEqual(self.preprocessor.preprocess("Je souhaite publier une annonce"), first)
+        stats = self.preprocessor.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (1, 1, 1))
+
+    def test_batch_reuses_cache_and_duplicates(self):
+        """Le lot ne passe par spaCy que pour les textes distincts absents du cache"""
+        self.preprocessor.preprocess("publier annonce")
+        batch = self.preprocessor.preprocess_batch(["publier annonce", "tarif annonce", "tarif annonce"])
+        self.assertEqual(batch, ["publier annonce", "tarif annonce", "tarif annonce"])
+        self.assertEqual(self.preprocessor.cache_stats()["hits"], 1)
+
+    def test_new_speller_clears_cache(self):
+        """Changer de correcteur invalide les textes mémorisés"""
+        self.assertEqual(self.preprocessor.preprocess("entreprize"), "entreprize")
+        self.preprocessor.set_speller(SpellingCorrector(["entreprise"]))
+        self.assertEqual(self.preprocessor.preprocess("entreprize"), "entreprise")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+import spacy
+from src.nlp import train_intent_classifier
+from src.nlp.intent_classifier import IntentClassifier
+from src.nlp.model_registry import new_pipeline
+from tests.test_intent_matcher import KNOWLEDGE_BASE, save_blank_model
+
+LABELS = {"dissolution", "creation", "faq_tarifs"}
+
+
+class TestTrainingDataCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = Path(tempfile.mkdtemp())
+        cls.model = str(cls.tmp / "model")
+        save_blank_model(cls.model, [json.dumps(KNOWLEDGE_BASE, ensure_ascii=False)])
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def setUp(self):
+        self.work = Path(tempfile.mkdtemp(dir=self.tmp))
+        self.data_file = self.work / "base.json"
+        self.cache_dir = str(self.work / "cache")
+        self.write(KNOWLEDGE_BASE)
+
+    def write(self, knowledge_base):
+        self.data_file.write_text(json.dumps(knowledge_base, ensure_ascii=False), encoding="utf-8")
+
+    def prepare(self, classifier=None):
+        """Prépare les exemples en relevant les textes analysés par spaCy"""
+        classifier = classifier or IntentClassifier(base_model=self.model)
+        parsed = []
+        pipe = classifier.nlp.pipe
+
+        def recording_pipe(texts, **kwargs):
+            texts = list(texts)
+            parsed.extend(texts)
+            return pipe(texts, **kwargs)
+        classifier.nlp.pipe = recording_pipe
+        examples = classifier.prepare_training_data(str(self.data_file), cache_dir=self.cache_dir, seed=0)
+        return examples, parsed, classifier
+
+    def assert_labels(self, examples, labels=LABELS):
+        for example in examples:
+            self.assertEqual(set(example.reference.cats), labels)
+            self.assertEqual(sum(example.reference.cats.values()), 1.0)
+
+    def test_unchanged_base_is_read_from_the_cache(self):
+        """Une base inchangée est relue depuis le DocBin, sans analyse spaCy"""
+        examples, parsed, _ = self.prepare()
+        self.assertEqual(len(parsed), 10)
+        again, parsed, classifier = self.prepare()
+        self.assertEqual(parsed, [])
+        self.assert_labels(again)
+        self.assertEqual(classifier.categories, LABELS)
+        self.assertEqual(sorted((e.reference.text, sorted(e.reference.cats.items())) for e in again),
+                         sorted((e.reference.text, sorted(e.reference.cats.items())) for e in examples))
+
+    def test_edited_example_is_the_only_text_parsed(self):
+        """Seul le texte modifié est analysé ; une intention ajoutée sans exemple rejoint les labels"""
+        self.prepare()
+        knowledge_base = json.loads(json.dumps(KNOWLEDGE_BASE))
+        knowledge_base["categories"]["dissolution"]["examples"]["questions"][0] = "Comment liquider ma société ?"
+        knowledge_base["faq"]["delais"] = {"keywords": ["délai"], "responses": ["Réponse délais"]}
+        self.write(knowledge_base)
+
+        examples, parsed, _ = self.prepare()
+        self.assertEqual(parsed, ["Comment liquider ma société ?"])
+        self.assertEqual(len(examples), 10)
+        self.assert_labels(examples, LABELS | {"faq_delais"})
+
+    def test_changed_pipeline_invalidates_the_cache(self):
+        """Des documents produits par un autre pipeline ne sont pas réutilisés"""
+        self.prepare()
+        nlp = new_pipeline(self.model)
+        nlp.add_pipe("sentencizer")
+        nlp.add_pipe("textcat")
+        examples, parsed, _ = self.prepare(IntentClassifier(nlp=nlp))
+        self.assertEqual(len(parsed), 10)
+        self.assert_labels(examples)
+        with open(Path(self.cache_dir) / "manifest.json", encoding="utf-8") as f:
+            self.assertIn("sentencizer", json.load(f)["pipeline"])
+
+    def test_training_script_uses_the_cache(self):
+        """train_intent_classifier --cache-dir écrit le cache puis le relit à l'entraînement suivant"""
+        argv = ["--data", str(self.data_file), "--model-dir", str(self.work / "classifier"),
+                "--cache-dir", self.cache_dir, "--n-iter", "1", "--base-model", self.model]
+        train_intent_classifier.main(argv)
+        self.assertTrue((Path(self.cache_dir) / "manifest.json").exists())
+        with self.assertLogs("src.nlp.training_cache", level="INFO") as logs:
+            train_intent_classifier.main(argv)
+        self.assertTrue(any("relus depuis" in line for line in logs.output))
+        self.assertEqual(set(spacy.load(self.work / "classifier").get_pipe("textcat").labels), LABELS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import numpy as np
+from src.core.kb_index import IndexedIntent, IndexedText
+from src.core.vector_engine import SCORE_TOLERANCE, VectorSimilarityEngine
+
+
+def make_text(text: str, vector) -> IndexedText:
+    vector = np.asarray(vector, dtype=np.float32)
+    return IndexedText(text, text, vector, bool(vector.any()))
+
+
+class TestVectorSimilarityEngine(unittest.TestCase):
+    def setUp(self):
+        """Trois intentions dont une sans exemple ni mot-clé"""
+        rng = np.random.default_rng(0)
+        self.intents = [
+            IndexedIntent("a", "categories", "a", {},
+                          keywords=[make_text("k1", rng.normal(size=8))],
+                          examples=[make_text("e1", rng.normal(size=8)), make_text("e2", rng.normal(size=8))],
+                          variations=[]),
+            IndexedIntent("b", "categories", "b", {}, keywords=[], examples=[], variations=[]),
+            IndexedIntent("faq_c", "faq", "c", {},
+                          keywords=[make_text("k2", rng.normal(size=8)), make_text("k3", np.zeros(8))],
+                          examples=[make_text("e3", rng.normal(size=8))],
+                          variations=[make_text("v1", rng.normal(size=8))]),
+        ]
+        self.engine = VectorSimilarityEngine(self.intents)
+        self.query = make_text("q", rng.normal(size=8))
+
+    def test_cosine_matches_pairwise_similarity(self):
+        """Les cosinus matriciels correspondent aux similarités paire à paire"""
+        cosines = self.engine.cosine(self.engine.normalize(self.query.vector)[None, :])[0]
+        expected = [self.query.similarity(entry)
+                    for kind in ("examples", "variations", "keywords")
+                    for intent in self.intents for entry in getattr(intent, kind)]
+        np.testing.assert_allclose(cosines, expected, atol=SCORE_TOLERANCE)
+
+    def test_segment_reductions(self):
+        """Les réductions par intention ignorent les segments vides"""
+        values = np.array([0.2, -0.4, 0.9])
+        np.testing.assert_allclose(self.engine.segment_max("examples", values), [0.2, 0.0, 0.9])
+        np.testing.assert_allclose(self.engine.segment_sum("keywords", values), [0.2, 0.0, 0.5])
+        np.testing.assert_allclose(self.engine.segment_max("variations", np.array([-0.3])), [0.0, 0.0, -0.3])
+
+
+if __name__ == '__main__':
+    unittest.main()